@@ -0,0 +1,152 @@
+import asyncio
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import BLOCK_BATCH_SIZE, BLOCK_MAX_LAG, BLOCK_POLL_INTERVAL
+from app.crud import get_block_cursor, save_block_cursor
+from app.logger import logger
+from app.tron import TronClient
+from app.watchlist import Watchlist
+
+
+def block_number(block: dict) -> int:
+    """Return the number of a block as returned by the node API."""
+    return block["block_header"]["raw_data"]["number"]
+
+
+def touched_addresses(block: dict) -> set[str]:
+    """
+    Return the addresses a block's transactions involve.
+
+    Every ``*_address`` field of every contract parameter counts: owner,
+    recipient, resource receiver and contract addresses.
+    """
+    addresses = set()
+    for transaction in block.get("transactions", ()):
+        for contract in transaction.get("raw_data", {}).get("contract", ()):
+            value = contract.get("parameter", {}).get("value", {})
+            for key, item in value.items():
+                if key.endswith("_address") and isinstance(item, str):
+                    addresses.add(item)
+    return addresses
+
+
+class BlockFollower:
+    """
+    Follows new blocks and invalidates the watched addresses they touch.
+
+    Each poll reads the head and the blocks since the persisted cursor, at
+    most ``batch_size`` of them. Watched addresses active in those blocks are
+    dropped from the wallet cache and become due for refresh; once the
+    follower has reached the head, the values of all other watched addresses
+    are confirmed as current. A follower more than ``max_lag`` blocks behind
+    skips to the head and invalidates the whole watchlist.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        watchlist: Watchlist,
+        name: str = "watchlist",
+        interval: float = BLOCK_POLL_INTERVAL,
+        batch_size: int = BLOCK_BATCH_SIZE,
+        max_lag: int = BLOCK_MAX_LAG,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for cursor sessions.
+            watchlist (Watchlist): Watched addresses to invalidate.
+            name (str, optional): Key of the persisted cursor.
+            interval (float, optional): Seconds between polls of the head.
+            batch_size (int, optional): Maximum blocks processed per poll.
+            max_lag (int, optional): Blocks behind the head after which the follower skips ahead.
+        """
+        self.session_factory = session_factory
+        self.watchlist = watchlist
+        self.name = name
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_lag = max_lag
+
+        self.cursor: int | None = None
+        self.head: int | None = None
+        self._task: asyncio.Task | None = None
+
+        self.blocks_processed = 0
+        self.skips = 0
+
+    @property
+    def lag(self) -> int | None:
+        """Blocks between the chain head and the last processed block."""
+        if self.head is None or self.cursor is None:
+            return None
+        return self.head - self.cursor
+
+    async def poll(self, tron: TronClient) -> int:
+        """
+        Process the blocks since the cursor and persist the new cursor.
+
+        Returns:
+            int: Number of blocks processed.
+        """
+        latest = await tron.get_latest_block()
+        self.head = block_number(latest)
+        if self.cursor is None:
+            async with self.session_factory() as session:
+                self.cursor = await get_block_cursor(session, self.name)
+
+        if self.cursor is None or self.head - self.cursor > self.max_lag:
+            if self.cursor is not None:
+                self.skips += 1
+                logger.warning(f"Block follower is {self.head - self.cursor} blocks behind, skipping to the head")
+            # Nothing is known about the missed blocks: treat every watched address as changed.
+            self.watchlist.apply_block_activity(set(self.watchlist.entries), confirm=False)
+            await self._advance(tron, self.head, set(self.watchlist.entries))
+            return 0
+
+        target = min(self.head, self.cursor + self.batch_size)
+        if target <= self.cursor:
+            self.watchlist.apply_block_activity(set())
+            return 0
+
+        numbers = range(self.cursor + 1, target + 1)
+        blocks = await asyncio.gather(*(tron.get_block(number) for number in numbers if number != self.head))
+        if target == self.head:
+            blocks.append(latest)
+        addresses = set().union(*(touched_addresses(block) for block in blocks))
+        invalidated = self.watchlist.apply_block_activity(addresses, confirm=target == self.head)
+        await self._advance(tron, target, invalidated)
+        self.blocks_processed += len(blocks)
+        return len(blocks)
+
+    async def _advance(self, tron: TronClient, number: int, invalidated) -> None:
+        for address in invalidated:
+            await tron.cache.invalidate(address)
+        async with self.session_factory() as session:
+            await save_block_cursor(session, self.name, number)
+        self.cursor = number
+
+    async def start(self, tron: TronClient) -> None:
+        """Start following blocks in the background."""
+        self._task = asyncio.create_task(self._run(tron))
+
+    async def stop(self) -> None:
+        """Stop following blocks; the cursor is already persisted."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, tron: TronClient) -> None:
+        while True:
+            try:
+                processed = await self.poll(tron)
+            except Exception as e:
+                logger.error(f"Block follower poll failed: {e}")
+                processed = 0
+            # Keep going without waiting while catching up.
+            await asyncio.sleep(self.interval if processed < self.batch_size else 0)
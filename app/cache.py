@@ -0,0 +1,450 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from urllib.parse import unquote, urlsplit
+
+from app.logger import logger
+
+
+class CacheBackend(ABC):
+    """
+    Storage for wallet cache entries.
+
+    Entries carry wall-clock timestamps so that every process sharing a
+    backend agrees on freshness: `expires_at` ends the fresh period and
+    `keep_until` (expiry plus the stale window) ends the entry's life.
+    Backends only store; freshness and loading are decided by WalletCache.
+    """
+
+    evictions = 0
+
+    @property
+    def size(self) -> int | None:
+        """Number of stored entries, or None when it is not cheaply known."""
+        return None
+
+    @abstractmethod
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        """Return `(value, expires_at)` of a live entry, or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, expires_at: float, keep_until: float) -> None:
+        """Store an entry until `keep_until`."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all entries."""
+
+    async def close(self) -> None:
+        """Release connections or files held by the backend."""
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process backend: an LRU-bounded ordered dict."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[Any, float, float]] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, keep_until = entry
+        if time.time() >= keep_until:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value, expires_at
+
+    async def set(self, key: str, value: Any, expires_at: float, keep_until: float) -> None:
+        self._entries[key] = (value, expires_at, keep_until)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Backend in a SQLite file, shared by the worker processes of one host.
+
+    Values are stored as JSON. Calls run in the default thread pool so a
+    busy database never blocks the event loop. Every `prune_every` writes,
+    dead entries are deleted and the oldest ones beyond `maxsize` evicted.
+    """
+
+    def __init__(self, path: str, maxsize: int = 10_000, prune_every: int = 256):
+        self.path = path
+        self.maxsize = maxsize
+        self.prune_every = prune_every
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS wallet_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, keep_until REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_wallet_cache_keep_until ON wallet_cache (keep_until)")
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        row = await asyncio.to_thread(
+            self._fetchone,
+            "SELECT value, expires_at FROM wallet_cache WHERE key = ? AND keep_until > ?",
+            (key, time.time()),
+        )
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    async def set(self, key: str, value: Any, expires_at: float, keep_until: float) -> None:
+        self._writes += 1
+        prune = self._writes % self.prune_every == 0
+        await asyncio.to_thread(self._set, key, json.dumps(value), expires_at, keep_until, prune)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM wallet_cache WHERE key = ?", (key,))
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM wallet_cache", ())
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _fetchone(self, sql: str, params: tuple) -> tuple | None:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def _set(self, key: str, value: str, expires_at: float, keep_until: float, prune: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO wallet_cache (key, value, expires_at, keep_until) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, keep_until),
+            )
+            if not prune:
+                return
+            self._conn.execute("DELETE FROM wallet_cache WHERE keep_until <= ?", (time.time(),))
+            excess = self._conn.execute("SELECT count(*) FROM wallet_cache").fetchone()[0] - self.maxsize
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM wallet_cache WHERE key IN "
+                    "(SELECT key FROM wallet_cache ORDER BY keep_until LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend on any server speaking the Redis protocol (RESP), shared across hosts.
+
+    Uses a small pool of plain asyncio connections. Entries are JSON strings
+    under `prefix` and expire on the server at `keep_until`.
+    """
+
+    def __init__(self, url: str, prefix: str = "trx:wallet:", pool_size: int = 8, timeout: float = 1.0):
+        """
+        Args:
+            url (str): ``redis://[[user]:password@]host[:port][/db]``.
+            prefix (str, optional): Prefix of every key written.
+            pool_size (int, optional): Maximum number of open connections.
+            timeout (float, optional): Seconds allowed per command, connecting included.
+        """
+        parsed = urlsplit(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def get(self, key: str) -> tuple[Any, float] | None:
+        raw = await self.execute("GET", self.prefix + key)
+        if raw is None:
+            return None
+        value, expires_at = json.loads(raw)
+        return value, expires_at
+
+    async def set(self, key: str, value: Any, expires_at: float, keep_until: float) -> None:
+        ttl_ms = max(1, int((keep_until - time.time()) * 1000))
+        await self.execute("SET", self.prefix + key, json.dumps([value, expires_at]), "PX", str(ttl_ms))
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", self.prefix + key)
+
+    async def clear(self) -> None:
+        cursor = "0"
+        while True:
+            cursor, keys = await self.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", "1000")
+            if keys:
+                await self.execute("DEL", *keys)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if cursor == "0":
+                return
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def execute(self, *args: str | bytes) -> Any:
+        """Send one command and return its decoded reply."""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if conn is None:
+                        conn = await self._connect()
+                    reply = await _command(conn, args)
+            except BaseException:
+                if conn is not None:
+                    conn[1].close()
+                raise
+            self._idle.append(conn)
+            return reply
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        conn = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password is not None:
+                auth = (self.username, self.password) if self.username else (self.password,)
+                await _command(conn, ("AUTH", *auth))
+            if self.db:
+                await _command(conn, ("SELECT", str(self.db)))
+        except BaseException:
+            conn[1].close()
+            raise
+        return conn
+
+
+async def _command(conn: tuple[asyncio.StreamReader, asyncio.StreamWriter], args) -> Any:
+    reader, writer = conn
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    writer.write(b"".join(parts))
+    await writer.drain()
+    return await _read_reply(reader)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Unexpected reply: {line!r}")
+
+
+def create_backend(url: str, maxsize: int) -> CacheBackend:
+    """
+    Build a cache backend from a TRON_CACHE_BACKEND value.
+
+    Args:
+        url (str): ``memory``, ``sqlite:///path/to/cache.db`` or ``redis://host:port/db``.
+        maxsize (int): Entry bound for the memory and SQLite backends.
+
+    Returns:
+        CacheBackend: The configured backend.
+    """
+    if url in ("", "memory"):
+        return MemoryBackend(maxsize)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):], maxsize)
+    if url.startswith(("redis://", "rediss://")):
+        if url.startswith("rediss://"):
+            raise ValueError("TLS Redis URLs (rediss://) are not supported")
+        return RedisBackend(url)
+    raise ValueError(f"Unknown cache backend: {url!r}")
+
+
+class WalletCache:
+    """
+    TTL cache with single-flight loading over a pluggable backend.
+
+    Concurrent lookups of the same key in this process share one upstream
+    load. Expired entries can optionally be served for ``stale_ttl`` more
+    seconds while a background refresh runs. Failed loads are never cached,
+    and a failing backend degrades to uncached lookups.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: float = 5.0,
+        stale_ttl: float = 0.0,
+        backend: CacheBackend | None = None,
+    ):
+        """
+        Args:
+            maxsize (int, optional): Maximum number of entries kept by the default memory backend.
+            ttl (float, optional): Seconds an entry stays fresh. ``0`` disables caching
+                while keeping request coalescing.
+            stale_ttl (float, optional): Seconds past expiry an entry may still be
+                served while it is refreshed in the background. ``0`` disables it.
+            backend (CacheBackend | None, optional): Entry storage. In-process memory when omitted.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend or MemoryBackend(maxsize)
+
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.errors = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for ``key`` or load it through ``loader``.
+
+        Args:
+            key (str): Cache key.
+            loader (Callable[[], Awaitable[Any]]): Coroutine factory fetching a fresh value.
+
+        Returns:
+            Any: Cached or freshly loaded value.
+        """
+        entry = await self._get(key) if self.ttl > 0 else None
+
+        if entry is not None:
+            value, expires_at = entry
+            if time.time() < expires_at:
+                self.hits += 1
+                return value
+            self.stale += 1
+            if key not in self._inflight:
+                self._start_load(key, loader).add_done_callback(_log_refresh_failure)
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key, loader)
+
+        # Shield so that a cancelled caller does not abort the load other waiters share.
+        return await asyncio.shield(task)
+
+    async def refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Load ``key`` through ``loader`` regardless of any cached entry and cache the result.
+
+        Joins a load of the same key that is already in flight.
+
+        Args:
+            key (str): Cache key.
+            loader (Callable[[], Awaitable[Any]]): Coroutine factory fetching a fresh value.
+
+        Returns:
+            Any: The freshly loaded value.
+        """
+        task = self._inflight.get(key) or self._start_load(key, loader)
+        return await asyncio.shield(task)
+
+    async def invalidate(self, key: str) -> None:
+        """Drop a cached entry so the next lookup goes upstream."""
+        await self._call(self.backend.delete(key))
+
+    async def clear(self) -> None:
+        """Drop all cached entries."""
+        await self._call(self.backend.clear())
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    @property
+    def stats(self) -> dict[str, int | None]:
+        """Hit, miss, coalesced, stale, eviction and backend error counters plus the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+            "size": self.backend.size,
+        }
+
+    def _start_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if self.ttl > 0:
+            expires_at = time.time() + self.ttl
+            await self._call(self.backend.set(key, value, expires_at, expires_at + self.stale_ttl))
+        return value
+
+    async def _get(self, key: str) -> tuple[Any, float] | None:
+        return await self._call(self.backend.get(key))
+
+    async def _call(self, operation: Awaitable[Any]) -> Any:
+        try:
+            return await operation
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Wallet cache backend error: {e}")
+            return None
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background cache refresh failed: {task.exception()}")
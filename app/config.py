@@ -0,0 +1,209 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _get_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read-only replica for the query endpoints. When it cannot be
+# reached, reads fall back to DATABASE_URL for DATABASE_READ_RETRY_INTERVAL
+# seconds before the replica is tried again.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+DATABASE_READ_RETRY_INTERVAL = _get_float("DATABASE_READ_RETRY_INTERVAL", 5.0)
+
+# Connection pool sizing per engine (ignored for in-memory SQLite).
+DB_POOL_SIZE = _get_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _get_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _get_float("DB_POOL_TIMEOUT", 30.0)
+DB_POOL_RECYCLE = _get_int("DB_POOL_RECYCLE", -1)
+DB_READ_POOL_SIZE = _get_int("DB_READ_POOL_SIZE", DB_POOL_SIZE)
+DB_READ_MAX_OVERFLOW = _get_int("DB_READ_MAX_OVERFLOW", DB_MAX_OVERFLOW)
+
+# Tron HTTP API. When TRON_API_URL is unset tronpy falls back to
+# TRONPY_HTTP_PROVIDER_URI or the public TronGrid endpoint.
+TRON_API_URL = os.getenv("TRON_API_URL") or None
+# Comma-separated pool of full node URLs; takes precedence over TRON_API_URL.
+TRON_API_URLS = [url.strip() for url in os.getenv("TRON_API_URLS", "").split(",") if url.strip()]
+TRON_API_KEY = os.getenv("TRON_API_KEY") or None
+TRON_TIMEOUT = _get_float("TRON_TIMEOUT", 10.0)
+TRON_MAX_CONNECTIONS = _get_int("TRON_MAX_CONNECTIONS", 100)
+TRON_MAX_KEEPALIVE = _get_int("TRON_MAX_KEEPALIVE", 20)
+TRON_KEEPALIVE_EXPIRY = _get_float("TRON_KEEPALIVE_EXPIRY", 30.0)
+
+# Node pool health tracking. A node's circuit opens after
+# TRON_NODE_FAILURE_THRESHOLD consecutive failures and is probed again after
+# TRON_NODE_RECOVERY_TIME seconds. With TRON_HEDGE_PERCENTILE > 0 a duplicate
+# request goes to the next node once the primary exceeds that latency percentile.
+TRON_NODE_FAILURE_THRESHOLD = _get_int("TRON_NODE_FAILURE_THRESHOLD", 5)
+TRON_NODE_RECOVERY_TIME = _get_float("TRON_NODE_RECOVERY_TIME", 30.0)
+TRON_NODE_WINDOW = _get_int("TRON_NODE_WINDOW", 100)
+TRON_HEDGE_PERCENTILE = _get_float("TRON_HEDGE_PERCENTILE", 0.0)
+TRON_HEDGE_MIN_DELAY = _get_float("TRON_HEDGE_MIN_DELAY", 0.05)
+
+# Outbound admission control. TRON_RATE_LIMIT (requests/s, 0 = unlimited)
+# feeds a token bucket; the AIMD concurrency limit moves between
+# TRON_CONCURRENCY_MIN and TRON_CONCURRENCY_MAX (0 disables it) based on
+# latency against TRON_LATENCY_TARGET and errors. At most TRON_MAX_QUEUE calls
+# wait for admission. 429 responses pause all calls for their Retry-After
+# (capped by TRON_RETRY_AFTER_MAX) and are retried TRON_RATE_LIMIT_RETRIES times.
+TRON_RATE_LIMIT = _get_float("TRON_RATE_LIMIT", 0.0)
+TRON_RATE_BURST = _get_int("TRON_RATE_BURST", 20)
+TRON_MAX_QUEUE = _get_int("TRON_MAX_QUEUE", 1000)
+TRON_CONCURRENCY_INITIAL = _get_int("TRON_CONCURRENCY_INITIAL", 50)
+TRON_CONCURRENCY_MIN = _get_int("TRON_CONCURRENCY_MIN", 4)
+TRON_CONCURRENCY_MAX = _get_int("TRON_CONCURRENCY_MAX", 500)
+TRON_LATENCY_TARGET = _get_float("TRON_LATENCY_TARGET", 2.0)
+TRON_RETRY_AFTER_MAX = _get_float("TRON_RETRY_AFTER_MAX", 5.0)
+TRON_RATE_LIMIT_RETRIES = _get_int("TRON_RATE_LIMIT_RETRIES", 1)
+
+# Wallet info cache in front of the Tron API. TTL 0 disables caching but
+# keeps concurrent lookups of one address coalesced into a single fetch.
+TRON_CACHE_SIZE = _get_int("TRON_CACHE_SIZE", 10_000)
+TRON_CACHE_TTL = _get_float("TRON_CACHE_TTL", 5.0)
+TRON_CACHE_STALE_TTL = _get_float("TRON_CACHE_STALE_TTL", 0.0)
+# Where cache entries live: "memory" (per process), "sqlite:///path/cache.db"
+# (shared by the workers of one host) or "redis://host:6379/0" (shared by all).
+TRON_CACHE_BACKEND = os.getenv("TRON_CACHE_BACKEND", "memory")
+
+# POST /addresses batch lookups
+BATCH_MAX_SIZE = _get_int("BATCH_MAX_SIZE", 1000)
+BATCH_CONCURRENCY = _get_int("BATCH_CONCURRENCY", 20)
+
+# Write-behind persistence: POST /address records are queued and inserted in
+# multi-row batches by a background task, flushed by size or time window.
+WRITE_BEHIND = _get_bool("WRITE_BEHIND", False)
+WRITE_BEHIND_BATCH_SIZE = _get_int("WRITE_BEHIND_BATCH_SIZE", 200)
+WRITE_BEHIND_FLUSH_INTERVAL = _get_float("WRITE_BEHIND_FLUSH_INTERVAL", 0.02)
+WRITE_BEHIND_QUEUE_SIZE = _get_int("WRITE_BEHIND_QUEUE_SIZE", 10_000)
+WRITE_BEHIND_PUT_TIMEOUT = _get_float("WRITE_BEHIND_PUT_TIMEOUT", 1.0)
+
+# GET /records/export
+EXPORT_CHUNK_SIZE = _get_int("EXPORT_CHUNK_SIZE", 1000)
+
+# Failure handling. Invalid and not-found addresses are remembered for
+# NEGATIVE_CACHE_TTL seconds (0 disables) and rejected before any I/O.
+# Failures are counted per address and error and flushed to wallet_failures
+# every FAILURE_FLUSH_INTERVAL seconds, or earlier once FAILURE_MAX_PENDING
+# keys are waiting. FAILURE_ROW_POLICY decides when a failure that reached
+# the Tron API still gets its own wallet_requests row: "all" (default),
+# "first" (first per address and error within a flush interval) or "none".
+# Negative cache hits never do.
+NEGATIVE_CACHE_TTL = _get_float("NEGATIVE_CACHE_TTL", 60.0)
+NEGATIVE_CACHE_SIZE = _get_int("NEGATIVE_CACHE_SIZE", 100_000)
+FAILURE_ROW_POLICY = os.getenv("FAILURE_ROW_POLICY", "all")
+FAILURE_FLUSH_INTERVAL = _get_float("FAILURE_FLUSH_INTERVAL", 30.0)
+FAILURE_MAX_PENDING = _get_int("FAILURE_MAX_PENDING", 10_000)
+
+# Storage of successful lookups. "full" appends a wallet_requests row per
+# lookup; "delta" appends one only when balance, energy or bandwidth changed
+# and otherwise bumps observations/last_seen_at of the current row.
+STORAGE_MODE = os.getenv("STORAGE_MODE", "full")
+
+# Startup. The lifespan opens DB_WARMUP_CONNECTIONS database connections
+# (per engine) and TRON_WARMUP_CONNECTIONS connections per Tron node, giving
+# up after WARMUP_TIMEOUT seconds; GET /ready answers 503 until then.
+DB_WARMUP_CONNECTIONS = _get_int("DB_WARMUP_CONNECTIONS", 2)
+TRON_WARMUP_CONNECTIONS = _get_int("TRON_WARMUP_CONNECTIONS", 2)
+WARMUP_TIMEOUT = _get_float("WARMUP_TIMEOUT", 10.0)
+
+# Logging. APP_ENV=development enables variable values in tracebacks
+# (diagnose). LOG_FORMAT=json writes one JSON object per record;
+# LOG_ENQUEUE moves sink writes off the event loop. With LOG_SAMPLE_RATE > 0
+# records below WARNING are limited to that many per second per call site.
+# LOG_REQUESTS adds a record per request with its duration and stage timings.
+# The log file is written once the application starts; empty disables it.
+APP_ENV = os.getenv("APP_ENV", "development")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_ENQUEUE = _get_bool("LOG_ENQUEUE", False)
+LOG_SAMPLE_RATE = _get_float("LOG_SAMPLE_RATE", 0.0)
+LOG_SAMPLE_BURST = _get_int("LOG_SAMPLE_BURST", 10)
+LOG_REQUESTS = _get_bool("LOG_REQUESTS", False)
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+
+# History (GET /wallets/{address}/history). A query may span at most
+# HISTORY_MAX_BUCKETS buckets. With HISTORY_ROLLUPS, per-bucket aggregates
+# for the HISTORY_ROLLUP_BUCKETS sizes are maintained on insert and queries
+# of those sizes read them instead of the raw records.
+HISTORY_MAX_BUCKETS = _get_int("HISTORY_MAX_BUCKETS", 1000)
+HISTORY_ROLLUPS = _get_bool("HISTORY_ROLLUPS", False)
+HISTORY_ROLLUP_BUCKETS = [
+    bucket.strip() for bucket in os.getenv("HISTORY_ROLLUP_BUCKETS", "hour,day").split(",") if bucket.strip()
+]
+
+# Retention. With RETENTION_JOB a background task runs every
+# RETENTION_INTERVAL seconds and moves records older than RETENTION_DAYS
+# (0 keeps everything) into gzip NDJSON files in RETENTION_ARCHIVE_DIR, one
+# per RETENTION_PERIOD ("day" or "month"). On PostgreSQL with a partitioned
+# wallet_requests (see partition_wallet_requests.py) it creates the next
+# RETENTION_PREMAKE partitions and drops expired ones whole; otherwise
+# expired rows are deleted RETENTION_BATCH_SIZE at a time.
+RETENTION_JOB = _get_bool("RETENTION_JOB", False)
+RETENTION_DAYS = _get_int("RETENTION_DAYS", 0)
+RETENTION_PERIOD = os.getenv("RETENTION_PERIOD", "day")
+RETENTION_INTERVAL = _get_float("RETENTION_INTERVAL", 3600.0)
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "archive")
+RETENTION_BATCH_SIZE = _get_int("RETENTION_BATCH_SIZE", 5000)
+RETENTION_PREMAKE = _get_int("RETENTION_PREMAKE", 3)
+
+# Watchlist. Watched addresses are refreshed in the background, up to
+# WATCHLIST_BATCH_SIZE per tick of WATCHLIST_INTERVAL seconds with at most
+# WATCHLIST_CONCURRENCY lookups at once, most queried and stalest first.
+# Lookups of a watched address are answered from its refreshed value while
+# that is at most WATCHLIST_FRESHNESS seconds old.
+WATCHLIST_FRESHNESS = _get_float("WATCHLIST_FRESHNESS", 30.0)
+WATCHLIST_INTERVAL = _get_float("WATCHLIST_INTERVAL", 1.0)
+WATCHLIST_BATCH_SIZE = _get_int("WATCHLIST_BATCH_SIZE", 50)
+WATCHLIST_CONCURRENCY = _get_int("WATCHLIST_CONCURRENCY", 4)
+WATCHLIST_MAX_AGE = _get_float("WATCHLIST_MAX_AGE", 600.0)
+
+# Block follower. With BLOCK_FOLLOWER the service reads every new block
+# (polling the head every BLOCK_POLL_INTERVAL seconds, at most
+# BLOCK_BATCH_SIZE blocks per poll) and refreshes watched addresses only when
+# a block touches them; unchanged values stay valid up to WATCHLIST_MAX_AGE.
+# The position is persisted; a follower more than BLOCK_MAX_LAG blocks behind
+# skips to the head and refreshes the whole watchlist instead.
+BLOCK_FOLLOWER = _get_bool("BLOCK_FOLLOWER", False)
+BLOCK_POLL_INTERVAL = _get_float("BLOCK_POLL_INTERVAL", 3.0)
+BLOCK_BATCH_SIZE = _get_int("BLOCK_BATCH_SIZE", 20)
+BLOCK_MAX_LAG = _get_int("BLOCK_MAX_LAG", 1200)
+
+# Subscriptions (GET /subscribe). Each subscribed address is looked up every
+# SUBSCRIPTION_POLL_INTERVAL seconds by a single shared poller, and changes
+# are stored as wallet records when SUBSCRIPTION_PERSIST is set. A
+# connection with SUBSCRIPTION_QUEUE_SIZE undelivered events is dropped.
+# Idle connections get a heartbeat every SUBSCRIPTION_HEARTBEAT seconds.
+SUBSCRIPTION_POLL_INTERVAL = _get_float("SUBSCRIPTION_POLL_INTERVAL", 3.0)
+SUBSCRIPTION_QUEUE_SIZE = _get_int("SUBSCRIPTION_QUEUE_SIZE", 16)
+SUBSCRIPTION_HEARTBEAT = _get_float("SUBSCRIPTION_HEARTBEAT", 15.0)
+SUBSCRIPTION_MAX_ADDRESSES = _get_int("SUBSCRIPTION_MAX_ADDRESSES", 50)
+SUBSCRIPTION_PERSIST = _get_bool("SUBSCRIPTION_PERSIST", True)
+
+# Profiling. PROFILE_SAMPLE_RATE is the share of requests profiled (with
+# pyinstrument when installed, a stage trace otherwise); requests taking at
+# least PROFILE_SLOW_THRESHOLD seconds are captured as a stage trace. 0
+# disables either. The newest PROFILE_KEEP captures are kept in PROFILE_DIR
+# and served under /admin/profiles, which requires ADMIN_TOKEN as a bearer
+# token and answers 404 while it is not set.
+PROFILE_SAMPLE_RATE = _get_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_SLOW_THRESHOLD = _get_float("PROFILE_SLOW_THRESHOLD", 0.0)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+PROFILE_KEEP = _get_int("PROFILE_KEEP", 50)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
@@ -1,12 +1,45 @@
-from typing import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, Sequence
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Insert,
+    RowMapping,
+    Select,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    type_coerce,
+    update,
+)
 
-from app.models import WalletRequest
-from app.schemas import WalletOut
+from app.config import HISTORY_ROLLUP_BUCKETS, HISTORY_ROLLUPS, STORAGE_MODE
+from app.models import (
+    BlockCursor,
+    WalletFailure,
+    WalletHistoryRollup,
+    WalletRequest,
+    WalletSnapshot,
+    WatchedWallet,
+)
+from app.schemas import RecordFilters, WalletDB, WalletOut
 from app.logger import logger
 
+# Columns of a WalletDB, in field order, for reads that skip ORM hydration.
+RECORD_COLUMNS = [WalletRequest.__table__.c[name] for name in WalletDB.model_fields]
+
+# Aggregated wallet values and the width of each history bucket size.
+HISTORY_METRICS = ("balance", "energy", "bandwidth")
+BUCKET_WIDTHS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+
 
 async def create_wallet_record(
     session: AsyncSession,
@@ -37,31 +70,687 @@ async def create_wallet_record(
         error_message=error_message
     )
     session.add(record)
+    if HISTORY_ROLLUPS and success:
+        await session.flush()
+        await _update_rollups(session, [(record, 1, record.created_at)])
+    # id and created_at are populated by the flush, so no refresh round trip is needed.
     await session.commit()
-    await session.refresh(record)
     return record
 
 
+async def create_wallet_records(
+    session: AsyncSession,
+    records: Sequence[dict],
+) -> Sequence[WalletRequest]:
+    """
+    Creates several wallet records with a single multi-row insert and commit.
+
+    Args:
+        session (AsyncSession): Database session.
+        records (Sequence[dict]): Column values as built by `wallet_record_values`.
+
+    Returns:
+        Sequence[WalletRequest]: The created records, in input order.
+    """
+    logger.info(f"Saving {len(records)} records in bulk")
+
+    if not records:
+        return []
+
+    result = await session.scalars(
+        insert(WalletRequest).returning(WalletRequest, sort_by_parameter_order=True),
+        list(records),
+    )
+    created = result.all()
+    if HISTORY_ROLLUPS:
+        await _update_rollups(session, [(record, 1, record.created_at) for record in created if record.success])
+    await session.commit()
+    return created
+
+
+async def save_wallet_record(
+    session: AsyncSession,
+    data: WalletOut,
+    success: bool = True,
+    error_message: str | None = None,
+    mode: str = STORAGE_MODE,
+) -> WalletRequest:
+    """
+    Stores one lookup result according to the storage mode.
+
+    Args:
+        session (AsyncSession): Database session.
+        data (WalletOut): Parsed wallet data.
+        success (bool, optional): Indicates if the retrieval was successful. Defaults to True.
+        error_message (str | None, optional): Error description if failed. Defaults to None.
+        mode (str, optional): "full" or "delta". Defaults to STORAGE_MODE.
+
+    Returns:
+        WalletRequest: The created record, or in delta mode the unchanged
+            snapshot record it was counted against.
+    """
+    if mode == "delta":
+        records = await record_wallet_observations(session, [wallet_record_values(data, success, error_message)])
+        return records[0]
+    return await create_wallet_record(session, data, success, error_message)
+
+
+async def save_wallet_records(
+    session: AsyncSession,
+    records: Sequence[dict],
+    mode: str = STORAGE_MODE,
+) -> Sequence[WalletRequest]:
+    """
+    Stores several lookup results in one transaction according to the storage mode.
+
+    Args:
+        session (AsyncSession): Database session.
+        records (Sequence[dict]): Column values as built by `wallet_record_values`.
+        mode (str, optional): "full" or "delta". Defaults to STORAGE_MODE.
+
+    Returns:
+        Sequence[WalletRequest]: The record each input was stored as, in input order.
+    """
+    if mode == "delta":
+        return await record_wallet_observations(session, records)
+    return await create_wallet_records(session, records)
+
+
+async def record_wallet_observations(
+    session: AsyncSession,
+    records: Sequence[dict],
+) -> Sequence[WalletRequest]:
+    """
+    Stores lookup results as change-only history.
+
+    A successful result whose balance, energy and bandwidth equal the current
+    snapshot of its address only increments `observations` and moves
+    `last_seen_at` of the snapshot's record; otherwise a new record is
+    inserted and becomes the snapshot. Failures are always inserted.
+
+    Args:
+        session (AsyncSession): Database session.
+        records (Sequence[dict]): Column values as built by `wallet_record_values`.
+
+    Returns:
+        Sequence[WalletRequest]: The record each input was stored as, in input order.
+    """
+    logger.info(f"Recording {len(records)} observations")
+
+    if not records:
+        return []
+
+    now = datetime.now(timezone.utc)
+    addresses = {values["wallet_address"] for values in records if values["success"]}
+    # address -> (snapshot values, stored record id, index into `inserts`)
+    current: dict[str, tuple[tuple, int | None, int | None]] = {}
+    if addresses:
+        snapshots = await session.scalars(
+            select(WalletSnapshot).where(WalletSnapshot.wallet_address.in_(addresses))
+        )
+        for snapshot in snapshots:
+            values = (snapshot.balance, snapshot.energy, snapshot.bandwidth)
+            current[snapshot.wallet_address] = (values, snapshot.record_id, None)
+
+    inserts: list[dict] = []
+    seen_again: dict[int, int] = {}
+    slots: list[tuple[bool, int]] = []
+    for values in records:
+        key = (values["balance"], values["energy"], values["bandwidth"])
+        snapshot = current.get(values["wallet_address"]) if values["success"] else None
+        if snapshot is not None and snapshot[0] == key:
+            _, record_id, index = snapshot
+            if index is not None:
+                inserts[index]["observations"] += 1
+                slots.append((True, index))
+            else:
+                seen_again[record_id] = seen_again.get(record_id, 0) + 1
+                slots.append((False, record_id))
+            continue
+
+        slots.append((True, len(inserts)))
+        if values["success"]:
+            current[values["wallet_address"]] = (key, None, len(inserts))
+        inserts.append({**values, "observations": 1, "last_seen_at": now})
+
+    created: Sequence[WalletRequest] = []
+    if inserts:
+        result = await session.scalars(
+            insert(WalletRequest).returning(WalletRequest, sort_by_parameter_order=True),
+            inserts,
+        )
+        created = result.all()
+
+    updated: dict[int, WalletRequest] = {}
+    if seen_again:
+        table = WalletRequest.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("record_id"))
+            .values(observations=table.c.observations + bindparam("seen"), last_seen_at=now),
+            [{"record_id": record_id, "seen": seen} for record_id, seen in seen_again.items()],
+        )
+        result = await session.scalars(
+            select(WalletRequest)
+            .where(WalletRequest.id.in_(seen_again))
+            .execution_options(populate_existing=True)
+        )
+        updated = {record.id: record for record in result}
+
+    snapshots = [
+        {
+            "wallet_address": address,
+            "record_id": created[index].id,
+            "balance": values[0],
+            "energy": values[1],
+            "bandwidth": values[2],
+        }
+        for address, (values, _, index) in current.items()
+        if index is not None
+    ]
+    if snapshots:
+        await session.execute(_snapshot_upsert(session.get_bind().dialect.name), snapshots)
+
+    if HISTORY_ROLLUPS:
+        await _update_rollups(session, [
+            *((record, record.observations, record.created_at) for record in created if record.success),
+            # Repeat sightings count in the bucket of the change they confirm, as in the raw query.
+            *((updated[record_id], seen, updated[record_id].created_at) for record_id, seen in seen_again.items()),
+        ])
+
+    await session.commit()
+    return [created[ref] if inserted else updated[ref] for inserted, ref in slots]
+
+
+def _snapshot_upsert(dialect: str) -> Insert:
+    """INSERT ... ON CONFLICT (wallet_address) DO UPDATE for wallet_snapshots."""
+    stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(WalletSnapshot)
+    return stmt.on_conflict_do_update(
+        index_elements=[WalletSnapshot.wallet_address],
+        set_={column: stmt.excluded[column] for column in ("record_id", "balance", "energy", "bandwidth")},
+    )
+
+
+async def _update_rollups(session: AsyncSession, observations: Iterable[tuple[WalletRequest, int, datetime]]) -> None:
+    """
+    Adds observations to the history rollups, one upsert row per address and bucket.
+
+    Args:
+        session (AsyncSession): Database session; the caller commits.
+        observations (Iterable[tuple[WalletRequest, int, datetime]]): Successful record,
+            how many times it was observed and when.
+    """
+    rows: dict[tuple, dict] = {}
+    for record, count, seen_at in observations:
+        for bucket in HISTORY_ROLLUP_BUCKETS:
+            key = (record.wallet_address, bucket, bucket_start(seen_at, bucket))
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {
+                    "wallet_address": key[0], "bucket": bucket, "bucket_start": key[2], "count": 0, "last_id": 0,
+                }
+                for metric in HISTORY_METRICS:
+                    value = getattr(record, metric)
+                    row.update({f"{metric}_min": value, f"{metric}_max": value, f"{metric}_sum": 0.0})
+            row["count"] += count
+            newest = record.id >= row["last_id"]
+            row["last_id"] = max(row["last_id"], record.id)
+            for metric in HISTORY_METRICS:
+                value = getattr(record, metric)
+                row[f"{metric}_min"] = min(row[f"{metric}_min"], value)
+                row[f"{metric}_max"] = max(row[f"{metric}_max"], value)
+                row[f"{metric}_sum"] += value * count
+                if newest:
+                    row[f"{metric}_last"] = value
+    if rows:
+        await session.execute(_rollup_upsert(session.get_bind().dialect.name), list(rows.values()))
+
+
+def _rollup_upsert(dialect: str) -> Insert:
+    """INSERT ... ON CONFLICT DO UPDATE merging new observations into wallet_history_rollups."""
+    postgres = dialect == "postgresql"
+    stmt = (postgresql.insert if postgres else sqlite.insert)(WalletHistoryRollup)
+    table, excluded = WalletHistoryRollup.__table__, stmt.excluded
+    # Two-argument min()/max() are scalar functions in SQLite.
+    least, greatest = (func.least, func.greatest) if postgres else (func.min, func.max)
+    newer = excluded.last_id >= table.c.last_id
+    set_ = {"count": table.c["count"] + excluded["count"], "last_id": greatest(table.c.last_id, excluded.last_id)}
+    for metric in HISTORY_METRICS:
+        set_[f"{metric}_min"] = least(table.c[f"{metric}_min"], excluded[f"{metric}_min"])
+        set_[f"{metric}_max"] = greatest(table.c[f"{metric}_max"], excluded[f"{metric}_max"])
+        set_[f"{metric}_sum"] = table.c[f"{metric}_sum"] + excluded[f"{metric}_sum"]
+        set_[f"{metric}_last"] = case((newer, excluded[f"{metric}_last"]), else_=table.c[f"{metric}_last"])
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.wallet_address, table.c.bucket, table.c.bucket_start],
+        set_=set_,
+    )
+
+
+def bucket_start(moment: datetime, bucket: str) -> datetime:
+    """Return the start of the UTC bucket of the given size containing `moment`."""
+    moment = moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+    if bucket == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def get_wallet_history(
+    session: AsyncSession,
+    wallet_address: str,
+    bucket: str,
+    created_from: datetime,
+    created_to: datetime,
+) -> list[dict]:
+    """
+    Aggregates the successful records of a wallet into time buckets.
+
+    Reads the rollup table when HISTORY_ROLLUPS covers the bucket size, and
+    otherwise groups the raw records in SQL over the
+    `(wallet_address, created_at, id)` index. Either way the result has one
+    row per non-empty bucket. In delta storage history is change-time only:
+    a record and all its repeat sightings count in the bucket of its
+    `created_at`, so buckets without a change are empty.
+
+    Args:
+        session (AsyncSession): Database session.
+        wallet_address (str): Wallet address.
+        bucket (str): "minute", "hour" or "day".
+        created_from (datetime): Inclusive lower bound (UTC). Rollups start at its bucket.
+        created_to (datetime): Exclusive upper bound (UTC).
+
+    Returns:
+        list[dict]: `bucket_start`, `count` and min/max/avg/last of each metric, oldest bucket first.
+    """
+    if HISTORY_ROLLUPS and bucket in HISTORY_ROLLUP_BUCKETS:
+        stmt = _rollup_history_query(wallet_address, bucket, bucket_start(created_from, bucket), created_to)
+    else:
+        stmt = _raw_history_query(session.get_bind().dialect.name, wallet_address, bucket, created_from, created_to)
+    rows = (await session.execute(stmt)).mappings().all()
+    return [{**row, "bucket_start": bucket_start(row["bucket_start"], bucket)} for row in rows]
+
+
+def _bucket_expression(dialect: str, bucket: str, column):
+    """SQL expression truncating a timestamp column to its UTC bucket."""
+    if dialect == "sqlite":
+        # created_at is stored as "YYYY-MM-DD HH:MM:SS.ffffff" in UTC.
+        formats = {"minute": "%Y-%m-%d %H:%M:00", "hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+        return type_coerce(func.strftime(formats[bucket], column), DateTime())
+    return type_coerce(func.date_trunc(bucket, func.timezone("UTC", column)), DateTime())
+
+
+def _raw_history_query(dialect: str, wallet_address: str, bucket: str, created_from: datetime, created_to: datetime):
+    observations = WalletRequest.observations
+    bucket_column = _bucket_expression(dialect, bucket, WalletRequest.created_at).label("bucket_start")
+    aggregates = [bucket_column, func.sum(observations).label("count"), func.max(WalletRequest.id).label("last_id")]
+    for metric in HISTORY_METRICS:
+        column = WalletRequest.__table__.c[metric]
+        aggregates += [
+            func.min(column).label(f"{metric}_min"),
+            func.max(column).label(f"{metric}_max"),
+            (func.sum(cast(column, Float) * observations) / func.sum(observations)).label(f"{metric}_avg"),
+        ]
+    buckets = (
+        select(*aggregates)
+        .where(
+            WalletRequest.wallet_address == wallet_address,
+            WalletRequest.success.is_(True),
+            WalletRequest.created_at >= created_from,
+            WalletRequest.created_at < created_to,
+        )
+        .group_by(bucket_column)
+        .subquery()
+    )
+    # The newest record of each bucket provides the "last" values: one lookup per bucket.
+    return (
+        select(
+            buckets.c.bucket_start,
+            buckets.c["count"],
+            *(
+                column
+                for metric in HISTORY_METRICS
+                for column in (
+                    buckets.c[f"{metric}_min"],
+                    buckets.c[f"{metric}_max"],
+                    buckets.c[f"{metric}_avg"],
+                    WalletRequest.__table__.c[metric].label(f"{metric}_last"),
+                )
+            ),
+        )
+        .join_from(buckets, WalletRequest, WalletRequest.id == buckets.c.last_id)
+        .order_by(buckets.c.bucket_start)
+    )
+
+
+def _rollup_history_query(wallet_address: str, bucket: str, created_from: datetime, created_to: datetime):
+    table = WalletHistoryRollup.__table__
+    columns = [table.c.bucket_start, table.c["count"]]
+    for metric in HISTORY_METRICS:
+        columns += [
+            table.c[f"{metric}_min"],
+            table.c[f"{metric}_max"],
+            (table.c[f"{metric}_sum"] / table.c["count"]).label(f"{metric}_avg"),
+            table.c[f"{metric}_last"],
+        ]
+    return (
+        select(*columns)
+        .where(
+            table.c.wallet_address == wallet_address,
+            table.c.bucket == bucket,
+            table.c.bucket_start >= created_from,
+            table.c.bucket_start < created_to,
+        )
+        .order_by(table.c.bucket_start)
+    )
+
+
+async def get_oldest_record_time(session: AsyncSession) -> datetime | None:
+    """
+    Retrieves the creation time of the oldest wallet record.
+
+    Returns:
+        datetime | None: Its `created_at` (UTC), or None if the table is empty.
+    """
+    oldest = await session.scalar(select(func.min(WalletRequest.created_at)))
+    if oldest is not None and oldest.tzinfo is None:
+        oldest = oldest.replace(tzinfo=timezone.utc)
+    return oldest
+
+
+async def get_records_between(
+    session: AsyncSession,
+    created_from: datetime,
+    created_to: datetime,
+    limit: int,
+) -> Sequence[RowMapping]:
+    """
+    Retrieves up to `limit` records of a `[created_from, created_to)` range, oldest first.
+
+    Returns:
+        Sequence[RowMapping]: All columns of each record.
+    """
+    result = await session.execute(
+        select(*WalletRequest.__table__.columns)
+        .where(WalletRequest.created_at >= created_from, WalletRequest.created_at < created_to)
+        .order_by(WalletRequest.created_at, WalletRequest.id)
+        .limit(limit)
+    )
+    return result.mappings().all()
+
+
+async def delete_wallet_records(session: AsyncSession, record_ids: Sequence[int]) -> None:
+    """
+    Deletes wallet records and the delta snapshots pointing at them, in one transaction.
+
+    An address whose snapshot is removed gets a new record on its next lookup.
+
+    Args:
+        session (AsyncSession): Database session.
+        record_ids (Sequence[int]): Ids of the records to delete.
+    """
+    await session.execute(delete(WalletSnapshot).where(WalletSnapshot.record_id.in_(record_ids)))
+    await session.execute(delete(WalletRequest).where(WalletRequest.id.in_(record_ids)))
+    await session.commit()
+
+
+async def wallet_record_exists(session: AsyncSession, record_id: int) -> bool:
+    """Whether a wallet record with this id is stored."""
+    return await session.scalar(select(WalletRequest.id).where(WalletRequest.id == record_id)) is not None
+
+
+async def create_failure_records(session: AsyncSession, rows: Sequence[dict]) -> None:
+    """
+    Stores aggregated failure counters with a single multi-row insert.
+
+    Args:
+        session (AsyncSession): Database session.
+        rows (Sequence[dict]): Column values of WalletFailure rows.
+    """
+    logger.info(f"Saving {len(rows)} failure counters")
+
+    if not rows:
+        return
+    await session.execute(insert(WalletFailure), list(rows))
+    await session.commit()
+
+
+async def add_watched_wallet(
+    session: AsyncSession,
+    wallet_address: str,
+    label: str | None = None,
+) -> WatchedWallet:
+    """
+    Adds an address to the watchlist, or updates the label of a watched one.
+
+    Args:
+        session (AsyncSession): Database session.
+        wallet_address (str): Wallet address.
+        label (str | None, optional): Free-form description. Kept when None.
+
+    Returns:
+        WatchedWallet: The watchlist entry.
+    """
+    entry = await session.get(WatchedWallet, wallet_address)
+    if entry is None:
+        entry = WatchedWallet(wallet_address=wallet_address, label=label, hits=0.0)
+        session.add(entry)
+    elif label is not None:
+        entry.label = label
+    await session.commit()
+    return entry
+
+
+async def get_watched_wallets(session: AsyncSession) -> Sequence[WatchedWallet]:
+    """
+    Retrieves the whole watchlist, oldest entries first.
+
+    Args:
+        session (AsyncSession): Database session.
+
+    Returns:
+        Sequence[WatchedWallet]: All watchlist entries.
+    """
+    result = await session.scalars(select(WatchedWallet).order_by(WatchedWallet.created_at))
+    return result.all()
+
+
+async def delete_watched_wallet(session: AsyncSession, wallet_address: str) -> bool:
+    """
+    Removes an address from the watchlist.
+
+    Args:
+        session (AsyncSession): Database session.
+        wallet_address (str): Wallet address.
+
+    Returns:
+        bool: Whether the address was watched.
+    """
+    result = await session.execute(delete(WatchedWallet).where(WatchedWallet.wallet_address == wallet_address))
+    await session.commit()
+    return result.rowcount > 0
+
+
+async def update_watched_wallets(session: AsyncSession, rows: Sequence[dict]) -> None:
+    """
+    Stores the refresh state of several watchlist entries in one executemany.
+
+    Args:
+        session (AsyncSession): Database session.
+        rows (Sequence[dict]): `wallet_address` plus the columns to update.
+    """
+    if not rows:
+        return
+    await session.execute(update(WatchedWallet), list(rows))
+    await session.commit()
+
+
+async def get_block_cursor(session: AsyncSession, name: str) -> int | None:
+    """
+    Retrieves the last processed block number of a block follower.
+
+    Args:
+        session (AsyncSession): Database session.
+        name (str): Follower name.
+
+    Returns:
+        int | None: Block number, or None if the follower has not run yet.
+    """
+    return await session.scalar(select(BlockCursor.block_number).where(BlockCursor.name == name))
+
+
+async def save_block_cursor(session: AsyncSession, name: str, block_number: int) -> None:
+    """
+    Stores the last processed block number of a block follower.
+
+    Args:
+        session (AsyncSession): Database session.
+        name (str): Follower name.
+        block_number (int): Last processed block.
+    """
+    cursor = await session.get(BlockCursor, name)
+    if cursor is None:
+        session.add(BlockCursor(name=name, block_number=block_number))
+    else:
+        cursor.block_number = block_number
+    await session.commit()
+
+
+def wallet_record_values(
+    data: WalletOut,
+    success: bool = True,
+    error_message: str | None = None
+) -> dict:
+    """
+    Builds the column values of a wallet record for bulk inserts.
+
+    Args:
+        data (WalletOut): Parsed wallet data.
+        success (bool, optional): Indicates if the retrieval was successful. Defaults to True.
+        error_message (str | None, optional): Error description if failed. Defaults to None.
+
+    Returns:
+        dict: Column values keyed by attribute name.
+    """
+    return {
+        **data.model_dump(),
+        "success": success,
+        "error_message": error_message,
+    }
+
+
 async def get_wallet_records(
     session: AsyncSession,
     limit: int = 10,
     offset: int = 0,
-) -> Sequence[WalletRequest]:
+    after: tuple[datetime, int] | None = None,
+    filters: RecordFilters | None = None,
+) -> Sequence[RowMapping]:
     """
-    Retrieves wallet records with pagination.
+    Retrieves wallet records, newest first, with offset or keyset pagination.
+
+    Only the WalletDB columns are selected and returned as plain row mappings,
+    so no ORM entities are built for the page.
 
     Args:
         session (AsyncSession): Database session.
         limit (int, optional): Number of records to retrieve. Defaults to 10.
         offset (int, optional): Number of records to skip. Defaults to 0.
+        after (tuple[datetime, int] | None, optional): `(created_at, id)` of the last
+            record of the previous page. When given, the page starts right after it
+            using the `(created_at, id)` index and `offset` is ignored.
+        filters (RecordFilters | None, optional): Address, success and time range filters.
+
+    Returns:
+        Sequence[RowMapping]: Retrieved records keyed by WalletDB field name.
+    """
+    stmt = apply_record_filters(
+        select(*RECORD_COLUMNS)
+        .order_by(WalletRequest.created_at.desc(), WalletRequest.id.desc())
+        .limit(limit),
+        filters,
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(WalletRequest.created_at, WalletRequest.id) < tuple_(*after))
+    else:
+        stmt = stmt.offset(offset)
+
+    result = await session.execute(stmt)
+    return result.mappings().all()
+
+
+async def stream_wallet_records(
+    session: AsyncSession,
+    filters: RecordFilters | None = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[Sequence[RowMapping]]:
+    """
+    Streams wallet records, oldest first, through a server-side cursor.
+
+    Rows are plain column mappings fetched `chunk_size` at a time, so memory
+    use does not grow with the size of the result.
+
+    Args:
+        session (AsyncSession): Database session.
+        filters (RecordFilters | None, optional): Address, success and time range filters.
+        chunk_size (int, optional): Rows fetched per round trip. Defaults to 1000.
+
+    Yields:
+        Sequence[RowMapping]: Consecutive chunks of records.
+    """
+    stmt = apply_record_filters(
+        select(*WalletRequest.__table__.columns)
+        .order_by(WalletRequest.created_at, WalletRequest.id)
+        .execution_options(yield_per=chunk_size),
+        filters,
+    )
+    result = await session.stream(stmt)
+    async for chunk in result.mappings().partitions(chunk_size):
+        yield chunk
+
+
+async def get_latest_wallet_record(
+    session: AsyncSession,
+    wallet_address: str,
+) -> WalletRequest | None:
+    """
+    Retrieves the newest successful record of a wallet.
+
+    Args:
+        session (AsyncSession): Database session.
+        wallet_address (str): Wallet address.
 
     Returns:
-        Sequence[WalletRequest]: List of retrieved records.
+        WalletRequest | None: The latest successful record, or None if there is none.
     """
     result = await session.execute(
         select(WalletRequest)
-        .order_by(WalletRequest.created_at.desc())
-        .offset(offset)
-        .limit(limit)
+        .where(WalletRequest.wallet_address == wallet_address, WalletRequest.success.is_(True))
+        .order_by(WalletRequest.created_at.desc(), WalletRequest.id.desc())
+        .limit(1)
     )
-    return result.scalars().all()
+    return result.scalars().first()
+
+
+def apply_record_filters(stmt: Select, filters: RecordFilters | None) -> Select:
+    """
+    Adds WHERE clauses for the given record filters to a wallet_requests query.
+
+    Args:
+        stmt (Select): Query over WalletRequest.
+        filters (RecordFilters | None): Filters to apply; None leaves the query unchanged.
+
+    Returns:
+        Select: The filtered query.
+    """
+    if filters is None:
+        return stmt
+    if filters.wallet_address is not None:
+        stmt = stmt.where(WalletRequest.wallet_address == filters.wallet_address)
+    if filters.success is not None:
+        stmt = stmt.where(WalletRequest.success.is_(filters.success))
+    if filters.created_from is not None:
+        stmt = stmt.where(WalletRequest.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        stmt = stmt.where(WalletRequest.created_at < filters.created_to)
+    return stmt
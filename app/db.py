@@ -1,15 +1,106 @@
-import os
-from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import time
+from typing import AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
-load_dotenv()
+from app.config import (
+    DATABASE_READ_RETRY_INTERVAL,
+    DATABASE_READ_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_READ_MAX_OVERFLOW,
+    DB_READ_POOL_SIZE,
+)
+from app.logger import logger
+
+
+def create_engine(url: str, pool_size: int, max_overflow: int, pre_ping: bool = False) -> AsyncEngine:
+    """Create an async engine with the configured pool sizing."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single static connection; there is no pool to size.
+        return create_async_engine(url, echo=False)
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=pre_ping,
+    )
+
+
+# Engines are created by `init_engines()` from the application lifespan, not at
+# import. The session factories exist from the start and are bound then.
+engine: AsyncEngine | None = None
+async_session = async_sessionmaker(expire_on_commit=False)
+
+# Optional read replica; the factory is None when DATABASE_READ_URL is not set.
+read_engine: AsyncEngine | None = None
+read_session = async_sessionmaker(expire_on_commit=False) if DATABASE_READ_URL else None
+
+
+def init_engines() -> AsyncEngine:
+    """
+    Create the primary engine, and the replica engine if configured, and bind the session factories.
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+    Does nothing when the engines already exist.
 
-# Create asynchronous engine and session factory
-engine = create_async_engine(DATABASE_URL, echo=False)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+    Returns:
+        AsyncEngine: The primary engine.
+    """
+    global engine, read_engine
+    if engine is None:
+        engine = create_engine(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+        async_session.configure(bind=engine)
+        if read_session is not None:
+            # Pooled replica connections are pre-pinged so a failed-over replica is noticed.
+            read_engine = create_engine(DATABASE_READ_URL, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW, pre_ping=True)
+            read_session.configure(bind=read_engine)
+    return engine
+
+
+async def warm_up_engine(target: AsyncEngine, connections: int) -> int:
+    """
+    Open pooled connections ahead of the first requests.
+
+    Args:
+        target (AsyncEngine): Engine whose pool is filled.
+        connections (int): Connections to open at once, capped at the pool size.
+
+    Returns:
+        int: Number of connections opened and returned to the pool.
+    """
+    size = getattr(target.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = await target.connect()
+            opened.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+async def dispose_engines() -> None:
+    """Close all pooled connections of the engines and forget them."""
+    global engine, read_engine
+    for current in (engine, read_engine):
+        if current is not None:
+            await current.dispose()
+    engine = read_engine = None
 
 
 class Base(DeclarativeBase):
@@ -17,7 +108,68 @@ class Base(DeclarativeBase):
     pass
 
 
+class ReplicaState:
+    """Tracks whether the read replica may be used, backing off after connection failures."""
+
+    def __init__(self, retry_interval: float = DATABASE_READ_RETRY_INTERVAL):
+        self.retry_interval = retry_interval
+        self.down_until = 0.0
+        self.fallbacks = 0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, error: Exception) -> None:
+        if self.available():
+            logger.warning(f"Read replica unavailable, reading from primary for {self.retry_interval}s: {error}")
+        self.down_until = time.monotonic() + self.retry_interval
+
+
+replica = ReplicaState()
+
+
 async def get_session() -> AsyncSession:
     """Dependency that provides an async SQLAlchemy session."""
     async with async_session() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency that provides the session factory, for work outliving the request scope."""
+    return async_session
+
+
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency that provides a session for read-only queries.
+
+    Uses the read replica when one is configured and reachable, otherwise
+    the primary. A failed replica connection switches reads to the primary
+    for DATABASE_READ_RETRY_INTERVAL seconds.
+    """
+    session = await _open_read_session()
+    async with session:
+        yield session
+
+
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency that provides the read session factory, for reads outliving the request scope."""
+    if read_session is not None and replica.available():
+        return read_session
+    return async_session
+
+
+async def _open_read_session() -> AsyncSession:
+    if read_session is not None and replica.available():
+        session = read_session()
+        try:
+            # Check a connection out now so an unreachable replica is detected here.
+            await session.connection()
+            return session
+        except (OSError, SQLAlchemyError) as e:
+            await session.close()
+            replica.mark_down(e)
+            replica.fallbacks += 1
+    elif read_session is not None:
+        replica.fallbacks += 1
+    return async_session()
@@ -1,9 +1,55 @@
 from app.tron import TronClient
-from app.db import get_session
+from app.db import async_session, get_read_session, get_read_session_factory, get_session, get_session_factory
+from app.blocks import BlockFollower
+from app.config import PROFILE_DIR, PROFILE_KEEP, RETENTION_ARCHIVE_DIR
+from app.failures import FailureTracker
+from app.profiling import ProfileStore
+from app.retention import ArchiveStore, RetentionJob
+from app.subscriptions import SubscriptionHub
+from app.watchlist import Watchlist
+from app.writer import RecordWriter
 
-__all__ = ["get_session", "get_tron_client"]
+__all__ = [
+    "get_session",
+    "get_session_factory",
+    "get_read_session",
+    "get_read_session_factory",
+    "get_tron_client",
+    "current_tron_client",
+    "is_ready",
+    "set_ready",
+    "close_tron_client",
+    "get_record_writer",
+    "start_record_writer",
+    "stop_record_writer",
+    "get_failure_tracker",
+    "start_failure_tracker",
+    "stop_failure_tracker",
+    "get_profile_store",
+    "get_watchlist",
+    "start_watchlist",
+    "stop_watchlist",
+    "get_block_follower",
+    "start_block_follower",
+    "stop_block_follower",
+    "get_subscription_hub",
+    "close_subscription_hub",
+    "get_archive_store",
+    "get_retention_job",
+    "start_retention_job",
+    "stop_retention_job",
+]
 
 _tron_client: TronClient | None = None
+_record_writer: RecordWriter | None = None
+_failure_tracker = FailureTracker(async_session)
+_watchlist = Watchlist(async_session)
+_block_follower = BlockFollower(async_session, _watchlist)
+_subscription_hub = SubscriptionHub(async_session)
+_profile_store = ProfileStore(PROFILE_DIR, PROFILE_KEEP)
+_archive_store = ArchiveStore(RETENTION_ARCHIVE_DIR)
+_retention_job = RetentionJob(async_session, _archive_store)
+_ready = False
 
 
 def get_tron_client() -> TronClient:
@@ -11,3 +57,118 @@ def get_tron_client() -> TronClient:
     if _tron_client is None:
         _tron_client = TronClient()
     return _tron_client
+
+
+def is_ready() -> bool:
+    """Whether startup warm-up has finished and requests are served at steady-state latency."""
+    return _ready
+
+
+def set_ready(ready: bool) -> None:
+    global _ready
+    _ready = ready
+
+
+def current_tron_client() -> TronClient | None:
+    """Return the shared Tron client if it has been created, without creating it."""
+    return _tron_client
+
+
+async def close_tron_client() -> None:
+    """Release the pooled connections of the shared Tron client, if any."""
+    global _tron_client
+    if _tron_client is not None:
+        await _tron_client.close()
+        _tron_client = None
+
+
+def get_record_writer() -> RecordWriter | None:
+    """Return the running write-behind writer, or None when write-behind is disabled."""
+    return _record_writer
+
+
+async def start_record_writer() -> None:
+    global _record_writer
+    _record_writer = RecordWriter(async_session)
+    await _record_writer.start()
+
+
+async def stop_record_writer() -> None:
+    """Flush pending records and stop the write-behind writer, if running."""
+    global _record_writer
+    if _record_writer is not None:
+        await _record_writer.stop()
+        _record_writer = None
+
+
+def get_failure_tracker() -> FailureTracker:
+    """Return the process-wide negative cache and failure counters."""
+    return _failure_tracker
+
+
+async def start_failure_tracker() -> None:
+    await _failure_tracker.start()
+
+
+async def stop_failure_tracker() -> None:
+    """Stop the periodic flush and write the remaining failure counters."""
+    await _failure_tracker.stop()
+
+
+def get_profile_store() -> ProfileStore:
+    """Return the directory of request profiling captures."""
+    return _profile_store
+
+
+def get_watchlist() -> Watchlist:
+    """Return the process-wide watchlist and its refresh scheduler."""
+    return _watchlist
+
+
+async def start_watchlist(tron: TronClient) -> None:
+    await _watchlist.start(tron)
+
+
+async def stop_watchlist() -> None:
+    await _watchlist.stop()
+
+
+def get_block_follower() -> BlockFollower:
+    """Return the block follower invalidating watched addresses."""
+    return _block_follower
+
+
+async def start_block_follower(tron: TronClient) -> None:
+    await _block_follower.start(tron)
+
+
+async def stop_block_follower() -> None:
+    await _block_follower.stop()
+
+
+def get_subscription_hub() -> SubscriptionHub:
+    """Return the process-wide fan-out of wallet change subscriptions."""
+    return _subscription_hub
+
+
+async def close_subscription_hub() -> None:
+    """Stop all subscription pollers and end open subscriptions."""
+    await _subscription_hub.close()
+
+
+def get_archive_store() -> ArchiveStore:
+    """Return the directory of archived wallet records."""
+    return _archive_store
+
+
+def get_retention_job() -> RetentionJob:
+    """Return the job archiving expired wallet records."""
+    return _retention_job
+
+
+async def start_retention_job() -> None:
+    await _retention_job.start()
+
+
+async def stop_retention_job() -> None:
+    await _retention_job.stop()
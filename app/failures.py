@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    FAILURE_FLUSH_INTERVAL,
+    FAILURE_MAX_PENDING,
+    FAILURE_ROW_POLICY,
+    NEGATIVE_CACHE_SIZE,
+    NEGATIVE_CACHE_TTL,
+)
+from app.crud import create_failure_records
+from app.logger import logger
+
+ROW_POLICIES = ("all", "first", "none")
+
+
+class FailureTracker:
+    """
+    Negative cache and aggregated accounting for failed wallet lookups.
+
+    Addresses rejected as invalid or not found (status 400) are remembered
+    for ``negative_ttl`` seconds so repeats are answered without any I/O.
+    Every failure, cached repeats included, is counted per (address, status,
+    error class); a background task writes one wallet_failures row per key
+    and flush interval, earlier when ``max_pending`` keys are waiting. The
+    row policy decides whether a failure that reached the Tron API also
+    gets its own wallet_requests row.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        policy: str = FAILURE_ROW_POLICY,
+        negative_ttl: float = NEGATIVE_CACHE_TTL,
+        negative_size: int = NEGATIVE_CACHE_SIZE,
+        flush_interval: float = FAILURE_FLUSH_INTERVAL,
+        max_pending: int = FAILURE_MAX_PENDING,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for flush sessions.
+            policy (str, optional): When failures reaching the Tron API get a wallet_requests
+                row: "all", "first" (first per key within a flush interval) or "none".
+            negative_ttl (float, optional): Seconds a 400 answer is remembered. ``0`` disables it.
+            negative_size (int, optional): Maximum number of remembered addresses.
+            flush_interval (float, optional): Seconds between counter flushes.
+            max_pending (int, optional): Number of pending keys that triggers an early flush.
+        """
+        if policy not in ROW_POLICIES:
+            raise ValueError(f"Unknown failure row policy: {policy!r}")
+        self.session_factory = session_factory
+        self.policy = policy
+        self.negative_ttl = negative_ttl
+        self.negative_size = negative_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._negative: OrderedDict[str, tuple[int, str, str, float]] = OrderedDict()
+        # (address, status_code, error_class) -> [count, first_seen, last_seen, last_message]
+        self._counters: dict[tuple[str, int, str], list] = {}
+        self._task: asyncio.Task | None = None
+        self._early_flush: asyncio.Task | None = None
+
+        self.negative_hits = 0
+        self.rows_suppressed = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of counters waiting to be flushed."""
+        return len(self._counters)
+
+    def check(self, address: str) -> tuple[int, str, str] | None:
+        """
+        Look up a remembered rejection of ``address``.
+
+        A hit is counted like the failure it repeats but never asks for a
+        wallet_requests row.
+
+        Returns:
+            tuple[int, str, str] | None: Status code, error class and message of the
+                cached failure, or None when the address must be looked up.
+        """
+        entry = self._negative.get(address)
+        if entry is None:
+            return None
+        status_code, error_class, message, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._negative[address]
+            return None
+        self.negative_hits += 1
+        self._count(address, status_code, error_class, message)
+        return status_code, error_class, message
+
+    def record(self, address: str, status_code: int, error_class: str, message: str) -> bool:
+        """
+        Count a failed lookup and remember 400 answers in the negative cache.
+
+        Args:
+            address (str): Requested wallet address.
+            status_code (int): HTTP status returned to the client.
+            error_class (str): Exception class name of the failure.
+            message (str): Error message returned to the client.
+
+        Returns:
+            bool: Whether the failure should also be stored as a wallet_requests row.
+        """
+        if status_code == 400 and self.negative_ttl > 0 and address not in self._negative:
+            self._negative[address] = (status_code, error_class, message, time.monotonic() + self.negative_ttl)
+            while len(self._negative) > self.negative_size:
+                self._negative.popitem(last=False)
+
+        first = self._count(address, status_code, error_class, message)
+        write_row = self.policy == "all" or (self.policy == "first" and first)
+        if not write_row:
+            self.rows_suppressed += 1
+        return write_row
+
+    def _count(self, address: str, status_code: int, error_class: str, message: str) -> bool:
+        """Bump the counter of a failure; returns whether it is the first of its key since the last flush."""
+        now = datetime.now(timezone.utc)
+        key = (address, status_code, error_class)
+        counter = self._counters.get(key)
+        if counter is not None:
+            counter[0] += 1
+            counter[2] = now
+            counter[3] = message
+            return False
+        self._counters[key] = [1, now, now, message]
+        if len(self._counters) >= self.max_pending and (self._early_flush is None or self._early_flush.done()):
+            # Many distinct failing addresses: don't wait for the interval.
+            self._early_flush = asyncio.get_running_loop().create_task(self.flush())
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write the pending counters to wallet_failures and reset them.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if not self._counters:
+            return 0
+        counters, self._counters = self._counters, {}
+        rows = [
+            {
+                "wallet_address": address,
+                "status_code": status_code,
+                "error_class": error_class,
+                "count": count,
+                "first_seen": first_seen,
+                "last_seen": last_seen,
+                "last_message": last_message,
+            }
+            for (address, status_code, error_class), (count, first_seen, last_seen, last_message) in counters.items()
+        ]
+        try:
+            async with self.session_factory() as session:
+                await create_failure_records(session, rows)
+        except Exception as e:
+            logger.error(f"Flush of {len(rows)} failure counters failed: {e}")
+            return 0
+        return len(rows)
+
+    async def start(self) -> None:
+        """Start the periodic flush task."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write the remaining counters."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._early_flush is not None:
+            await self._early_flush
+            self._early_flush = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
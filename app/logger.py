@@ -1,9 +1,207 @@
-from loguru import logger
+import json
+import re
 import sys
+import time
+import uuid
+from contextvars import ContextVar
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    APP_ENV,
+    LOG_ENQUEUE,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_REQUESTS,
+    LOG_SAMPLE_BURST,
+    LOG_SAMPLE_RATE,
+)
+from app.metrics import stage_timings
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | {extra[request_id]} | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# ID of the request being handled, for code that needs it outside log records.
+current_request_id: ContextVar[str | None] = ContextVar("current_request_id", default=None)
+
+
+class SamplingFilter:
+    """
+    Rate limit for high-volume log calls.
+
+    Records below WARNING are let through at most `rate` per second (with
+    bursts of `burst`) per call site; warnings and errors always pass. The
+    decision is made once per record, so every sink agrees on it.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.dropped = 0
+        self._buckets: dict[tuple[str, int], list[float]] = {}
+
+    def __call__(self, record) -> bool:
+        decisions = record["extra"].setdefault("_sampled", {})
+        keep = decisions.get(id(self))
+        if keep is None:
+            keep = decisions[id(self)] = self._admit(record)
+        return keep
+
+    def _admit(self, record) -> bool:
+        if self.rate <= 0 or record["level"].no >= 30:
+            return True
+        key = (record["name"], record["line"])
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            self.dropped += 1
+            return False
+        bucket[0] -= 1
+        return True
+
+
+sampling = SamplingFilter(LOG_SAMPLE_RATE, LOG_SAMPLE_BURST)
+_file_sink: int | None = None
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    enqueue: bool = LOG_ENQUEUE,
+    development: bool = APP_ENV == "development",
+    sink=None,
+) -> None:
+    """
+    (Re)configure the stdout sink.
+
+    Args:
+        level (str, optional): Minimum level.
+        fmt (str, optional): "text" or "json" (one JSON object per line).
+        enqueue (bool, optional): Hand records to a background thread instead of
+            writing them on the event loop.
+        development (bool, optional): Enables backtrace and diagnose (variable
+            values in tracebacks); keep it off in production.
+        sink (optional): Destination, stdout when omitted.
+    """
+    global _options
+    _options = {
+        "level": level,
+        "format": _json_format if fmt == "json" else TEXT_FORMAT,
+        "enqueue": enqueue,
+        "backtrace": development,
+        "diagnose": development,
+        "filter": sampling,
+        "colorize": False if fmt == "json" else None,
+    }
+    logger.remove()
+    logger.configure(extra={"request_id": "-"})
+    logger.add(sink or sys.stdout, **_options)
+
+
+def start_file_logging() -> None:
+    """Add the LOG_FILE sink; called on application startup rather than at import."""
+    global _file_sink
+    if _file_sink is None and LOG_FILE:
+        options = {**_options, "colorize": False}
+        _file_sink = logger.add(LOG_FILE, rotation="1 MB", retention="10 days", **options)
+
+
+async def stop_file_logging() -> None:
+    """Flush pending messages and close the LOG_FILE sink."""
+    global _file_sink
+    await logger.complete()
+    if _file_sink is not None:
+        logger.remove(_file_sink)
+        _file_sink = None
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware tagging every log record of a request with its request ID.
+
+    The ID comes from a well-formed X-Request-ID header or is generated, and is
+    echoed in the response. With LOG_REQUESTS each request ends with a record
+    carrying its status, duration and stage timings.
+    """
+
+    def __init__(self, app: ASGIApp, log_requests: bool = LOG_REQUESTS):
+        self.app = app
+        self.log_requests = log_requests
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        started = time.perf_counter()
+        timings: dict[str, float] = {}
+        token = stage_timings.set(timings)
+        id_token = current_request_id.set(request_id)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            await send(message)
+
+        with logger.contextualize(request_id=request_id):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                stage_timings.reset(token)
+                current_request_id.reset(id_token)
+                if self.log_requests:
+                    duration_ms = round(1000 * (time.perf_counter() - started), 2)
+                    logger.bind(
+                        method=scope["method"],
+                        path=scope["path"],
+                        status=status_code,
+                        duration_ms=duration_ms,
+                        stages_ms={name: round(1000 * value, 2) for name, value in timings.items()},
+                    ).info(f"← {scope['method']} {scope['path']} {status_code} in {duration_ms}ms")
+
+
+def _request_id(scope: Scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+def _json_format(record) -> str:
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        **{key: value for key, value in record["extra"].items() if not key.startswith("_")},
+    }
+    if record["exception"] is not None:
+        exc_type, exc_value, _ = record["exception"]
+        payload["exception"] = f"{getattr(exc_type, '__name__', exc_type)}: {exc_value}"
+    record["extra"]["_json"] = json.dumps(payload, default=str)
+    return "{extra[_json]}\n"
 
-logger.remove()
-logger.add(sys.stdout, level="INFO", backtrace=True, diagnose=True)
 
-logger.add("logs/app.log", rotation="1 MB", retention="10 days", level="INFO")
+_options: dict = {}
+configure_logging()
 
-__all__ = ["logger"]
+__all__ = ["logger", "configure_logging", "current_request_id", "start_file_logging", "stop_file_logging", "RequestContextMiddleware"]
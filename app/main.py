@@ -1,9 +1,99 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from app.routes import address
+from app import db
+from app.config import (
+    ADMIN_TOKEN,
+    BLOCK_FOLLOWER,
+    DB_WARMUP_CONNECTIONS,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SLOW_THRESHOLD,
+    RETENTION_JOB,
+    TRON_WARMUP_CONNECTIONS,
+    WARMUP_TIMEOUT,
+    WRITE_BEHIND,
+)
+from app.deps import (
+    close_subscription_hub,
+    close_tron_client,
+    get_profile_store,
+    get_tron_client,
+    set_ready,
+    start_block_follower,
+    start_failure_tracker,
+    start_record_writer,
+    start_retention_job,
+    start_watchlist,
+    stop_block_follower,
+    stop_failure_tracker,
+    stop_record_writer,
+    stop_retention_job,
+    stop_watchlist,
+)
+from app.logger import RequestContextMiddleware, logger, start_file_logging, stop_file_logging
+from app.metrics import MetricsMiddleware, instrument_pool
+from app.profiling import ProfilingMiddleware
+from app.routes import address, admin, health, metrics, subscriptions, watchlist
+from app.tron import TronClient
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_file_logging()
+    engine = db.init_engines()
+    instrument_pool(engine.pool)
+    if db.read_engine is not None:
+        instrument_pool(db.read_engine.pool)
+    tron = get_tron_client()
+    if WRITE_BEHIND:
+        await start_record_writer()
+    await start_failure_tracker()
+    await start_watchlist(tron)
+    if BLOCK_FOLLOWER:
+        await start_block_follower(tron)
+    if RETENTION_JOB:
+        await start_retention_job()
+    warm_up = asyncio.create_task(_warm_up(tron))
+    yield
+    warm_up.cancel()
+    set_ready(False)
+    await close_subscription_hub()
+    await stop_retention_job()
+    await stop_block_follower()
+    await stop_watchlist()
+    await stop_failure_tracker()
+    await stop_record_writer()
+    await close_tron_client()
+    await db.dispose_engines()
+    await stop_file_logging()
+
+
+async def _warm_up(tron: TronClient) -> None:
+    """Pre-open database and Tron connections, then report the service as ready."""
+    started = time.perf_counter()
+    engines = [engine for engine in (db.engine, db.read_engine) if engine is not None]
+    try:
+        async with asyncio.timeout(WARMUP_TIMEOUT):
+            results = await asyncio.gather(
+                *(db.warm_up_engine(engine, DB_WARMUP_CONNECTIONS) for engine in engines),
+                tron.warm_up(TRON_WARMUP_CONNECTIONS),
+                return_exceptions=True,
+            )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Warm-up failed: {result}")
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s: {results}")
+    except TimeoutError:
+        logger.warning(f"Warm-up did not finish within {WARMUP_TIMEOUT}s")
+    set_ready(True)
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Tron Wallet Info Service",
     version="0.1.0",
     description="Fetch and store TRON wallet metrics from the blockchain.",
@@ -25,5 +115,23 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors()},
     )
 
+app.add_middleware(MetricsMiddleware)
+# Not installed at all unless enabled, so it costs nothing by default.
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_THRESHOLD > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=get_profile_store(),
+        sample_rate=PROFILE_SAMPLE_RATE,
+        slow_threshold=PROFILE_SLOW_THRESHOLD,
+    )
+# Added last so it wraps everything and each log record carries the request ID.
+app.add_middleware(RequestContextMiddleware)
+
 # Register address-related routes
 app.include_router(address.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(watchlist.router)
+app.include_router(subscriptions.router)
+# Without ADMIN_TOKEN every admin endpoint answers 404, so keep them out of the docs too.
+app.include_router(admin.router, include_in_schema=bool(ADMIN_TOKEN))
@@ -0,0 +1,287 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        for key, value in self._values.items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[_labels(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds, as Prometheus expects."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._values: dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        state = self._values.get(key)
+        if state is None:
+            # Per-bucket counts (non-cumulative, last slot is +Inf), sum, count.
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+
+class CallbackMetric:
+    """Metric whose samples are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, type: str, fn: Callable[[], Iterable[tuple[dict, float]]]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.fn = fn
+
+    def samples(self) -> Iterable[tuple[str, Labels, float]]:
+        for labels, value in self.fn():
+            yield self.name, _labels(labels), value
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter(name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._register(Gauge(name, help))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        type: str,
+        fn: Callable[[], Iterable[tuple[dict, float]]],
+    ) -> CallbackMetric:
+        """
+        Register a metric computed at scrape time.
+
+        Args:
+            name (str): Metric name.
+            help (str): Help text.
+            type (str): Prometheus type, "gauge" or "counter".
+            fn (Callable[[], Iterable[tuple[dict, float]]]): Returns (labels, value) pairs.
+        """
+        return self._register(CallbackMetric(name, help, type, fn))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{name}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by method, route and status code."
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route."
+)
+http_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+stage_duration = registry.histogram(
+    "wallet_stage_duration_seconds",
+    "Latency of request stages: validation, tron_fetch, db_write, db_read, serialization.",
+)
+wallet_errors = registry.counter(
+    "wallet_errors_total", "Failed wallet lookups by error class and status code."
+)
+db_pool_checkout = registry.histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a database connection from the pool."
+)
+
+
+class _RequestTiming:
+    __slots__ = ("start", "validated", "last_stage_end")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.validated = False
+        self.last_stage_end: float | None = None
+
+
+_request_timing: ContextVar[_RequestTiming | None] = ContextVar("request_timing", default=None)
+
+# Per-request stage durations in seconds, collected for the request log when set.
+stage_timings: ContextVar[dict[str, float] | None] = ContextVar("stage_timings", default=None)
+
+# Per-request (stage, started, ended) perf_counter spans, collected for profiling when set.
+stage_spans: ContextVar[list[tuple[str, float, float]] | None] = ContextVar("stage_spans", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a request stage into `wallet_stage_duration_seconds`.
+
+    Within a request handled by MetricsMiddleware the first stage also
+    records "validation" (request start until the handler's first stage)
+    and the middleware records "serialization" (end of the last stage until
+    the response starts).
+    """
+    timing = _request_timing.get()
+    started = time.perf_counter()
+    if timing is not None and not timing.validated:
+        timing.validated = True
+        stage_duration.observe(started - timing.start, stage="validation")
+    try:
+        yield
+    finally:
+        ended = time.perf_counter()
+        stage_duration.observe(ended - started, stage=name)
+        if timing is not None:
+            timing.last_stage_end = ended
+        timings = stage_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + ended - started
+        spans = stage_spans.get()
+        if spans is not None:
+            spans.append((name, started, ended))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and in-flight requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timing = _RequestTiming(started)
+        token = _request_timing.set(timing)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timing.last_stage_end is not None:
+                    stage_duration.observe(time.perf_counter() - timing.last_stage_end, stage="serialization")
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            _request_timing.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_requests.inc(method=scope["method"], route=path, status=str(status_code))
+            http_request_duration.observe(time.perf_counter() - started, method=scope["method"], route=path)
+
+
+def instrument_pool(pool) -> None:
+    """Record the time spent in `pool.connect()` into `db_pool_checkout_seconds`."""
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_checkout.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def executor_queue_depth() -> int:
+    """Number of jobs waiting in the event loop's default thread pool executor."""
+    executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    work_queue = getattr(executor, "_work_queue", None)
+    return work_queue.qsize() if work_queue is not None else 0
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,15 +1,61 @@
-from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Boolean, Index
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Boolean, Float, Index, LargeBinary, text
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime, timezone
+from tronpy.keys import to_base58check_address, to_raw_address
 from app.db import Base
 
 
+class TronAddress(TypeDecorator):
+    """
+    Wallet address stored in its compact binary form.
+
+    Base58Check addresses are stored as their 21 raw bytes (0x41 prefix)
+    instead of 34 characters. Any other string is stored as a 0x00 byte
+    followed by its UTF-8 text, so it still round-trips unchanged.
+    Conversion happens on bind and on load: queries and the API keep using
+    base58 strings.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect) -> bytes | None:
+        if value is None:
+            return None
+        return encode_address(value)
+
+    def process_result_value(self, value: bytes | None, dialect) -> str | None:
+        if value is None:
+            return None
+        return decode_address(bytes(value))
+
+
+def encode_address(address: str) -> bytes:
+    """Return the stored form of a wallet address."""
+    if len(address) == 34 and address.startswith("T"):
+        try:
+            raw = to_raw_address(address)
+        except ValueError:
+            raw = b""
+        if len(raw) == 21 and raw[0] == 0x41:
+            return raw
+    return b"\x00" + address.encode()
+
+
+def decode_address(raw: bytes) -> str:
+    """Return the wallet address of a stored value."""
+    if raw[:1] == b"\x00":
+        return raw[1:].decode()
+    return to_base58check_address(raw)
+
+
 class WalletRequest(Base):
     """Database model representing a single wallet request log."""
 
     __tablename__ = "wallet_requests"
 
     id = Column(Integer, primary_key=True, index=True)
-    wallet_address = Column(String, index=True, nullable=False)
+    wallet_address = Column(TronAddress, nullable=False)
 
     balance = Column(BigInteger, nullable=True)
     energy = Column(BigInteger, nullable=True)
@@ -18,8 +64,122 @@ class WalletRequest(Base):
     success = Column(Boolean, default=True, nullable=False)
     error_message = Column(String, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Delta storage: how often this snapshot was seen and when it was seen last.
+    # Not indexed, so the in-place updates stay cheap (HOT on PostgreSQL).
+    observations = Column(Integer, default=1, server_default=text("1"), nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Matches the (created_at DESC, id DESC) ordering used by keyset pagination.
+        Index("ix_wallet_requests_created_at_id", "created_at", "id"),
+        # Per-address history, newest first.
+        Index("ix_wallet_requests_address_created_at", "wallet_address", "created_at", "id"),
+        # Failure (or success) only listings.
+        Index("ix_wallet_requests_success_created_at", "success", "created_at", "id"),
+        # Latest successful snapshot per address; the included columns allow
+        # an index-only scan on PostgreSQL.
+        Index(
+            "ix_wallet_requests_latest_success",
+            "wallet_address", "created_at", "id",
+            postgresql_where=success.is_(True),
+            postgresql_include=[
+                "balance", "energy", "bandwidth", "success", "error_message", "observations", "last_seen_at",
+            ],
+            sqlite_where=success.is_(True),
+        ),
+    )
+
+
+class WalletSnapshot(Base):
+    """Database model holding the current snapshot of each address in delta storage mode."""
+
+    __tablename__ = "wallet_snapshots"
+
+    wallet_address = Column(TronAddress, primary_key=True)
+    record_id = Column(Integer, nullable=False)
+
+    balance = Column(BigInteger, nullable=True)
+    energy = Column(BigInteger, nullable=True)
+    bandwidth = Column(BigInteger, nullable=True)
+
+
+class WalletFailure(Base):
+    """Database model aggregating failed lookups per address and error over a flush interval."""
+
+    __tablename__ = "wallet_failures"
+
+    id = Column(Integer, primary_key=True)
+    wallet_address = Column(TronAddress, nullable=False)
+    error_class = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+
+    count = Column(BigInteger, nullable=False)
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+    last_message = Column(String, nullable=True)
 
     __table_args__ = (
-        Index("ix_wallet_requests_created_at", "created_at"),
+        Index("ix_wallet_failures_address_last_seen", "wallet_address", "last_seen"),
+    )
+
+
+class WatchedWallet(Base):
+    """Database model of an address kept fresh by the background watchlist refresher."""
+
+    __tablename__ = "watchlist"
+
+    wallet_address = Column(TronAddress, primary_key=True)
+    label = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Decaying count of lookups, persisted so priorities survive restarts.
+    hits = Column(Float, default=0.0, nullable=False)
+    last_refreshed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+
+
+class BlockCursor(Base):
+    """Database model holding the last processed block of a block follower."""
+
+    __tablename__ = "block_cursors"
+
+    name = Column(String, primary_key=True)
+    block_number = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
     )
+
+
+class WalletHistoryRollup(Base):
+    """
+    Database model of precomputed per-bucket aggregates of successful lookups.
+
+    Maintained on insert when HISTORY_ROLLUPS is enabled; one row per address,
+    bucket size and bucket start. Sums and the observation count give the average.
+    """
+
+    __tablename__ = "wallet_history_rollups"
+
+    wallet_address = Column(TronAddress, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    count = Column(BigInteger, nullable=False)
+    last_id = Column(Integer, nullable=False)
+
+    balance_min = Column(BigInteger, nullable=True)
+    balance_max = Column(BigInteger, nullable=True)
+    balance_sum = Column(Float, nullable=True)
+    balance_last = Column(BigInteger, nullable=True)
+    energy_min = Column(BigInteger, nullable=True)
+    energy_max = Column(BigInteger, nullable=True)
+    energy_sum = Column(Float, nullable=True)
+    energy_last = Column(BigInteger, nullable=True)
+    bandwidth_min = Column(BigInteger, nullable=True)
+    bandwidth_max = Column(BigInteger, nullable=True)
+    bandwidth_sum = Column(Float, nullable=True)
+    bandwidth_last = Column(BigInteger, nullable=True)
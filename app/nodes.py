@@ -0,0 +1,307 @@
+import asyncio
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from tronpy import AsyncTron
+from tronpy.exceptions import AddressNotFound, BlockNotFound
+from tronpy.providers.async_http import AsyncHTTPProvider
+
+from app.config import (
+    TRON_HEDGE_MIN_DELAY,
+    TRON_HEDGE_PERCENTILE,
+    TRON_NODE_FAILURE_THRESHOLD,
+    TRON_NODE_RECOVERY_TIME,
+    TRON_NODE_WINDOW,
+    TRON_RATE_LIMIT_RETRIES,
+    TRON_RETRY_AFTER_MAX,
+)
+from app.logger import logger
+from app.ratelimit import OutboundLimiter, RateLimitExceeded
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without a network call when no node of the pool may be tried."""
+
+
+class TronNode:
+    """
+    A single full-node endpoint with latency/error tracking and a circuit breaker.
+
+    The breaker opens after `failure_threshold` consecutive failures; while
+    open the node receives no requests at all. Once `recovery_time` has
+    passed, the first request to claim the node becomes the probe (half-open)
+    and concurrent requests keep skipping it until the probe's outcome closes
+    or re-opens the breaker.
+    """
+
+    def __init__(
+        self,
+        endpoint: str | None,
+        http: httpx.AsyncClient,
+        api_key: str | None,
+        timeout: float,
+        failure_threshold: int = TRON_NODE_FAILURE_THRESHOLD,
+        recovery_time: float = TRON_NODE_RECOVERY_TIME,
+        window: int = TRON_NODE_WINDOW,
+    ):
+        provider = AsyncHTTPProvider(endpoint, timeout=timeout, client=http, api_key=api_key)
+        self.endpoint = provider.endpoint_uri
+        self.client = AsyncTron(provider)
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failed calls among the recent ones."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def score(self) -> float:
+        """Routing score, lower is healthier: median latency inflated by the error rate."""
+        latency = self.latency_percentile(50) if self.latencies else 0.0
+        return latency * (1 + 10 * self.error_rate) + self.error_rate
+
+    def latency_percentile(self, pct: float) -> float:
+        """Nearest-rank percentile of recent successful call latencies, in seconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return ordered[int(rank) - 1]
+
+    def available(self, now: float) -> bool:
+        """Whether a request may be routed to this node: closed, or open and due for its probe."""
+        if self.state == CLOSED:
+            return True
+        return self.state == OPEN and now - self.opened_at >= self.recovery_time
+
+    def claim(self, now: float) -> bool:
+        """
+        Reserve the node for one request.
+
+        Returns:
+            bool: True when the request may be sent; an open node due for
+                recovery turns half-open and only this request gets through.
+        """
+        if not self.available(now):
+            return False
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+        return True
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info(f"Tron node {self.endpoint} recovered")
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Tron node {self.endpoint} circuit opened")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class NodePool:
+    """
+    Routes Tron API calls to the healthiest of several full nodes.
+
+    Calls go to the available node with the best score. A node failure fails
+    over to the next node; with hedging enabled a duplicate request is sent
+    to the next node once the primary is slower than its recent latency
+    percentile, and whichever answers first wins. Every attempt, hedges
+    included, passes through the outbound limiter.
+    """
+
+    def __init__(
+        self,
+        nodes: list[TronNode],
+        hedge_percentile: float = TRON_HEDGE_PERCENTILE,
+        hedge_min_delay: float = TRON_HEDGE_MIN_DELAY,
+        limiter: OutboundLimiter | None = None,
+        rate_limit_retries: int = TRON_RATE_LIMIT_RETRIES,
+        retry_after_max: float = TRON_RETRY_AFTER_MAX,
+    ):
+        """
+        Args:
+            nodes (list[TronNode]): Endpoints to route between.
+            hedge_percentile (float, optional): Latency percentile of the primary node after
+                which a hedged request is sent. ``0`` disables hedging.
+            hedge_min_delay (float, optional): Lower bound of the hedge delay in seconds.
+            limiter (OutboundLimiter | None, optional): Admission control for outbound calls.
+                No limiting when omitted.
+            rate_limit_retries (int, optional): Retries of a call answered with HTTP 429.
+            retry_after_max (float, optional): Upper bound for honoured Retry-After values.
+        """
+        if not nodes:
+            raise ValueError("NodePool needs at least one node")
+        self.nodes = nodes
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.limiter = limiter or OutboundLimiter(None, None)
+        self.rate_limit_retries = rate_limit_retries
+        self.retry_after_max = retry_after_max
+        self.hedges = 0
+        self.failovers = 0
+
+    def ranked(self) -> list[TronNode]:
+        """Available nodes in routing order, best score first; open and probing nodes are left out."""
+        now = time.monotonic()
+        return sorted((n for n in self.nodes if n.available(now)), key=lambda n: n.score)
+
+    async def call(self, fn: Callable[[AsyncTron], Awaitable[T]]) -> T:
+        """
+        Run a Tron API call on the pool.
+
+        Args:
+            fn (Callable[[AsyncTron], Awaitable[T]]): Issues the call on a node's client.
+
+        Returns:
+            T: Result of the first successful attempt.
+
+        Raises:
+            CircuitOpenError: If every node's circuit is open, without calling any node.
+            Exception: AddressNotFound or RateLimitExceeded as soon as they occur,
+                otherwise the last node failure once every node has been tried.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise CircuitOpenError("Tron API unavailable: circuit open for every node")
+        tasks: dict[asyncio.Task, TronNode] = {}
+        next_index = 0
+        hedge_delay = self._hedge_delay(candidates[0]) if len(candidates) > 1 else None
+        last_error: BaseException | None = None
+
+        def launch() -> None:
+            nonlocal next_index
+            node = candidates[next_index]
+            next_index += 1
+            tasks[asyncio.ensure_future(self._attempt(node, fn))] = node
+
+        launch()
+        try:
+            while tasks:
+                timeout = hedge_delay if next_index < len(candidates) else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self.hedges += 1
+                    hedge_delay = None
+                    launch()
+                    continue
+
+                for task in done:
+                    tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if isinstance(error, (AddressNotFound, RateLimitExceeded)):
+                        raise error
+                    last_error = error
+
+                if not tasks and next_index < len(candidates):
+                    self.failovers += 1
+                    launch()
+
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_delay(self, node: TronNode) -> float | None:
+        if not self.hedge_percentile:
+            return None
+        return max(self.hedge_min_delay, node.latency_percentile(self.hedge_percentile))
+
+    async def _attempt(self, node: TronNode, fn: Callable[[AsyncTron], Awaitable[T]]) -> T:
+        retries = self.rate_limit_retries
+        while True:
+            await self.limiter.acquire()
+            try:
+                return await self._attempt_once(node, fn)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 429:
+                    raise
+                delay = min(self.retry_after_max, _retry_after(e.response))
+                self.limiter.pause(delay)
+                if retries <= 0:
+                    raise RateLimitExceeded("Tron API rate limit exceeded (HTTP 429)")
+                retries -= 1
+                logger.warning(f"Tron node {node.endpoint} answered 429, retrying in {delay:.2f}s")
+
+    async def _attempt_once(self, node: TronNode, fn: Callable[[AsyncTron], Awaitable[T]]) -> T:
+        # The node may have opened, or another request may have taken its probe, since ranking.
+        if not node.claim(time.monotonic()):
+            self.limiter.release(None)
+            raise CircuitOpenError(f"Circuit open for Tron node {node.endpoint}")
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(node.timeout):
+                result = await fn(node.client)
+        except (AddressNotFound, BlockNotFound):
+            # The node answered; a missing account or a block it has not seen yet says
+            # nothing about its health. Missing blocks still fail over to other nodes.
+            latency = time.perf_counter() - started
+            node.record_success(latency)
+            self.limiter.release(latency)
+            raise
+        except asyncio.CancelledError:
+            if node.state == HALF_OPEN:
+                node.state = OPEN
+            self.limiter.release(None)
+            raise
+        except httpx.HTTPStatusError as e:
+            # Quota responses are an overload signal, not a sign of an unhealthy node.
+            if e.response.status_code == 429:
+                if node.state == HALF_OPEN:
+                    node.state = OPEN
+            else:
+                node.record_failure()
+            self.limiter.release(time.perf_counter() - started, ok=False)
+            raise
+        except Exception:
+            node.record_failure()
+            self.limiter.release(time.perf_counter() - started, ok=False)
+            raise
+        latency = time.perf_counter() - started
+        node.record_success(latency)
+        self.limiter.release(latency)
+        return result
+
+
+def _retry_after(response: httpx.Response, default: float = 1.0) -> float:
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
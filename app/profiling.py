@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.logger import current_request_id, logger
+from app.metrics import stage_spans
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional: without it captures hold the stage trace only
+    Profiler = None
+
+_CAPTURE_NAME = re.compile(r"^[\w.-]+\.(html|json)$")
+
+
+class ProfileStore:
+    """
+    Directory of request captures, keeping only the newest `keep` files.
+
+    Args:
+        directory (str): Where captures are written; created on first save.
+        keep (int): Number of captures kept, older ones are deleted on save.
+    """
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def save(self, name: str, content: str) -> Path:
+        """Write a capture and rotate out the oldest ones. Blocking, run it in a thread."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        partial = path.with_suffix(path.suffix + ".part")
+        partial.write_text(content, encoding="utf-8")
+        partial.replace(path)
+        for old in self._paths()[self.keep:]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def entries(self) -> list[dict]:
+        """Return the stored captures, newest first."""
+        captures = []
+        for path in self._paths():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            captures.append({
+                "name": path.name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            })
+        return captures
+
+    def path(self, name: str) -> Path | None:
+        """Return the path of a stored capture, or None for unknown or malformed names."""
+        if not _CAPTURE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def _paths(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        paths = [path for path in self.directory.iterdir() if _CAPTURE_NAME.match(path.name)]
+        return sorted(paths, key=lambda path: path.stat().st_mtime_ns, reverse=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware capturing where the time of selected requests went.
+
+    A `sample_rate` share of requests is profiled with pyinstrument in async
+    mode (awaits, executor waits and database time show up as wall-clock
+    time), or traced by stage when pyinstrument is not installed. With
+    `slow_threshold` every request is traced by stage, which only costs a list
+    append per stage, and the trace is kept when the request took at least
+    that many seconds. Only add it when one of the two is enabled.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        store (ProfileStore): Where captures are written.
+        sample_rate (float): Share of requests profiled, 0 disables sampling.
+        slow_threshold (float): Seconds after which a request is captured, 0 disables it.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, sample_rate: float = 0.0, slow_threshold: float = 0.0):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.captured = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/admin"):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        if sampled and Profiler is not None:
+            profiler = Profiler(interval=0.001, async_mode="enabled")
+            profiler.start()
+        spans: list[tuple[str, float, float]] = []
+        token = stage_spans.set(spans)
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            stage_spans.reset(token)
+            if profiler is not None:
+                profiler.stop()
+            slow = 0 < self.slow_threshold <= duration
+            if sampled or slow:
+                trace = {
+                    "request_id": current_request_id.get(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "reason": "slow" if slow else "sampled",
+                    "started_at": started_at.isoformat(),
+                    "duration_ms": round(1000 * duration, 2),
+                    "stages": [
+                        {"stage": name, "start_ms": round(1000 * (begin - started), 2),
+                         "duration_ms": round(1000 * (end - begin), 2)}
+                        for name, begin, end in spans
+                    ],
+                }
+                if profiler is not None:
+                    content, suffix = profiler.output_html(), "html"
+                else:
+                    content, suffix = json.dumps(trace, indent=2), "json"
+                name = _capture_name(trace, suffix)
+                try:
+                    await asyncio.to_thread(self.store.save, name, content)
+                    self.captured += 1
+                except OSError as e:
+                    logger.warning(f"Could not save profile {name}: {e}")
+
+
+def _capture_name(trace: dict, suffix: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    path = re.sub(r"[^\w-]+", "_", trace["path"]).strip("_") or "root"
+    return f"{stamp}-{trace['method']}-{path}-{round(trace['duration_ms'])}ms-{os.getpid()}.{suffix}"
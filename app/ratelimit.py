@@ -0,0 +1,209 @@
+import asyncio
+import time
+from collections import deque
+
+from app.config import (
+    TRON_CONCURRENCY_INITIAL,
+    TRON_CONCURRENCY_MAX,
+    TRON_CONCURRENCY_MIN,
+    TRON_LATENCY_TARGET,
+    TRON_MAX_QUEUE,
+    TRON_RATE_BURST,
+    TRON_RATE_LIMIT,
+)
+
+
+class RateLimitExceeded(ConnectionError):
+    """Raised when an outbound call cannot be admitted or the upstream keeps answering 429."""
+
+
+class TokenBucket:
+    """
+    Token bucket for outbound requests with a bounded FIFO wait queue.
+
+    Tokens refill at `rate` per second up to `burst`. Callers wait for a
+    token in arrival order; once `max_waiters` callers are waiting, new
+    ones are rejected.
+    """
+
+    def __init__(self, rate: float, burst: int, max_waiters: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_waiters = max_waiters
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiters = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """
+        Take one token, waiting for it if needed.
+
+        Raises:
+            RateLimitExceeded: If the wait queue is full.
+        """
+        if not self.waiters and self._try_take():
+            return
+        if self.waiters >= self.max_waiters:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Tron API rate limit queue full ({self.max_waiters} waiting)")
+
+        self.waiters += 1
+        try:
+            async with self._lock:
+                while not self._try_take():
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self.waiters -= 1
+
+    def _try_take(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit for outbound calls.
+
+    The limit grows by roughly one per round of successful calls faster than
+    `latency_target` and is multiplied by `backoff` on errors or slow calls,
+    at most once per `latency_target` interval. Callers over the limit wait
+    in a bounded queue.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        max_waiters: int,
+        backoff: float = 0.5,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.max_waiters = max_waiters
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.rejected = 0
+        self._last_decrease = 0.0
+        self._waiting: deque[asyncio.Future] = deque()
+
+    @property
+    def waiters(self) -> int:
+        return len(self._waiting)
+
+    async def acquire(self) -> None:
+        """
+        Wait for a free slot under the current limit.
+
+        Raises:
+            RateLimitExceeded: If the wait queue is full.
+        """
+        if not self._waiting and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        if len(self._waiting) >= self.max_waiters:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Tron API concurrency queue full ({self.max_waiters} waiting)")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation: pass it on.
+                self.in_flight -= 1
+                self._wake()
+            elif future in self._waiting:
+                self._waiting.remove(future)
+            raise
+
+    def release(self, latency: float | None, ok: bool = True) -> None:
+        """
+        Free a slot and adapt the limit to the call's outcome.
+
+        Args:
+            latency (float | None): Call duration in seconds; None (abandoned call)
+                frees the slot without adapting the limit.
+            ok (bool, optional): False for errors, timeouts and overload responses.
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if latency is None:
+            pass
+        elif ok and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        elif now - self._last_decrease >= self.latency_target:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._last_decrease = now
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order."""
+        while self._waiting and self.in_flight < int(self.limit):
+            future = self._waiting.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+class OutboundLimiter:
+    """Admission control for outbound Tron calls: optional token bucket plus AIMD concurrency."""
+
+    def __init__(self, bucket: TokenBucket | None, concurrency: AdaptiveConcurrency | None):
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self._blocked_until = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "OutboundLimiter":
+        bucket = TokenBucket(TRON_RATE_LIMIT, TRON_RATE_BURST, TRON_MAX_QUEUE) if TRON_RATE_LIMIT > 0 else None
+        concurrency = None
+        if TRON_CONCURRENCY_MAX > 0:
+            concurrency = AdaptiveConcurrency(
+                TRON_CONCURRENCY_INITIAL,
+                TRON_CONCURRENCY_MIN,
+                TRON_CONCURRENCY_MAX,
+                TRON_LATENCY_TARGET,
+                TRON_MAX_QUEUE,
+            )
+        return cls(bucket, concurrency)
+
+    @property
+    def waiters(self) -> int:
+        return (self.bucket.waiters if self.bucket else 0) + (self.concurrency.waiters if self.concurrency else 0)
+
+    @property
+    def rejected(self) -> int:
+        return (self.bucket.rejected if self.bucket else 0) + (self.concurrency.rejected if self.concurrency else 0)
+
+    async def acquire(self) -> None:
+        """Wait out any Retry-After pause, then for a rate token and a concurrency slot."""
+        wait = self._blocked_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        if self.concurrency is not None:
+            await self.concurrency.acquire()
+
+    def release(self, latency: float | None, ok: bool = True) -> None:
+        """Free the concurrency slot taken by `acquire()`; see AdaptiveConcurrency.release."""
+        if self.concurrency is not None:
+            self.concurrency.release(latency, ok)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all outbound calls for `seconds`, honouring an upstream Retry-After."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
@@ -0,0 +1,394 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, Sequence
+
+from sqlalchemy import RowMapping, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    RETENTION_ARCHIVE_DIR,
+    RETENTION_BATCH_SIZE,
+    RETENTION_DAYS,
+    RETENTION_INTERVAL,
+    RETENTION_PERIOD,
+    RETENTION_PREMAKE,
+)
+from app.crud import (
+    delete_wallet_records,
+    get_oldest_record_time,
+    get_records_between,
+    stream_wallet_records,
+    wallet_record_exists,
+)
+from app.logger import logger
+from app.schemas import RecordFilters
+
+TABLE = "wallet_requests"
+
+_ARCHIVE_NAME = re.compile(r"^wallet_requests-(\d{8})-(\d{8})\.ndjson\.gz$")
+_PARTITION_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def period_start(moment: datetime, period: str) -> datetime:
+    """Return the start of the UTC day or month containing `moment`."""
+    moment = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1) if period == "month" else moment
+
+
+def next_period(start: datetime, period: str) -> datetime:
+    """Return the start of the day or month after the one starting at `start`."""
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime) -> str:
+    """Name of the wallet_requests partition starting at `start`."""
+    return f"{TABLE}_p{start:%Y%m%d}"
+
+
+def create_partition_sql(start: datetime, end: datetime) -> str:
+    """DDL creating the `[start, end)` partition of wallet_requests unless it exists."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def partition_bounds(bound: str) -> tuple[datetime, datetime] | None:
+    """Parse the range of a partition from `pg_get_expr(relpartbound)`; None for DEFAULT or MINVALUE bounds."""
+    match = _PARTITION_BOUND.search(bound)
+    if match is None:
+        return None
+    try:
+        return tuple(datetime.fromisoformat(value).astimezone(timezone.utc) for value in match.groups())
+    except ValueError:
+        return None
+
+
+class ArchiveStore:
+    """
+    Directory of archived wallet records, one gzip NDJSON file per period.
+
+    Files are named after the `[start, end)` range they cover. Records are
+    added as separate gzip members: a batch is first written to a `.part`
+    file and appended to the archive only once its rows have been deleted
+    from the database, so a crash never loses or duplicates a batch.
+
+    Args:
+        directory (str): Where archives are written; created on first write.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def path(self, start: datetime, end: datetime) -> Path:
+        """Return the archive file of a period."""
+        return self.directory / f"{TABLE}-{start:%Y%m%d}-{end:%Y%m%d}.ndjson.gz"
+
+    def write_part(self, start: datetime, end: datetime, rows: Sequence[RowMapping]) -> Path:
+        """Write records to the pending part of a period's archive. Blocking, run it in a thread."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        part = self.path(start, end).with_suffix(".gz.part")
+        with gzip.open(part, "at", encoding="utf-8") as file:
+            for row in rows:
+                file.write(json.dumps(_archived(row), default=datetime.isoformat) + "\n")
+        return part
+
+    def commit_part(self, part: Path) -> Path:
+        """Append a pending part to its archive and remove it. Blocking, run it in a thread."""
+        path = part.with_suffix("")
+        with open(part, "rb") as source, open(path, "ab") as target:
+            while chunk := source.read(1 << 20):
+                target.write(chunk)
+            target.flush()
+            os.fsync(target.fileno())
+        part.unlink()
+        return path
+
+    def parts(self) -> list[Path]:
+        """Return parts left behind by an interrupted run."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"{TABLE}-*.ndjson.gz.part"))
+
+    def files(self, created_from: datetime | None = None, created_to: datetime | None = None) -> list[Path]:
+        """Return the archives overlapping `[created_from, created_to)`, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        files = []
+        for path in self.directory.iterdir():
+            match = _ARCHIVE_NAME.match(path.name)
+            if match is None:
+                continue
+            start, end = (datetime.strptime(value, "%Y%m%d").replace(tzinfo=timezone.utc) for value in match.groups())
+            if (created_to is None or start < created_to) and (created_from is None or end > created_from):
+                files.append((start, path))
+        return [path for _, path in sorted(files)]
+
+
+def _archived(row: RowMapping) -> dict:
+    record = dict(row)
+    for key in ("created_at", "last_seen_at"):
+        if isinstance(record[key], datetime) and record[key].tzinfo is None:
+            record[key] = record[key].replace(tzinfo=timezone.utc)
+    return record
+
+
+def read_archive(path: Path, filters: RecordFilters | None, chunk_size: int) -> Iterator[list[dict]]:
+    """Yield the records of an archive file matching the filters in chunks. Blocking."""
+    chunk = []
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if filters is None or _matches(record, filters):
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def _matches(record: dict, filters: RecordFilters) -> bool:
+    if filters.wallet_address is not None and record["wallet_address"] != filters.wallet_address:
+        return False
+    if filters.success is not None and record["success"] != filters.success:
+        return False
+    if filters.created_from is not None or filters.created_to is not None:
+        created_at = datetime.fromisoformat(record["created_at"])
+        if filters.created_from is not None and created_at < filters.created_from:
+            return False
+        if filters.created_to is not None and created_at >= filters.created_to:
+            return False
+    return True
+
+
+async def stream_archived_records(
+    store: ArchiveStore,
+    filters: RecordFilters | None = None,
+    chunk_size: int = 1000,
+) -> AsyncIterator[list[dict]]:
+    """
+    Streams archived records matching the /records filters, oldest period first.
+
+    Only archives overlapping the requested range are opened; they are read
+    and decompressed in a worker thread, `chunk_size` records at a time.
+
+    Args:
+        store (ArchiveStore): Archive directory.
+        filters (RecordFilters | None, optional): Address, success and time range filters.
+        chunk_size (int, optional): Records per chunk. Defaults to 1000.
+
+    Yields:
+        list[dict]: Consecutive chunks of records, as exported by /records/export.
+    """
+    created_from = filters.created_from if filters else None
+    created_to = filters.created_to if filters else None
+    for path in store.files(created_from, created_to):
+        chunks = read_archive(path, filters, chunk_size)
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
+
+
+class RetentionJob:
+    """
+    Keeps wallet_requests bounded by archiving and removing expired records.
+
+    Each run first finishes parts left by an interrupted run. On PostgreSQL
+    with a partitioned table it then creates the partitions of the next
+    ``premake`` periods and archives and drops every partition that ended
+    before the cutoff. Otherwise, including SQLite, expired records are
+    archived and deleted ``batch_size`` at a time, period by period, so each
+    transaction stays short and freed pages are reused by new inserts.
+
+    Delta snapshots pointing at removed records are dropped with them; the
+    next lookup of such an address stores a new record. History rollups are
+    kept, so aggregated history stays available for archived ranges.
+
+    Run it in one process only: concurrent runs would archive the same rows twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        store: ArchiveStore,
+        retention_days: int = RETENTION_DAYS,
+        period: str = RETENTION_PERIOD,
+        interval: float = RETENTION_INTERVAL,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        premake: int = RETENTION_PREMAKE,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for job sessions.
+            store (ArchiveStore): Where expired records are archived.
+            retention_days (int, optional): Age in days after which records are archived; 0 keeps them.
+            period (str, optional): "day" or "month"; partition and archive file granularity.
+            interval (float, optional): Seconds between runs.
+            batch_size (int, optional): Records archived and deleted per transaction.
+            premake (int, optional): Future partitions kept ready on PostgreSQL.
+        """
+        self.session_factory = session_factory
+        self.store = store
+        self.retention_days = retention_days
+        self.period = period
+        self.interval = interval
+        self.batch_size = batch_size
+        self.premake = premake
+
+        self._task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.rows_archived = 0
+        self.partitions_dropped = 0
+
+    async def run(self, now: datetime | None = None) -> int:
+        """
+        Run the job once.
+
+        Args:
+            now (datetime | None, optional): Reference time. Defaults to the current time.
+
+        Returns:
+            int: Number of records archived.
+        """
+        now = now or datetime.now(timezone.utc)
+        await self._recover()
+        archived = 0
+        async with self.session_factory() as session:
+            partitioned = await _is_partitioned(session)
+        if partitioned:
+            await self._ensure_partitions(now)
+        if self.retention_days > 0:
+            cutoff = now - timedelta(days=self.retention_days)
+            if partitioned:
+                archived += await self._drop_partitions(cutoff)
+            archived += await self._delete_expired(cutoff)
+        self.runs += 1
+        self.rows_archived += archived
+        if archived:
+            logger.info(f"Retention archived {archived} records older than {self.retention_days} days")
+        return archived
+
+    async def _recover(self) -> None:
+        """Append parts whose rows are gone from the database, discard the others."""
+        for part in self.store.parts():
+            first = await asyncio.to_thread(_first_record_id, part)
+            async with self.session_factory() as session:
+                stored = first is not None and await wallet_record_exists(session, first)
+            if first is None or stored:
+                part.unlink()
+            else:
+                await asyncio.to_thread(self.store.commit_part, part)
+                logger.warning(f"Retention recovered archive part {part.name}")
+
+    async def _ensure_partitions(self, now: datetime) -> None:
+        start = period_start(now, self.period)
+        for _ in range(self.premake + 1):
+            end = next_period(start, self.period)
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(text(create_partition_sql(start, end)))
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Creating partition {partition_name(start)} failed: {e}")
+            start = end
+
+    async def _drop_partitions(self, cutoff: datetime) -> int:
+        archived = 0
+        async with self.session_factory() as session:
+            partitions = await _partitions(session)
+        for name, (start, end) in partitions:
+            if end > cutoff:
+                continue
+            part = None
+            async with self.session_factory() as session:
+                filters = RecordFilters(created_from=start, created_to=end)
+                async for chunk in stream_wallet_records(session, filters, self.batch_size):
+                    part = await asyncio.to_thread(self.store.write_part, start, end, chunk)
+                    archived += len(chunk)
+            async with self.session_factory() as session:
+                await session.execute(text(
+                    f"DELETE FROM wallet_snapshots WHERE record_id IN (SELECT id FROM {name})"
+                ))
+                await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
+            if part is not None:
+                await asyncio.to_thread(self.store.commit_part, part)
+            self.partitions_dropped += 1
+            logger.info(f"Retention dropped partition {name}")
+        return archived
+
+    async def _delete_expired(self, cutoff: datetime) -> int:
+        archived = 0
+        while True:
+            async with self.session_factory() as session:
+                oldest = await get_oldest_record_time(session)
+            if oldest is None or oldest >= cutoff:
+                return archived
+            start = period_start(oldest, self.period)
+            end = next_period(start, self.period)
+            async with self.session_factory() as session:
+                rows = await get_records_between(session, start, min(end, cutoff), self.batch_size)
+                part = await asyncio.to_thread(self.store.write_part, start, end, rows)
+                await delete_wallet_records(session, [row["id"] for row in rows])
+            await asyncio.to_thread(self.store.commit_part, part)
+            archived += len(rows)
+
+    async def start(self) -> None:
+        """Start running the job in the background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the job; an interrupted batch is finished by the next run."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def _first_record_id(part: Path) -> int | None:
+    try:
+        with gzip.open(part, "rt", encoding="utf-8") as file:
+            line = file.readline()
+    except (OSError, EOFError):
+        return None
+    try:
+        return json.loads(line)["id"] if line else None
+    except (ValueError, KeyError):
+        return None
+
+
+async def _is_partitioned(session: AsyncSession) -> bool:
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(await session.scalar(text(
+        f"SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('{TABLE}'))"
+    )))
+
+
+async def _partitions(session: AsyncSession) -> list[tuple[str, tuple[datetime, datetime]]]:
+    """Return the range partitions of wallet_requests and their bounds, oldest first."""
+    rows = await session.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        f"JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass('{TABLE}')"
+    ))
+    partitions = [(name, partition_bounds(bound)) for name, bound in rows]
+    return sorted(((name, bounds) for name, bounds in partitions if bounds is not None), key=lambda p: p[1])
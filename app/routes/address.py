@@ -1,12 +1,55 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Literal, Sequence
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from fastapi.responses import StreamingResponse
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.schemas import WalletIn, WalletDB, WalletOut
+from app.config import BATCH_CONCURRENCY, EXPORT_CHUNK_SIZE, HISTORY_MAX_BUCKETS
+from app.schemas import (
+    WalletIn,
+    WalletDB,
+    WalletOut,
+    WalletBatchIn,
+    WalletBatchItem,
+    WalletHistoryBucket,
+    RecordFilters,
+)
 from app.tron import TronClient
-from app.crud import create_wallet_record, get_wallet_records
-from app.deps import get_tron_client, get_session
+from app.crud import (
+    BUCKET_WIDTHS,
+    get_latest_wallet_record,
+    get_wallet_history,
+    get_wallet_records,
+    save_wallet_record,
+    save_wallet_records,
+    stream_wallet_records,
+    wallet_record_values,
+)
+from app.deps import (
+    get_archive_store,
+    get_failure_tracker,
+    get_read_session,
+    get_read_session_factory,
+    get_record_writer,
+    get_session,
+    get_tron_client,
+    get_watchlist,
+)
+from app.failures import FailureTracker
+from app.models import WalletRequest
+from app.retention import ArchiveStore, stream_archived_records
 from app.logger import logger
+from app.metrics import stage, wallet_errors
+from app.serialization import FastJSONResponse
+from app.watchlist import Watchlist
+from app.writer import RecordWriter, WriteBufferFull, WriterStopped
 router = APIRouter(tags=["Wallet API"])
 
 
@@ -19,11 +62,24 @@ router = APIRouter(tags=["Wallet API"])
 async def fetch_wallet_info(
     payload: WalletIn,
     session: AsyncSession = Depends(get_session),
-    tron: TronClient = Depends(get_tron_client)
+    tron: TronClient = Depends(get_tron_client),
+    writer: RecordWriter | None = Depends(get_record_writer),
+    failures: FailureTracker = Depends(get_failure_tracker),
+    watchlist: Watchlist = Depends(get_watchlist)
 ):
     """
     Fetch wallet info by address and store the result in the database.
 
+    With write-behind enabled the record is queued and committed together
+    with other pending records instead of in its own transaction. In delta
+    storage mode an unchanged snapshot is counted on the earlier record, which
+    is returned, instead of stored again. Addresses recently rejected as
+    invalid or not found are answered from the negative cache without
+    storing anything; failures are counted in wallet_failures and those that
+    reached the Tron API only get their own record as FAILURE_ROW_POLICY
+    allows. Watched addresses are answered from their background-refreshed
+    value while it is fresh.
+
     Returns 200 with data if successful,
     400 for invalid address or not found,
     503 if external API is unavailable,
@@ -31,27 +87,125 @@ async def fetch_wallet_info(
     """
     logger.info(f"→ Request to /address: {payload.wallet_address}")
 
+    cached = failures.check(payload.wallet_address)
+    if cached is not None:
+        status_code, error_class, error_message = cached
+        wallet_errors.inc(error_class=error_class, status=str(status_code))
+        raise HTTPException(status_code=status_code, detail=error_message)
+
     try:
-        data = await tron.get_wallet_info(payload.wallet_address)
+        data = watchlist.touch(payload.wallet_address)
+        if data is None:
+            with stage("tron_fetch"):
+                data = await tron.get_wallet_info(payload.wallet_address)
         wallet_out = WalletOut(**data)
-        return await create_wallet_record(session, wallet_out)
+        return await _save_record(session, writer, wallet_out)
 
-    except ValueError as e:
-        return await _handle_error(session, payload.wallet_address, str(e), 400)
-
-    except ConnectionError as e:
-        return await _handle_error(session, payload.wallet_address, str(e), 503)
+    except (WriteBufferFull, WriterStopped) as e:
+        logger.error(f"[503] Record for {payload.wallet_address} dropped: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
 
     except Exception as e:
-        return await _handle_error(session, payload.wallet_address, f"Unexpected error: {e}", 500)
+        status_code, error_message = _error_status(e)
+        wallet_errors.inc(error_class=type(e).__name__, status=str(status_code))
+        return await _handle_error(
+            session, writer, failures, payload.wallet_address, type(e).__name__, error_message, status_code
+        )
+
+
+@router.post("/addresses", response_model=List[WalletBatchItem], responses={
+        200: {"description": "Per-address results, each with its own status_code"},
+        400: {"description": "Malformed or oversized batch"},
+    })
+async def fetch_wallet_info_batch(
+    payload: WalletBatchIn,
+    session: AsyncSession = Depends(get_session),
+    tron: TronClient = Depends(get_tron_client),
+    failures: FailureTracker = Depends(get_failure_tracker),
+    watchlist: Watchlist = Depends(get_watchlist)
+):
+    """
+    Fetch wallet info for several addresses and store all results in one bulk insert.
+
+    Addresses are fetched concurrently up to BATCH_CONCURRENCY at a time.
+    Failures do not fail the batch: each item carries the status code
+    the single-address endpoint would have returned. Negatively cached
+    addresses are not looked up again and fresh watched addresses are taken
+    from the watchlist; every item keeps its record since the response
+    returns its id.
+    """
+    logger.info(f"→ Request to /addresses: {len(payload.wallet_addresses)} addresses")
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def fetch(address: str) -> tuple[dict, int]:
+        cached = failures.check(address)
+        prefetched = watchlist.touch(address) if cached is None else None
+        if cached is not None:
+            status_code, error_class, error_message = cached
+        elif prefetched is not None:
+            return wallet_record_values(WalletOut(**prefetched)), 200
+        else:
+            async with semaphore:
+                try:
+                    with stage("tron_fetch"):
+                        data = await tron.get_wallet_info(address)
+                    return wallet_record_values(WalletOut(**data)), 200
+                except Exception as e:
+                    status_code, error_message = _error_status(e)
+                    error_class = type(e).__name__
+                    logger.error(f"[{status_code}] Error for {address}: {error_message}")
+
+        wallet_errors.inc(error_class=error_class, status=str(status_code))
+        if cached is None:
+            failures.record(address, status_code, error_class, error_message)
+        fake = WalletOut(wallet_address=address, balance=0, energy=0, bandwidth=0)
+        return wallet_record_values(fake, success=False, error_message=error_message), status_code
+
+    results = await asyncio.gather(*(fetch(address) for address in payload.wallet_addresses))
+    with stage("db_write"):
+        records = await save_wallet_records(session, [values for values, _ in results])
+
+    return [
+        WalletBatchItem(**WalletDB.model_validate(record).model_dump(), status_code=status_code)
+        for record, (_, status_code) in zip(records, results)
+    ]
+
+
+def _error_status(exc: Exception) -> tuple[int, str]:
+    """Map a wallet lookup exception to its HTTP status code and message."""
+    if isinstance(exc, ValueError):
+        return 400, str(exc)
+    if isinstance(exc, ConnectionError):
+        return 503, str(exc)
+    return 500, f"Unexpected error: {exc}"
+
+
+async def _save_record(
+    session: AsyncSession,
+    writer: RecordWriter | None,
+    data: WalletOut,
+    success: bool = True,
+    error_message: str | None = None
+) -> WalletDB:
+    with stage("db_write"):
+        if writer is not None:
+            return await writer.write(data, success, error_message)
+        return WalletDB.model_validate(await save_wallet_record(session, data, success, error_message))
 
 
 async def _handle_error(
     session: AsyncSession,
+    writer: RecordWriter | None,
+    failures: FailureTracker,
     wallet_address: str,
+    error_class: str,
     error_message: str,
     status_code: int
 ):
+    if not failures.record(wallet_address, status_code, error_class, error_message):
+        raise HTTPException(status_code=status_code, detail=error_message)
+
     logger.error(f"[{status_code}] Error for {wallet_address}: {error_message}")
 
     fake = WalletOut(
@@ -60,22 +214,222 @@ async def _handle_error(
         energy=0,
         bandwidth=0,
     )
-    await create_wallet_record(
-        session, fake, success=False, error_message=error_message
-    )
+    try:
+        await _save_record(session, writer, fake, success=False, error_message=error_message)
+    except (WriteBufferFull, WriterStopped) as e:
+        # The lookup error is what the client needs to see, not the storage one.
+        logger.error(f"Failure record for {wallet_address} dropped: {e}")
     raise HTTPException(status_code=status_code, detail=error_message)
 
 
+def record_filters(
+    wallet_address: str | None = Query(None, description="Only records of this wallet"),
+    success: bool | None = Query(None, description="Only successful or only failed lookups"),
+    created_from: datetime | None = Query(None, description="Inclusive lower bound of created_at"),
+    created_to: datetime | None = Query(None, description="Exclusive upper bound of created_at"),
+) -> RecordFilters:
+    """Dependency collecting the record filter query parameters."""
+    return RecordFilters(
+        wallet_address=wallet_address,
+        success=success,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+
 @router.get("/records", response_model=List[WalletDB], responses={
-    200: {"description": "Successful Response"},
+    200: {
+        "description": "Successful Response",
+        "headers": {"X-Next-Cursor": {"description": "Cursor of the next page, if there may be one"}},
+    },
+    400: {"description": "Invalid cursor"},
     422: {"description": "Validation Error"}
 })
 async def list_wallet_records(
     limit: int = Query(10, ge=0),
     offset: int = Query(0, ge=0),
-    session: AsyncSession = Depends(get_session)
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor; replaces offset"),
+    filters: RecordFilters = Depends(record_filters),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Return a paginated list of wallet records stored in the database.
+
+    Records are ordered newest first and can be narrowed by wallet address,
+    success flag and a `[created_from, created_to)` time range. For deep pages
+    pass the `X-Next-Cursor` header of the previous response as `cursor`: the
+    page is then located via the `(created_at, id)` index and `offset` is ignored.
+
+    Rows are read as plain columns and encoded straight to JSON; the
+    response model only documents their shape.
     """
-    return await get_wallet_records(session, limit, offset)
+    after = _decode_cursor(cursor) if cursor else None
+    with stage("db_read"):
+        rows = await get_wallet_records(session, limit, offset, after, filters)
+
+    response = FastJSONResponse(rows)
+    if limit and len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last["created_at"], last["id"])
+    return response
+
+
+_EXPORT_COLUMNS = [column.name for column in WalletRequest.__table__.columns]
+
+
+@router.get("/records/export", responses={
+    200: {
+        "description": "All matching records, oldest first",
+        "content": {"application/x-ndjson": {}, "text/csv": {}},
+    },
+})
+async def export_wallet_records(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    filters: RecordFilters = Depends(record_filters),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory)
+):
+    """
+    Stream every record matching the /records filters as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in chunks of EXPORT_CHUNK_SIZE
+    and written out as they arrive, so memory stays flat for any export size.
+    """
+    logger.info(f"→ Export of wallet records as {format}: {filters.model_dump(exclude_none=True)}")
+
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+
+    async def body() -> AsyncIterator[str]:
+        # The export owns its session: it outlives the request-scoped dependencies.
+        async with session_factory() as session:
+            if format == "csv":
+                yield _csv_header()
+            async for chunk in stream_wallet_records(session, filters, EXPORT_CHUNK_SIZE):
+                yield encode(chunk)
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="wallet_requests.{format}"'},
+    )
+
+
+@router.get("/records/archive", responses={
+    200: {
+        "description": "Archived records matching the filters, oldest first",
+        "content": {"application/x-ndjson": {}, "text/csv": {}},
+    },
+})
+async def export_archived_records(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    filters: RecordFilters = Depends(record_filters),
+    store: ArchiveStore = Depends(get_archive_store)
+):
+    """
+    Stream records moved to the archive by the retention job, as NDJSON or CSV.
+
+    Takes the /records filters and answers like /records/export. Only the
+    archive files of periods overlapping `[created_from, created_to)` are
+    read; they are decompressed on the fly in chunks of EXPORT_CHUNK_SIZE.
+    """
+    logger.info(f"→ Export of archived records as {format}: {filters.model_dump(exclude_none=True)}")
+
+    encode = _csv_chunk if format == "csv" else _ndjson_chunk
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+
+    async def body() -> AsyncIterator[str]:
+        if format == "csv":
+            yield _csv_header()
+        async for chunk in stream_archived_records(store, filters, EXPORT_CHUNK_SIZE):
+            yield encode(chunk)
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="wallet_requests_archive.{format}"'},
+    )
+
+
+def _ndjson_chunk(rows: Sequence[RowMapping]) -> str:
+    return "".join(json.dumps(dict(row), default=datetime.isoformat) + "\n" for row in rows)
+
+
+def _csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(_EXPORT_COLUMNS)
+    return buffer.getvalue()
+
+
+def _csv_chunk(rows: Sequence[RowMapping]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([row[column] for column in _EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue()
+
+
+@router.get("/wallets/{wallet_address}/latest", response_model=WalletDB, responses={
+    200: {"description": "Successful Response"},
+    404: {"description": "No successful record for this wallet"},
+})
+async def latest_wallet_record(
+    wallet_address: str,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Return the newest successful record of a wallet.
+    """
+    record = await get_latest_wallet_record(session, wallet_address)
+    if record is None:
+        raise HTTPException(status_code=404, detail="No successful record for this wallet")
+    return record
+
+
+@router.get("/wallets/{wallet_address}/history", response_model=List[WalletHistoryBucket], responses={
+    200: {"description": "Aggregates per non-empty bucket, oldest first"},
+    400: {"description": "Invalid range or too many buckets"},
+})
+async def wallet_history(
+    wallet_address: str,
+    bucket: Literal["minute", "hour", "day"] = Query("hour", description="Bucket size"),
+    created_from: datetime | None = Query(None, description="Inclusive lower bound of created_at"),
+    created_to: datetime | None = Query(None, description="Exclusive upper bound of created_at; defaults to now"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Return min/max/avg/last of balance, energy and bandwidth per time bucket.
+
+    Only successful lookups count. Buckets are aligned to UTC and empty ones
+    are omitted. Without `created_from` the range covers the last
+    HISTORY_MAX_BUCKETS buckets; longer ranges are rejected. Aggregation runs
+    in the database, from the rollup tables when HISTORY_ROLLUPS covers the
+    bucket size.
+    """
+    filters = RecordFilters(created_from=created_from, created_to=created_to)
+    width = BUCKET_WIDTHS[bucket]
+    end = filters.created_to or datetime.now(timezone.utc)
+    start = filters.created_from or end - width * HISTORY_MAX_BUCKETS
+    if start >= end:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+    if (end - start) / width > HISTORY_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range spans more than {HISTORY_MAX_BUCKETS} {bucket} buckets",
+        )
+
+    with stage("db_read"):
+        rows = await get_wallet_history(session, wallet_address, bucket, start, end)
+    return FastJSONResponse(rows)
+
+
+def _encode_cursor(created_at: datetime, record_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), record_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, record_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(record_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
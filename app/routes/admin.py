@@ -0,0 +1,53 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.config import ADMIN_TOKEN
+from app.deps import get_profile_store
+from app.profiling import ProfileStore
+
+
+def require_admin(authorization: str | None = Header(default=None)) -> None:
+    """
+    Check the bearer token of admin requests.
+
+    Fails closed: without ADMIN_TOKEN the admin endpoints do not exist.
+
+    Raises:
+        HTTPException: 404 when ADMIN_TOKEN is not set, 401 when the request does not carry it.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    """
+    List the stored request profiles, newest first.
+
+    Returns:
+        list[dict]: Name, size in bytes and creation time of each capture.
+    """
+    return store.entries()
+
+
+@router.get("/profiles/{name}", responses={404: {"description": "No such capture"}})
+async def download_profile(name: str, store: ProfileStore = Depends(get_profile_store)):
+    """
+    Download one stored profile: an HTML pyinstrument report or a JSON stage trace.
+
+    Raises:
+        HTTPException: 404 for unknown names.
+    """
+    path = store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/html" if path.suffix == ".html" else "application/json"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.deps import get_session, is_ready
+from app.logger import logger
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/ready", responses={
+    200: {"description": "Warmed up and the database answers"},
+    503: {"description": "Still starting up or the database is unreachable"},
+})
+async def ready(session: AsyncSession = Depends(get_session)):
+    """
+    Readiness probe.
+
+    Answers 503 until the startup warm-up of database and Tron connections
+    has finished, and afterwards whenever the primary database does not answer.
+    """
+    if not is_ready():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    try:
+        await session.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error(f"Readiness check failed: {e}")
+        return JSONResponse({"status": "database unavailable"}, status_code=503)
+    return {"status": "ready"}
@@ -0,0 +1,185 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app import db
+from app.deps import (
+    current_tron_client,
+    get_block_follower,
+    get_failure_tracker,
+    get_record_writer,
+    get_retention_job,
+    get_subscription_hub,
+    get_watchlist,
+)
+from app.metrics import executor_queue_depth, registry
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def _tron_cache_events():
+    tron = current_tron_client()
+    if tron is None:
+        return []
+    stats = tron.cache.stats
+    events = ("hits", "misses", "coalesced", "stale", "evictions", "errors")
+    return [({"event": event}, stats[event]) for event in events]
+
+
+def _tron_cache_size():
+    tron = current_tron_client()
+    size = tron.cache.stats["size"] if tron is not None else None
+    return [({}, size)] if size is not None else []
+
+
+def _tron_nodes(attribute):
+    def collect():
+        tron = current_tron_client()
+        if tron is None:
+            return []
+        return [({"endpoint": node.endpoint}, attribute(node)) for node in tron.pool.nodes]
+    return collect
+
+
+def _tron_pool_events():
+    tron = current_tron_client()
+    if tron is None:
+        return []
+    return [({"event": "hedge"}, tron.pool.hedges), ({"event": "failover"}, tron.pool.failovers)]
+
+
+def _tron_limiter(attribute):
+    def collect():
+        tron = current_tron_client()
+        if tron is None:
+            return []
+        value = attribute(tron.pool.limiter)
+        return [({}, value)] if value is not None else []
+    return collect
+
+
+def _db_pool_checked_out():
+    if db.engine is None:
+        return []
+    checkedout = getattr(db.engine.pool, "checkedout", None)
+    return [({}, checkedout())] if checkedout is not None else []
+
+
+def _write_queue_depth():
+    writer = get_record_writer()
+    return [({}, writer.depth)] if writer is not None else []
+
+
+registry.callback("tron_cache_events_total", "Wallet cache lookups by outcome.", "counter", _tron_cache_events)
+registry.callback("tron_cache_entries", "Entries held in the wallet cache.", "gauge", _tron_cache_size)
+registry.callback(
+    "tron_node_latency_p50_seconds", "Median latency of recent calls per Tron node.", "gauge",
+    _tron_nodes(lambda node: node.latency_percentile(50)),
+)
+registry.callback(
+    "tron_node_error_rate", "Share of recent failed calls per Tron node.", "gauge",
+    _tron_nodes(lambda node: node.error_rate),
+)
+registry.callback(
+    "tron_node_circuit_open", "1 when the node's circuit breaker is not closed.", "gauge",
+    _tron_nodes(lambda node: int(node.state != "closed")),
+)
+registry.callback("tron_pool_events_total", "Hedged and failed-over Tron calls.", "counter", _tron_pool_events)
+registry.callback(
+    "tron_outbound_queue_depth", "Tron calls waiting for a rate token or concurrency slot.", "gauge",
+    _tron_limiter(lambda limiter: limiter.waiters),
+)
+registry.callback(
+    "tron_outbound_rejected_total", "Tron calls rejected because the admission queue was full.", "counter",
+    _tron_limiter(lambda limiter: limiter.rejected),
+)
+registry.callback(
+    "tron_concurrency_limit", "Current adaptive concurrency limit for Tron calls.", "gauge",
+    _tron_limiter(lambda limiter: limiter.concurrency.limit if limiter.concurrency else None),
+)
+registry.callback(
+    "tron_outbound_in_flight", "Tron calls currently in flight.", "gauge",
+    _tron_limiter(lambda limiter: limiter.concurrency.in_flight if limiter.concurrency else None),
+)
+registry.callback("db_pool_checked_out", "Database connections currently checked out.", "gauge", _db_pool_checked_out)
+registry.callback(
+    "db_read_replica_fallbacks_total", "Reads served by the primary because the replica was unavailable.", "counter",
+    lambda: [({}, db.replica.fallbacks)] if db.read_session is not None else [],
+)
+registry.callback(
+    "executor_queue_depth", "Jobs waiting in the default thread pool executor.", "gauge",
+    lambda: [({}, executor_queue_depth())],
+)
+registry.callback("write_behind_queue_depth", "Records waiting to be flushed.", "gauge", _write_queue_depth)
+registry.callback(
+    "wallet_negative_cache_hits_total", "Lookups rejected from the negative cache without I/O.", "counter",
+    lambda: [({}, get_failure_tracker().negative_hits)],
+)
+registry.callback(
+    "wallet_failure_rows_suppressed_total", "Failures counted without writing a wallet_requests row.", "counter",
+    lambda: [({}, get_failure_tracker().rows_suppressed)],
+)
+registry.callback(
+    "wallet_failure_counters_pending", "Failure counters waiting to be flushed.", "gauge",
+    lambda: [({}, get_failure_tracker().pending)],
+)
+registry.callback(
+    "wallet_watchlist_entries", "Addresses on the watchlist.", "gauge",
+    lambda: [({}, len(get_watchlist().entries))],
+)
+registry.callback(
+    "wallet_watchlist_served_total", "Lookups answered from a prefetched watchlist value.", "counter",
+    lambda: [({}, get_watchlist().served)],
+)
+registry.callback(
+    "wallet_watchlist_refreshes_total", "Background watchlist refreshes by outcome.", "counter",
+    lambda: [
+        ({"outcome": "success"}, get_watchlist().refreshes),
+        ({"outcome": "error"}, get_watchlist().refresh_errors),
+    ],
+)
+registry.callback(
+    "wallet_watchlist_block_invalidations_total", "Watched values invalidated by block activity.", "counter",
+    lambda: [({}, get_watchlist().invalidations)],
+)
+registry.callback(
+    "tron_blocks_processed_total", "Blocks read by the block follower.", "counter",
+    lambda: [({}, get_block_follower().blocks_processed)],
+)
+registry.callback(
+    "tron_block_follower_lag_blocks", "Blocks between the chain head and the block follower.", "gauge",
+    lambda: [({}, get_block_follower().lag)] if get_block_follower().lag is not None else [],
+)
+registry.callback(
+    "wallet_subscribers", "Open wallet change subscriptions.", "gauge",
+    lambda: [({}, len(get_subscription_hub().subscribers))],
+)
+registry.callback(
+    "wallet_subscription_topics", "Addresses polled for subscribers.", "gauge",
+    lambda: [({}, len(get_subscription_hub().topics))],
+)
+registry.callback(
+    "wallet_subscription_events_total", "Subscription upstream polls, changes and dropped subscribers.", "counter",
+    lambda: [
+        ({"event": "poll"}, get_subscription_hub().polls),
+        ({"event": "change"}, get_subscription_hub().changes),
+        ({"event": "drop"}, get_subscription_hub().drops),
+    ],
+)
+registry.callback(
+    "wallet_records_archived_total", "Records moved from wallet_requests to the archive.", "counter",
+    lambda: [({}, get_retention_job().rows_archived)],
+)
+registry.callback(
+    "wallet_partitions_dropped_total", "Expired wallet_requests partitions dropped.", "counter",
+    lambda: [({}, get_retention_job().partitions_dropped)],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, responses={
+    200: {"description": "Metrics in Prometheus text format"},
+})
+async def metrics():
+    """
+    Expose service metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,68 @@
+from typing import AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from tronpy.keys import is_base58check_address
+
+from app.config import SUBSCRIPTION_HEARTBEAT, SUBSCRIPTION_MAX_ADDRESSES
+from app.deps import get_subscription_hub, get_tron_client
+from app.logger import logger
+from app.serialization import dumps
+from app.subscriptions import SubscriptionHub
+from app.tron import TronClient
+
+router = APIRouter(tags=["Wallet API"])
+
+
+@router.get("/subscribe", responses={
+    200: {"description": "Server-Sent Events stream of wallet changes", "content": {"text/event-stream": {}}},
+    400: {"description": "Invalid wallet address or too many addresses"},
+})
+async def subscribe_wallets(
+    address: List[str] = Query(..., description="Wallet address to watch; repeat for several"),
+    tron: TronClient = Depends(get_tron_client),
+    hub: SubscriptionHub = Depends(get_subscription_hub)
+):
+    """
+    Stream changes of balance, energy or bandwidth of the given wallets as Server-Sent Events.
+
+    Each `wallet` event carries the current wallet info: once per address on
+    subscribing (when known) and then only when a value changes. Unknown or
+    invalid addresses get an `error` event. A `close` event ends the stream,
+    e.g. when the client reads too slowly to keep up. Idle streams get a
+    comment line every SUBSCRIPTION_HEARTBEAT seconds.
+
+    All subscribers of an address share one upstream poller.
+    """
+    addresses = list(dict.fromkeys(address))
+    if len(addresses) > SUBSCRIPTION_MAX_ADDRESSES:
+        raise HTTPException(status_code=400, detail=f"At most {SUBSCRIPTION_MAX_ADDRESSES} addresses per subscription")
+    invalid = [item for item in addresses if not is_base58check_address(item)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid Tron address format: {invalid[0]}")
+
+    logger.info(f"→ Subscription to {len(addresses)} addresses")
+
+    async def events() -> AsyncIterator[bytes]:
+        # Subscribing inside the stream ties the subscription to the generator's cleanup.
+        subscriber = hub.subscriber()
+        try:
+            for item in addresses:
+                hub.subscribe(subscriber, item, tron)
+            while True:
+                event = await subscriber.next(SUBSCRIPTION_HEARTBEAT)
+                if event is None:
+                    yield b": ping\n\n"
+                    continue
+                kind, payload = event
+                yield b"event: " + kind.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+                if kind == "close":
+                    return
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
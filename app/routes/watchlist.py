@@ -0,0 +1,73 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from tronpy.keys import is_base58check_address
+
+from app.crud import get_watched_wallets
+from app.deps import get_session, get_watchlist
+from app.logger import logger
+from app.models import WatchedWallet
+from app.schemas import WatchlistEntry, WatchlistIn
+from app.watchlist import Watchlist
+
+router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
+
+
+@router.post("", response_model=WatchlistEntry, status_code=201, responses={
+    201: {"description": "Address is watched"},
+    400: {"description": "Invalid wallet address"},
+})
+async def watch_wallet(
+    payload: WatchlistIn,
+    session: AsyncSession = Depends(get_session),
+    watchlist: Watchlist = Depends(get_watchlist)
+):
+    """
+    Add a wallet address to the watchlist, or update its label.
+
+    Watched addresses are refreshed in the background, most queried and
+    stalest first, and POST /address answers them from the refreshed value
+    while it is within WATCHLIST_FRESHNESS.
+    """
+    if not is_base58check_address(payload.wallet_address):
+        raise HTTPException(status_code=400, detail="Invalid Tron address format")
+    logger.info(f"→ Watching {payload.wallet_address}")
+    row = await watchlist.add(session, payload.wallet_address, payload.label)
+    return _entry(row, watchlist)
+
+
+@router.get("", response_model=List[WatchlistEntry])
+async def list_watched_wallets(
+    session: AsyncSession = Depends(get_session),
+    watchlist: Watchlist = Depends(get_watchlist)
+):
+    """
+    Return all watched addresses with their current hit score and refresh state.
+    """
+    return [_entry(row, watchlist) for row in await get_watched_wallets(session)]
+
+
+@router.delete("/{wallet_address}", status_code=204, responses={
+    204: {"description": "Address is no longer watched"},
+    404: {"description": "Address is not watched"},
+})
+async def unwatch_wallet(
+    wallet_address: str,
+    session: AsyncSession = Depends(get_session),
+    watchlist: Watchlist = Depends(get_watchlist)
+):
+    """
+    Remove a wallet address from the watchlist. Its stored records are kept.
+    """
+    if not await watchlist.remove(session, wallet_address):
+        raise HTTPException(status_code=404, detail="Address is not watched")
+    return Response(status_code=204)
+
+
+def _entry(row: WatchedWallet, watchlist: Watchlist) -> WatchlistEntry:
+    hits = watchlist.hits(row.wallet_address)
+    return WatchlistEntry.model_validate(row).model_copy(update={
+        "hits": row.hits if hits is None else hits,
+        "fresh": watchlist.is_fresh(row.wallet_address),
+    })
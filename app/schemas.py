@@ -1,8 +1,10 @@
 from pydantic import BaseModel, ConfigDict, field_validator, Field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from tronpy.keys import is_base58check_address
 
+from app.config import BATCH_MAX_SIZE
+
 
 class WalletIn(BaseModel):
     """Schema for incoming wallet address in POST request."""
@@ -37,5 +39,84 @@ class WalletDB(WalletOut):
     success: bool
     error_message: Optional[str]
     created_at: datetime
+    observations: int = 1
+    last_seen_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class WalletBatchIn(BaseModel):
+    """Schema for a batch of wallet addresses in POST /addresses request."""
+    wallet_addresses: list[str] = Field(..., min_length=1, max_length=BATCH_MAX_SIZE)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{"wallet_addresses": ["TXYZ1234567890", "TABC0987654321"]}]
+        }
+    }
+
+
+class WalletBatchItem(WalletDB):
+    """Schema representing the stored outcome of one address in a batch lookup."""
+    status_code: int
+
+
+class RecordFilters(BaseModel):
+    """Server-side filters for stored wallet records."""
+    wallet_address: Optional[str] = None
+    success: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def to_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """Naive timestamps are taken as UTC, aware ones are converted to UTC."""
+        if v is None:
+            return v
+        if v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        return v.astimezone(timezone.utc)
+
+
+class WalletHistoryBucket(BaseModel):
+    """Schema representing aggregated successful lookups of one wallet in one time bucket."""
+    bucket_start: datetime
+    count: int
+    balance_min: int
+    balance_max: int
+    balance_avg: float
+    balance_last: int
+    energy_min: int
+    energy_max: int
+    energy_avg: float
+    energy_last: int
+    bandwidth_min: int
+    bandwidth_max: int
+    bandwidth_avg: float
+    bandwidth_last: int
+
+
+class WatchlistIn(BaseModel):
+    """Schema for registering a wallet address on the watchlist."""
+    wallet_address: str = Field(..., min_length=1)
+    label: Optional[str] = Field(None, max_length=200)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{"wallet_address": "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", "label": "treasury"}]
+        }
+    }
+
+
+class WatchlistEntry(BaseModel):
+    """Schema representing a watched wallet and the state of its background refresh."""
+    wallet_address: str
+    label: Optional[str]
+    created_at: datetime
+    hits: float
+    last_refreshed_at: Optional[datetime]
+    last_error: Optional[str]
+    fresh: bool = False
 
     model_config = ConfigDict(from_attributes=True)
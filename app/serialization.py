@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - only in environments installed without it
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize plain data (dicts, lists, row mappings, datetimes) to JSON bytes.
+
+    Uses orjson (a runtime dependency) and falls back to the standard library.
+    Datetimes are written as ISO 8601 with UTC as "Z", matching pydantic.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=dict, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered by `dumps`, without pydantic validation of the content."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return dict(value)
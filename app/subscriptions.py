@@ -0,0 +1,200 @@
+import asyncio
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import SUBSCRIPTION_PERSIST, SUBSCRIPTION_POLL_INTERVAL, SUBSCRIPTION_QUEUE_SIZE
+from app.crud import save_wallet_records, wallet_record_values
+from app.logger import logger
+from app.schemas import WalletOut
+from app.tron import TronClient
+
+# (event name, payload) pushed to subscribers; "close" is always the last one.
+Event = tuple[str, dict]
+
+
+class Subscriber:
+    """
+    One subscription connection: a bounded queue of events for its addresses.
+
+    Args:
+        queue_size (int): Events buffered before the subscriber counts as too slow.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIPTION_QUEUE_SIZE):
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(queue_size)
+        self.addresses: set[str] = set()
+        self.closed = False
+
+    def push(self, event: Event) -> bool:
+        """Queue an event without waiting. Returns False when the queue is full."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, reason: str) -> None:
+        """Queue the final "close" event, discarding pending events if the queue is full."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+        self.queue.put_nowait(("close", {"reason": reason}))
+
+    async def next(self, timeout: float) -> Event | None:
+        """Wait for the next event; None if none arrived within ``timeout`` seconds."""
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class _Topic:
+    __slots__ = ("address", "subscribers", "values", "info", "task")
+
+    def __init__(self, address: str):
+        self.address = address
+        self.subscribers: set[Subscriber] = set()
+        self.values: tuple | None = None
+        self.info: dict | None = None
+        self.task: asyncio.Task | None = None
+
+
+class SubscriptionHub:
+    """
+    Fans out wallet changes to subscribers with one upstream poller per address.
+
+    The first subscriber of an address starts a poller that looks it up every
+    ``interval`` seconds through the Tron client (and so through the wallet
+    cache); the last one leaving stops it. Subscribers only receive an event
+    when balance, energy or bandwidth changed, plus the current value when
+    they subscribe. A subscriber whose queue is full is dropped rather than
+    slowing down the others. Changes can be stored as wallet records.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float = SUBSCRIPTION_POLL_INTERVAL,
+        queue_size: int = SUBSCRIPTION_QUEUE_SIZE,
+        persist: bool = SUBSCRIPTION_PERSIST,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for sessions storing changes.
+            interval (float, optional): Seconds between upstream lookups of an address.
+            queue_size (int, optional): Events buffered per subscriber.
+            persist (bool, optional): Whether changed values are stored as wallet records.
+        """
+        self.session_factory = session_factory
+        self.interval = interval
+        self.queue_size = queue_size
+        self.persist = persist
+
+        self.topics: dict[str, _Topic] = {}
+        self.subscribers: set[Subscriber] = set()
+
+        self.polls = 0
+        self.changes = 0
+        self.drops = 0
+
+    def subscriber(self) -> Subscriber:
+        """Create a subscriber with the configured queue size."""
+        return Subscriber(self.queue_size)
+
+    def subscribe(self, subscriber: Subscriber, address: str, tron: TronClient) -> None:
+        """
+        Subscribe to changes of ``address``, starting its poller if needed.
+
+        The current value, when known, is queued right away.
+        """
+        topic = self.topics.get(address)
+        if topic is None:
+            topic = self.topics[address] = _Topic(address)
+            topic.task = asyncio.create_task(self._poll(topic, tron))
+        topic.subscribers.add(subscriber)
+        subscriber.addresses.add(address)
+        self.subscribers.add(subscriber)
+        if topic.info is not None and not subscriber.push(("wallet", topic.info)):
+            self._drop(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber from all its addresses, stopping pollers nobody needs anymore."""
+        self.subscribers.discard(subscriber)
+        for address in subscriber.addresses:
+            topic = self.topics.get(address)
+            if topic is None:
+                continue
+            topic.subscribers.discard(subscriber)
+            if not topic.subscribers:
+                self._remove(topic)
+        subscriber.addresses.clear()
+
+    def publish(self, address: str, event: Event) -> None:
+        """Queue an event for every subscriber of ``address``, dropping those that are full."""
+        topic = self.topics.get(address)
+        if topic is None:
+            return
+        for subscriber in list(topic.subscribers):
+            if not subscriber.push(event):
+                self._drop(subscriber)
+
+    async def close(self) -> None:
+        """Stop all pollers and end every subscription."""
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.close("shutdown")
+        for topic in list(self.topics.values()):
+            self._remove(topic)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        self.drops += 1
+        logger.warning(f"Dropping slow subscriber of {len(subscriber.addresses)} addresses")
+        self.unsubscribe(subscriber)
+        subscriber.close("slow consumer")
+
+    def _remove(self, topic: _Topic) -> None:
+        if self.topics.get(topic.address) is topic:
+            del self.topics[topic.address]
+        if topic.task is not None and topic.task is not asyncio.current_task():
+            topic.task.cancel()
+
+    async def _poll(self, topic: _Topic, tron: TronClient) -> None:
+        # Runs until the topic is removed, including by a drop during its own publish.
+        while self.topics.get(topic.address) is topic:
+            try:
+                info = await tron.get_wallet_info(topic.address)
+            except ValueError as e:
+                # Invalid or unknown address: it will not start working by polling it.
+                self.publish(topic.address, ("error", {"wallet_address": topic.address, "detail": str(e)}))
+                for subscriber in list(topic.subscribers):
+                    subscriber.addresses.discard(topic.address)
+                    if not subscriber.addresses:
+                        self.subscribers.discard(subscriber)
+                        subscriber.close("no addresses left")
+                self._remove(topic)
+                return
+            except Exception as e:
+                logger.warning(f"Subscription poll of {topic.address} failed: {e}")
+            else:
+                self.polls += 1
+                values = (info["balance"], info["energy"], info["bandwidth"])
+                if values != topic.values:
+                    topic.values, topic.info = values, info
+                    self.changes += 1
+                    self.publish(topic.address, ("wallet", info))
+                    if self.persist:
+                        await self._store(info)
+            await asyncio.sleep(self.interval)
+
+    async def _store(self, info: dict) -> None:
+        try:
+            async with self.session_factory() as session:
+                await save_wallet_records(session, [wallet_record_values(WalletOut(**info))])
+        except Exception as e:
+            logger.error(f"Storing subscription change of {info['wallet_address']} failed: {e}")
@@ -1,20 +1,103 @@
 import asyncio
-from tronpy import Tron
-from tronpy.exceptions import AddressNotFound
+from typing import Awaitable
+
+import httpx
+from tronpy.exceptions import AddressNotFound, BlockNotFound
 from tronpy.keys import is_base58check_address
-from requests.exceptions import RequestException
+
+from app.cache import WalletCache, create_backend
+from app.config import (
+    TRON_API_KEY,
+    TRON_API_URL,
+    TRON_API_URLS,
+    TRON_CACHE_BACKEND,
+    TRON_CACHE_SIZE,
+    TRON_CACHE_STALE_TTL,
+    TRON_CACHE_TTL,
+    TRON_KEEPALIVE_EXPIRY,
+    TRON_MAX_CONNECTIONS,
+    TRON_MAX_KEEPALIVE,
+    TRON_TIMEOUT,
+)
+from app.logger import logger
+from app.nodes import NodePool, TronNode
+from app.ratelimit import OutboundLimiter
 
 
 class TronClient:
     """Client for interacting with the TRON blockchain."""
 
-    def __init__(self):
-        self.client = Tron()
+    def __init__(
+        self,
+        endpoint: str | None = None,
+        endpoints: list[str] | None = None,
+        api_key: str | None = TRON_API_KEY,
+        timeout: float = TRON_TIMEOUT,
+        http_client: httpx.AsyncClient | None = None,
+        cache: WalletCache | None = None,
+    ):
+        """
+        Args:
+            endpoint (str | None, optional): Single full node HTTP API URL.
+            endpoints (list[str] | None, optional): Pool of full node URLs routed by health.
+                Defaults to `endpoint`, then TRON_API_URLS, then TRON_API_URL, then
+                tronpy's default node.
+            api_key (str | None, optional): TronGrid API key. Defaults to tronpy's shared keys.
+            timeout (float, optional): Per-call timeout in seconds.
+            http_client (httpx.AsyncClient | None, optional): Pre-configured HTTP client.
+                A pooled keep-alive client is created when omitted.
+            cache (WalletCache | None, optional): Wallet info cache. Built from settings when omitted.
+        """
+        self.timeout = timeout
+        self.http = http_client or httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=TRON_MAX_CONNECTIONS,
+                max_keepalive_connections=TRON_MAX_KEEPALIVE,
+                keepalive_expiry=TRON_KEEPALIVE_EXPIRY,
+            ),
+        )
+        if endpoints is None:
+            endpoints = [endpoint] if endpoint else TRON_API_URLS or [TRON_API_URL]
+        self.pool = NodePool(
+            [TronNode(url, self.http, api_key, timeout) for url in endpoints],
+            limiter=OutboundLimiter.from_settings(),
+        )
+        self.cache = cache or WalletCache(
+            ttl=TRON_CACHE_TTL,
+            stale_ttl=TRON_CACHE_STALE_TTL,
+            backend=create_backend(TRON_CACHE_BACKEND, TRON_CACHE_SIZE),
+        )
 
     async def get_wallet_info(self, address: str) -> dict:
         """
         Asynchronously retrieve balance, energy, and bandwidth for a TRON wallet address.
 
+        Results are served from the wallet cache when fresh; concurrent lookups
+        of the same address share one upstream fetch. Account and resource data
+        are requested concurrently through the node pool, each attempt bounded
+        by the client timeout.
+
+        Args:
+            address (str): TRON wallet address in Base58Check format.
+
+        Returns:
+            dict: Wallet address, balance, energy, and bandwidth.
+
+        Raises:
+            ValueError: For invalid format or address not found.
+            ConnectionError: For API/network related issues.
+        """
+        if not is_base58check_address(address):
+            raise ValueError("Invalid Tron address format")
+
+        info = await self.cache.get_or_load(address, lambda: self._fetch_wallet_info(address))
+        return dict(info)
+
+    async def refresh_wallet_info(self, address: str) -> dict:
+        """
+        Fetch wallet info from the network, bypassing and then updating the cache.
+
         Args:
             address (str): TRON wallet address in Base58Check format.
 
@@ -28,11 +111,15 @@ class TronClient:
         if not is_base58check_address(address):
             raise ValueError("Invalid Tron address format")
 
-        loop = asyncio.get_running_loop()
+        info = await self.cache.refresh(address, lambda: self._fetch_wallet_info(address))
+        return dict(info)
 
+    async def _fetch_wallet_info(self, address: str) -> dict:
         try:
-            acc = await loop.run_in_executor(None, lambda: self.client.get_account(address))
-            resource = await loop.run_in_executor(None, lambda: self.client.get_account_resource(address))
+            acc, resource = await _gather(
+                self.pool.call(lambda tron: tron.get_account(address)),
+                self.pool.call(lambda tron: tron.get_account_resource(address)),
+            )
 
             return {
                 "wallet_address": address,
@@ -44,8 +131,102 @@ class TronClient:
         except AddressNotFound:
             raise ValueError("Wallet address not found in Tron network")
 
-        except RequestException as e:
+        except TimeoutError:
+            raise ConnectionError(f"Tron API request timed out after {self.timeout}s")
+
+        except httpx.HTTPError as e:
             raise ConnectionError(f"Network error when accessing Tron API: {e}")
 
+        except ConnectionError:
+            raise
+
         except Exception as e:
             raise ConnectionError(f"Unexpected error when fetching wallet info: {e}")
+
+    async def get_latest_block(self) -> dict:
+        """
+        Retrieve the newest block through the node pool.
+
+        Returns:
+            dict: The block, with base58 addresses.
+
+        Raises:
+            ConnectionError: For API/network related issues.
+        """
+        return await self._get_block(lambda tron: tron.get_latest_block())
+
+    async def get_block(self, number: int) -> dict:
+        """
+        Retrieve a block by number through the node pool.
+
+        Args:
+            number (int): Block number.
+
+        Returns:
+            dict: The block, with base58 addresses.
+
+        Raises:
+            LookupError: If the node does not have the block (yet).
+            ConnectionError: For API/network related issues.
+        """
+        return await self._get_block(lambda tron: tron.get_block(number))
+
+    async def _get_block(self, fn) -> dict:
+        try:
+            return await self.pool.call(fn)
+
+        except BlockNotFound:
+            raise LookupError("Block not found in Tron network")
+
+        except TimeoutError:
+            raise ConnectionError(f"Tron API request timed out after {self.timeout}s")
+
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"Network error when accessing Tron API: {e}")
+
+        except ConnectionError:
+            raise
+
+        except Exception as e:
+            raise ConnectionError(f"Unexpected error when fetching block: {e}")
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Open keep-alive connections to every node ahead of the first lookups.
+
+        Sends `connections` concurrent requests to each node's root URL; any
+        HTTP answer completes the TCP and TLS handshake and leaves the
+        connection pooled.
+
+        Args:
+            connections (int): Connections to open per node.
+
+        Returns:
+            int: Number of requests that got an answer.
+        """
+        async def touch(node: TronNode) -> bool:
+            try:
+                await self.http.get(node.endpoint)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Warm-up of Tron node {node.endpoint} failed: {e}")
+                return False
+
+        results = await asyncio.gather(*(touch(node) for node in self.pool.nodes for _ in range(connections)))
+        return sum(results)
+
+    async def close(self) -> None:
+        """Close pooled HTTP connections and the cache backend."""
+        await self.http.aclose()
+        await self.cache.close()
+
+
+async def _gather(*aws: Awaitable):
+    """Run awaitables concurrently, cancelling the rest as soon as one fails."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
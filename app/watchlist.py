@@ -0,0 +1,280 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    WATCHLIST_BATCH_SIZE,
+    WATCHLIST_CONCURRENCY,
+    WATCHLIST_FRESHNESS,
+    WATCHLIST_INTERVAL,
+    WATCHLIST_MAX_AGE,
+)
+from app.crud import (
+    add_watched_wallet,
+    delete_watched_wallet,
+    get_watched_wallets,
+    save_wallet_records,
+    update_watched_wallets,
+    wallet_record_values,
+)
+from app.logger import logger
+from app.models import WatchedWallet
+from app.schemas import WalletOut
+from app.tron import TronClient
+
+# Lookup counts halve every hour, so priority follows recent query frequency.
+HIT_HALF_LIFE = 3600.0
+# Seconds between reloads of the watchlist table, picking up other workers' changes.
+SYNC_INTERVAL = 30.0
+
+
+class _Entry:
+    __slots__ = ("hits", "refreshed_at", "attempted_at", "info", "fetched_at", "valid_at")
+
+    def __init__(self, hits: float, refreshed_at: datetime | None):
+        self.hits = hits
+        self.refreshed_at = refreshed_at
+        self.attempted_at = _timestamp(refreshed_at)
+        self.info: dict | None = None
+        self.fetched_at = 0.0
+        # When `info` was last known to be current: its fetch or a later block without activity.
+        self.valid_at = 0.0
+
+
+class Watchlist:
+    """
+    Watched addresses refreshed in the background and served while fresh.
+
+    Every tick the entries with the highest ``(hits + 1) * staleness`` whose
+    last refresh attempt is older than half the freshness bound are fetched,
+    at most ``batch_size`` of them and ``concurrency`` at a time. Results are
+    stored as regular wallet records. Lookups of a watched address count as
+    a hit and get the prefetched value while it is fresh.
+
+    With a block follower, blocks without activity of an address extend the
+    validity of its value (up to ``max_age`` after its fetch), and activity
+    invalidates it, so refreshes follow on-chain activity.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        freshness: float = WATCHLIST_FRESHNESS,
+        interval: float = WATCHLIST_INTERVAL,
+        batch_size: int = WATCHLIST_BATCH_SIZE,
+        concurrency: int = WATCHLIST_CONCURRENCY,
+        max_age: float = WATCHLIST_MAX_AGE,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for scheduler sessions.
+            freshness (float, optional): Seconds a refreshed value is served for.
+            interval (float, optional): Seconds between scheduler ticks.
+            batch_size (int, optional): Maximum addresses refreshed per tick.
+            concurrency (int, optional): Maximum concurrent upstream lookups.
+            max_age (float, optional): Seconds after its fetch a value is refreshed
+                even if blocks showed no activity of the address.
+        """
+        self.session_factory = session_factory
+        self.freshness = freshness
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_age = max_age
+
+        self.entries: dict[str, _Entry] = {}
+        self._task: asyncio.Task | None = None
+
+        self.served = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.invalidations = 0
+
+    def touch(self, address: str) -> dict | None:
+        """
+        Count a lookup of ``address`` and return its prefetched wallet info if fresh.
+
+        Returns:
+            dict | None: Wallet info as returned by TronClient, or None when the
+                address is not watched or its value is too old.
+        """
+        entry = self.entries.get(address)
+        if entry is None:
+            return None
+        entry.hits += 1
+        if not self._fresh(entry, time.time()):
+            return None
+        self.served += 1
+        return dict(entry.info)
+
+    def is_fresh(self, address: str) -> bool:
+        """Whether a prefetched value of ``address`` would currently be served."""
+        entry = self.entries.get(address)
+        return entry is not None and self._fresh(entry, time.time())
+
+    def hits(self, address: str) -> float | None:
+        """Current decayed lookup count of a watched address."""
+        entry = self.entries.get(address)
+        return entry.hits if entry is not None else None
+
+    def due(self) -> list[str]:
+        """Return the addresses to refresh next, highest priority first."""
+        now = time.time()
+        candidates = [
+            ((entry.hits + 1) * (now - entry.valid_at), address)
+            for address, entry in self.entries.items()
+            if now - entry.attempted_at >= self.freshness / 2
+            and (now - entry.valid_at >= self.freshness / 2 or now - entry.fetched_at >= self.max_age)
+        ]
+        candidates.sort(reverse=True)
+        return [address for _, address in candidates[:self.batch_size]]
+
+    def apply_block_activity(self, addresses: set[str], confirm: bool = True) -> list[str]:
+        """
+        Invalidate the watched addresses active in new blocks.
+
+        Args:
+            addresses (set[str]): Addresses touched by the processed blocks.
+            confirm (bool, optional): Whether the blocks reach the chain head, so
+                the values of inactive addresses are confirmed as still current.
+
+        Returns:
+            list[str]: The watched addresses that were invalidated.
+        """
+        now = time.time()
+        invalidated = []
+        for address, entry in self.entries.items():
+            if address in addresses:
+                entry.info = None
+                entry.valid_at = entry.attempted_at = 0.0
+                invalidated.append(address)
+            elif confirm and entry.info is not None:
+                entry.valid_at = now
+        self.invalidations += len(invalidated)
+        return invalidated
+
+    async def add(self, session: AsyncSession, address: str, label: str | None = None) -> WatchedWallet:
+        """Persist a watched address and schedule it for refresh."""
+        row = await add_watched_wallet(session, address, label)
+        self.entries.setdefault(address, _Entry(row.hits, row.last_refreshed_at))
+        return row
+
+    async def remove(self, session: AsyncSession, address: str) -> bool:
+        """Stop watching an address. Returns whether it was watched."""
+        self.entries.pop(address, None)
+        return await delete_watched_wallet(session, address)
+
+    async def load(self) -> None:
+        """Sync the in-memory entries with the watchlist table, keeping prefetched values."""
+        async with self.session_factory() as session:
+            rows = await get_watched_wallets(session)
+        self.entries = {
+            row.wallet_address: self.entries.get(row.wallet_address) or _Entry(row.hits, row.last_refreshed_at)
+            for row in rows
+        }
+
+    async def refresh(self, tron: TronClient, addresses: list[str]) -> int:
+        """
+        Fetch the given addresses and store the results.
+
+        Successful lookups become wallet records (subject to the storage mode)
+        and are served until they get older than the freshness bound; hits and
+        refresh state are written back to the watchlist table.
+
+        Returns:
+            int: Number of addresses refreshed successfully.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(address: str) -> tuple[str, dict | None, str | None]:
+            async with semaphore:
+                try:
+                    return address, await tron.refresh_wallet_info(address), None
+                except Exception as e:
+                    return address, None, str(e)
+
+        results = await asyncio.gather(*(fetch(address) for address in addresses))
+
+        now = time.time()
+        refreshed_at = datetime.now(timezone.utc)
+        records, rows = [], []
+        for address, info, error in results:
+            entry = self.entries.get(address)
+            if entry is None:
+                continue
+            entry.attempted_at = now
+            if info is not None:
+                entry.info, entry.fetched_at, entry.valid_at, entry.refreshed_at = info, now, now, refreshed_at
+                records.append(wallet_record_values(WalletOut(**info)))
+            else:
+                self.refresh_errors += 1
+                logger.warning(f"Watchlist refresh of {address} failed: {error}")
+            rows.append({
+                "wallet_address": address,
+                "hits": entry.hits,
+                "last_refreshed_at": entry.refreshed_at,
+                "last_error": error,
+            })
+
+        async with self.session_factory() as session:
+            if records:
+                await save_wallet_records(session, records)
+            await update_watched_wallets(session, rows)
+        self.refreshes += len(records)
+        return len(records)
+
+    async def start(self, tron: TronClient) -> None:
+        """Load the watchlist and start the refresh scheduler."""
+        try:
+            await self.load()
+        except Exception as e:
+            # The scheduler reloads the table every SYNC_INTERVAL, so startup does not depend on it.
+            logger.error(f"Loading the watchlist failed: {e}")
+        self._task = asyncio.create_task(self._run(tron))
+
+    async def stop(self) -> None:
+        """Stop the refresh scheduler."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, tron: TronClient) -> None:
+        last_tick = last_sync = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            decay = 0.5 ** ((now - last_tick) / HIT_HALF_LIFE)
+            last_tick = now
+            for entry in self.entries.values():
+                entry.hits *= decay
+            try:
+                if now - last_sync >= SYNC_INTERVAL:
+                    await self.load()
+                    last_sync = now
+                due = self.due()
+                if due:
+                    await self.refresh(tron, due)
+            except Exception as e:
+                logger.error(f"Watchlist refresh tick failed: {e}")
+
+    def _fresh(self, entry: _Entry, now: float) -> bool:
+        return (
+            entry.info is not None
+            and now - entry.valid_at <= self.freshness
+            and now - entry.fetched_at <= self.max_age
+        )
+
+
+def _timestamp(moment: datetime | None) -> float:
+    if moment is None:
+        return 0.0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
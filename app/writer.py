@@ -0,0 +1,178 @@
+import asyncio
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_PUT_TIMEOUT,
+    WRITE_BEHIND_QUEUE_SIZE,
+)
+from app.crud import save_wallet_records, wallet_record_values
+from app.logger import logger
+from app.schemas import WalletDB, WalletOut
+
+
+class WriteBufferFull(Exception):
+    """Raised when the write-behind queue stays full past the put timeout."""
+
+
+class WriterStopped(RuntimeError):
+    """Raised when a record is written while the writer is not running (shutdown or crash)."""
+
+
+class RecordWriter:
+    """
+    Write-behind buffer for wallet records.
+
+    Records are queued in memory and a background task inserts them in
+    multi-row INSERT ... RETURNING batches, flushing when a batch is full or
+    the flush interval elapses. Callers share one commit per batch instead
+    of paying one commit and refresh each.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+        max_queue: int = WRITE_BEHIND_QUEUE_SIZE,
+        put_timeout: float = WRITE_BEHIND_PUT_TIMEOUT,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], AsyncSession]): Factory for flush sessions.
+            batch_size (int, optional): Maximum records per INSERT.
+            flush_interval (float, optional): Seconds to wait for a batch to fill.
+            max_queue (int, optional): Queue capacity before writers are held back.
+            put_timeout (float, optional): Seconds a writer waits for queue space.
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        # Writers that passed the running check and are still putting their item.
+        self._putting = 0
+        self._puts_done = asyncio.Event()
+        self._puts_done.set()
+
+    @property
+    def depth(self) -> int:
+        """Number of records waiting to be flushed."""
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting records and flush everything already queued."""
+        if self._task is None:
+            return
+        self._closed = True
+        # Every put ends within put_timeout, so nothing is queued after the sentinel.
+        await self._puts_done.wait()
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+        # Records left behind when the flush task ended early.
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start:start + self.batch_size])
+
+    async def write(
+        self,
+        data: WalletOut,
+        success: bool = True,
+        error_message: str | None = None
+    ) -> WalletDB:
+        """
+        Queue a wallet record and wait for the batch containing it to commit.
+
+        Args:
+            data (WalletOut): Parsed wallet data.
+            success (bool, optional): Indicates if the retrieval was successful. Defaults to True.
+            error_message (str | None, optional): Error description if failed. Defaults to None.
+
+        Returns:
+            WalletDB: The stored record, built from the queued values and the
+                id and timestamp returned by the batch insert.
+
+        Raises:
+            WriteBufferFull: If the queue has no room within the put timeout.
+            WriterStopped: If the writer is not running.
+        """
+        if self._closed or self._task is None or self._task.done():
+            raise WriterStopped("Record writer is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        item = (wallet_record_values(data, success, error_message), future)
+        self._putting += 1
+        self._puts_done.clear()
+        try:
+            async with asyncio.timeout(self.put_timeout):
+                await self._queue.put(item)
+        except TimeoutError:
+            raise WriteBufferFull(f"Write queue full ({self._queue.maxsize} pending records)")
+        finally:
+            self._putting -= 1
+            if not self._putting:
+                self._puts_done.set()
+
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        async with asyncio.timeout(timeout):
+                            item = await self._queue.get()
+                    except TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                records = await save_wallet_records(session, [values for values, _ in batch])
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(batch)} records failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for record, (_, future) in zip(records, batch):
+            if not future.done():
+                future.set_result(WalletDB.model_validate(record))
@@ -0,0 +1 @@
+# marker
@@ -0,0 +1,176 @@
+"""
+Local stub of a Tron full node HTTP API for benchmarks and tests.
+
+Serves deterministic account data for any address with configurable latency,
+jitter and error rate, plus a synthetic chain of blocks with transfers:
+
+    python -m benchmarks.stub_node --port 8090 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class SyntheticChain:
+    """
+    Blocks served by the stub node.
+
+    With a positive `block_interval` a block is produced every that many
+    seconds, each with `transfers` TRX transfers between addresses drawn from
+    `addresses`. With `block_interval=0` the head only moves on `mine()`,
+    which lets tests decide exactly which addresses a block touches.
+    """
+
+    def __init__(
+        self,
+        addresses: list[str] | None = None,
+        block_interval: float = 0.0,
+        transfers: int = 5,
+        start: int = 1_000_000,
+    ):
+        self.addresses = addresses or []
+        self.block_interval = block_interval
+        self.transfers = transfers
+        self.start = start
+        self.started = time.monotonic()
+        self.mined: dict[int, list[tuple[str, str]]] = {}
+
+    @property
+    def head(self) -> int:
+        if self.block_interval > 0:
+            return self.start + int((time.monotonic() - self.started) / self.block_interval)
+        return self.start + len(self.mined)
+
+    def mine(self, transfers: list[tuple[str, str]]) -> int:
+        """Append a block with the given (from, to) transfers; returns its number."""
+        number = self.head + 1
+        self.mined[number] = transfers
+        return number
+
+    def block(self, number: int) -> dict:
+        """Return block `number` in the node API format, or {} if it does not exist yet."""
+        if number > self.head or number < self.start:
+            return {}
+        transfers = self.mined.get(number)
+        if transfers is None:
+            rng = random.Random(number)
+            transfers = [
+                (rng.choice(self.addresses), rng.choice(self.addresses))
+                for _ in range(self.transfers if self.addresses else 0)
+            ]
+        block_id = hashlib.sha256(str(number).encode()).hexdigest()
+        return {
+            "blockID": block_id,
+            "block_header": {"raw_data": {"number": number, "timestamp": 1_600_000_000_000 + 3000 * number}},
+            "transactions": [
+                {
+                    "txID": hashlib.sha256(f"{block_id}:{index}".encode()).hexdigest(),
+                    "raw_data": {"contract": [{
+                        "type": "TransferContract",
+                        "parameter": {"value": {"owner_address": sender, "to_address": receiver, "amount": 1}},
+                    }]},
+                }
+                for index, (sender, receiver) in enumerate(transfers)
+            ],
+        }
+
+
+def create_stub_app(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+    chain: SyntheticChain | None = None,
+) -> FastAPI:
+    """
+    Build the stub node application.
+
+    Args:
+        latency (float, optional): Base response delay in seconds.
+        jitter (float, optional): Extra uniformly distributed delay in seconds.
+        error_rate (float, optional): Fraction of requests answered with HTTP 500.
+        seed (int | None, optional): Seed for jitter and error sampling.
+        chain (SyntheticChain | None, optional): Blocks to serve. A chain without
+            transfers that only moves on `mine()` when omitted.
+
+    Returns:
+        FastAPI: The stub node application; the chain is `app.state.chain`.
+    """
+    app = FastAPI(title="Tron stub node")
+    app.state.chain = chain = chain or SyntheticChain()
+    rng = random.Random(seed)
+
+    async def simulate() -> JSONResponse | None:
+        delay = latency + (rng.uniform(0, jitter) if jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and rng.random() < error_rate:
+            return JSONResponse({"Error": "stub node failure"}, status_code=500)
+        return None
+
+    @app.post("/wallet/getaccount")
+    async def get_account(request: Request):
+        if error := await simulate():
+            return error
+        address = (await request.json())["address"]
+        return {"address": address, "balance": _metric(address, "balance", 10**12)}
+
+    @app.post("/wallet/getaccountresource")
+    async def get_account_resource(request: Request):
+        if error := await simulate():
+            return error
+        address = (await request.json())["address"]
+        return {
+            "free_net_limit": 600,
+            "EnergyLimit": _metric(address, "energy", 10**6),
+        }
+
+    @app.post("/wallet/getnowblock")
+    async def get_now_block():
+        if error := await simulate():
+            return error
+        return chain.block(chain.head)
+
+    @app.post("/wallet/getblockbynum")
+    async def get_block_by_num(request: Request):
+        if error := await simulate():
+            return error
+        return chain.block((await request.json())["num"])
+
+    return app
+
+
+def _metric(address: str, name: str, bound: int) -> int:
+    digest = hashlib.sha256(f"{address}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % bound
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--block-interval", type=float, default=3.0, help="Seconds per synthetic block")
+    parser.add_argument(
+        "--active-address", action="append", default=[],
+        help="Address taking part in synthetic transfers; repeat for more",
+    )
+    args = parser.parse_args()
+
+    chain = SyntheticChain(args.active_address, block_interval=args.block_interval)
+    app = create_stub_app(args.latency, args.jitter, args.error_rate, args.seed, chain)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
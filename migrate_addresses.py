@@ -0,0 +1,137 @@
+"""
+Convert wallet address columns of an existing database to the compact binary form.
+
+Tables created before addresses were stored as bytes keep them as text. For
+each table the text column is copied into a new binary column in batches,
+then swapped in and its indexes are recreated. wallet_snapshots only holds
+derived data and is rebuilt from wallet_requests. Safe to run again: tables
+that are already binary are skipped and an interrupted conversion resumes
+with the rows not copied yet.
+
+    poetry run python migrate_addresses.py
+"""
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import LargeBinary, bindparam, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.models import Base, WalletFailure, WalletRequest, WalletSnapshot, encode_address
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./local.db")
+BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "10000"))
+
+TABLES = [WalletRequest.__table__, WalletFailure.__table__]
+
+
+async def address_column_is_text(conn: AsyncConnection, table: str) -> bool | None:
+    """Whether the table's wallet_address column still holds text; None if the table does not exist."""
+    def check(sync_conn):
+        inspector = inspect(sync_conn)
+        if not inspector.has_table(table):
+            return None
+        columns = {column["name"]: column["type"] for column in inspector.get_columns(table)}
+        return not isinstance(columns["wallet_address"], LargeBinary)
+    return await conn.run_sync(check)
+
+
+async def address_indexes(conn: AsyncConnection, table: str) -> list[str]:
+    """Names of the table's indexes that cover wallet_address or its binary copy."""
+    def collect(sync_conn):
+        return [
+            index["name"] for index in inspect(sync_conn).get_indexes(table)
+            if {"wallet_address", "wallet_address_raw"} & set(index["column_names"])
+        ]
+    return await conn.run_sync(collect)
+
+
+async def has_raw_column(conn: AsyncConnection, table: str) -> bool:
+    """Whether an interrupted run already added the binary copy column."""
+    def check(sync_conn):
+        return any(column["name"] == "wallet_address_raw" for column in inspect(sync_conn).get_columns(table))
+    return await conn.run_sync(check)
+
+
+async def migrate_table(engine, table) -> None:
+    name = table.name
+    async with engine.begin() as conn:
+        state = await address_column_is_text(conn, name)
+        if not state:
+            print(f"{name}: nothing to migrate")
+            return
+        if await has_raw_column(conn, name):
+            print(f"{name}: resuming an interrupted run")
+        else:
+            binary = LargeBinary().compile(dialect=conn.dialect)
+            await conn.execute(text(f"ALTER TABLE {name} ADD COLUMN wallet_address_raw {binary}"))
+
+    converted = 0
+    while True:
+        # One transaction per batch keeps locks and undo short on large tables.
+        async with engine.begin() as conn:
+            rows = (await conn.execute(
+                text(f"SELECT id, wallet_address FROM {name} WHERE wallet_address_raw IS NULL LIMIT :limit"),
+                {"limit": BATCH_SIZE},
+            )).all()
+            if not rows:
+                break
+            await conn.execute(
+                text(f"UPDATE {name} SET wallet_address_raw = :raw WHERE id = :row_id").bindparams(
+                    bindparam("raw", type_=LargeBinary)
+                ),
+                [{"raw": encode_address(address), "row_id": row_id} for row_id, address in rows],
+            )
+        converted += len(rows)
+        print(f"{name}: {converted} rows converted")
+
+    async with engine.begin() as conn:
+        # Older databases carry indexes the current model no longer names,
+        # e.g. ix_wallet_requests_wallet_address; SQLite refuses to drop a
+        # column that is still indexed.
+        stale = {index.name for index in table.indexes} | set(await address_indexes(conn, name))
+        for index in sorted(stale):
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        await conn.execute(text(f"ALTER TABLE {name} DROP COLUMN wallet_address"))
+        await conn.execute(text(f"ALTER TABLE {name} RENAME COLUMN wallet_address_raw TO wallet_address"))
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN wallet_address SET NOT NULL"))
+        for index in table.indexes:
+            await conn.run_sync(index.create)
+    print(f"{name}: done")
+
+
+async def rebuild_snapshots(engine) -> None:
+    """Recreate wallet_snapshots from the newest successful record of each address."""
+    async with engine.begin() as conn:
+        await conn.run_sync(WalletSnapshot.__table__.drop, checkfirst=True)
+        await conn.run_sync(WalletSnapshot.__table__.create)
+        await conn.execute(text(
+            "INSERT INTO wallet_snapshots (wallet_address, record_id, balance, energy, bandwidth) "
+            "SELECT r.wallet_address, r.id, r.balance, r.energy, r.bandwidth FROM wallet_requests r "
+            "WHERE r.id = (SELECT max(l.id) FROM wallet_requests l "
+            "WHERE l.wallet_address = r.wallet_address AND l.success = :success)"
+        ), {"success": True})
+    print("wallet_snapshots: rebuilt")
+
+
+async def migrate(database_url: str = DATABASE_URL) -> None:
+    engine = create_async_engine(database_url)
+    try:
+        for table in TABLES:
+            await migrate_table(engine, table)
+        async with engine.begin() as conn:
+            snapshots_binary = await address_column_is_text(conn, WalletSnapshot.__tablename__) is False
+            await conn.run_sync(Base.metadata.create_all)
+        if snapshots_binary:
+            print("wallet_snapshots: nothing to migrate")
+        else:
+            await rebuild_snapshots(engine)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
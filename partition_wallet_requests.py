@@ -0,0 +1,95 @@
+"""
+Convert wallet_requests of a PostgreSQL database into a table partitioned by created_at.
+
+The existing table is renamed, a table partitioned by range of created_at
+is created in its place with the same columns, id sequence and indexes,
+and one partition per RETENTION_PERIOD is created from the oldest record
+up to RETENTION_PREMAKE periods ahead, plus a default partition for
+anything outside. The rows are then copied over and the old table is
+dropped, all in one transaction: the table is locked while it runs.
+Safe to run again: an already partitioned table is left alone.
+
+Afterwards keep RETENTION_JOB enabled in one instance so future
+partitions are created in time.
+
+    poetry run python partition_wallet_requests.py
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import RETENTION_PERIOD, RETENTION_PREMAKE
+from app.models import WalletRequest
+from app.retention import TABLE, create_partition_sql, next_period, period_start
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./local.db")
+
+LEGACY = f"{TABLE}_unpartitioned"
+
+
+async def partition(database_url: str = DATABASE_URL) -> None:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.begin() as conn:
+            if conn.dialect.name != "postgresql":
+                print(f"{TABLE}: partitioning needs PostgreSQL, nothing to do")
+                return
+            partitioned = await conn.scalar(text(
+                f"SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('{TABLE}'))"
+            ))
+            if partitioned:
+                print(f"{TABLE}: already partitioned")
+                return
+
+            await conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}"))
+            await conn.execute(text(f"ALTER TABLE {LEGACY} RENAME CONSTRAINT {TABLE}_pkey TO {LEGACY}_pkey"))
+            for index in WalletRequest.__table__.indexes:
+                await conn.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+
+            # The partition key has to be part of the primary key.
+            await conn.execute(text(
+                f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+            ))
+            await conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)"))
+            # Otherwise the id sequence would be dropped with the old table.
+            await conn.execute(text(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id"))
+            for index in WalletRequest.__table__.indexes:
+                await conn.run_sync(index.create)
+
+            now = datetime.now(timezone.utc)
+            oldest = await conn.scalar(text(f"SELECT min(created_at) FROM {LEGACY}"))
+            start = period_start(min(oldest or now, now), RETENTION_PERIOD)
+            last = period_start(now, RETENTION_PERIOD)
+            for _ in range(RETENTION_PREMAKE):
+                last = next_period(last, RETENTION_PERIOD)
+            count = 0
+            while start <= last:
+                end = next_period(start, RETENTION_PERIOD)
+                await conn.execute(text(create_partition_sql(start, end)))
+                start = end
+                count += 1
+            await conn.execute(text(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT"))
+            print(f"{TABLE}: {count} partitions created")
+
+            columns = [column.name for column in WalletRequest.__table__.columns]
+            # created_at is part of the key now; rows without one are placed by when they were seen.
+            values = [
+                "coalesce(created_at, last_seen_at, now())" if name == "created_at" else name for name in columns
+            ]
+            copied = await conn.execute(text(
+                f"INSERT INTO {TABLE} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {LEGACY}"
+            ))
+            await conn.execute(text(f"DROP TABLE {LEGACY}"))
+            print(f"{TABLE}: {copied.rowcount} rows copied, done")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(partition())
@@ -1,3 +1,4 @@
+import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -5,7 +6,16 @@ from sqlalchemy.pool import NullPool
 from httpx import AsyncClient, ASGITransport
 
 from app.main import app
-from app.deps import get_session
+from app.deps import (
+    get_failure_tracker,
+    get_read_session,
+    get_read_session_factory,
+    get_session,
+    get_session_factory,
+    get_watchlist,
+)
+from app.failures import FailureTracker
+from app.watchlist import Watchlist
 from app.models import Base
 
 
@@ -28,30 +38,47 @@ async def engine_and_connection():
     await engine.dispose()
 
 
+@pytest.fixture()
+def session_factory(engine_and_connection):
+    """
+    Provides a session factory bound to the shared in-memory database connection,
+    for code under test that opens its own sessions.
+    """
+    _, conn = engine_and_connection
+    return sessionmaker(bind=conn, class_=AsyncSession, expire_on_commit=False)
+
+
 @pytest_asyncio.fixture()
-async def async_session(engine_and_connection):
+async def async_session(session_factory):
     """
     Provides a new SQLAlchemy async session for each test.
 
     Uses the shared in-memory database connection.
     """
-    engine, conn = engine_and_connection
-    session_factory = sessionmaker(bind=conn, class_=AsyncSession, expire_on_commit=False)
     async with session_factory() as session:
         yield session
 
 
 @pytest_asyncio.fixture()
-async def client(async_session):
+async def client(async_session, session_factory):
     """
     Provides an HTTPX AsyncClient with overridden dependencies.
 
-    Supports overriding get_session and other dependencies via FastAPI's dependency_overrides.
+    Supports overriding get_session, get_session_factory and other dependencies
+    via FastAPI's dependency_overrides. Reads and writes share the test database
+    and each test gets its own negative cache, failure counters and watchlist.
     """
     async def override_get_session():
         yield async_session
 
     app.dependency_overrides[get_session] = override_get_session  # type: ignore
+    app.dependency_overrides[get_session_factory] = lambda: session_factory  # type: ignore
+    app.dependency_overrides[get_read_session] = override_get_session  # type: ignore
+    app.dependency_overrides[get_read_session_factory] = lambda: session_factory  # type: ignore
+    failures = FailureTracker(session_factory)
+    app.dependency_overrides[get_failure_tracker] = lambda: failures  # type: ignore
+    watchlist = Watchlist(session_factory)
+    app.dependency_overrides[get_watchlist] = lambda: watchlist  # type: ignore
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as c:
@@ -1,8 +1,12 @@
+import csv
+import io
+import json
+
 import pytest
 from unittest.mock import MagicMock
 
-from app.schemas import WalletOut
-from app.crud import create_wallet_record
+from app.schemas import WalletDB, WalletOut
+from app.crud import create_wallet_record, save_wallet_records, wallet_record_values
 from app.tron import TronClient
 from app.deps import get_tron_client
 from app.main import app
@@ -62,6 +66,28 @@ async def test_get_records(client, async_session):
     assert any(record["wallet_address"] == "mock_trongrid_address" for record in data)
 
 
+@pytest.mark.asyncio
+async def test_get_records_delta_observations(client, async_session):
+    """
+    Integration test for GET /records with delta storage.
+
+    Ensures one record is returned per change, carrying how often it was
+    observed and when it was last seen.
+    """
+    def observation(balance: int) -> dict:
+        data = WalletOut(wallet_address="delta_records_addr", balance=balance, energy=0, bandwidth=0)
+        return wallet_record_values(data, True, None)
+
+    await save_wallet_records(async_session, [observation(1), observation(1), observation(1)], mode="delta")
+    await save_wallet_records(async_session, [observation(2)], mode="delta")
+
+    response = await client.get("/records?wallet_address=delta_records_addr")
+    assert response.status_code == 200
+    records = response.json()
+    assert [(record["balance"], record["observations"]) for record in records] == [(2, 1), (1, 3)]
+    assert records[1]["last_seen_at"] is not None
+
+
 @pytest.mark.asyncio
 async def test_post_address_with_none_fields(client):
     """
@@ -182,3 +208,205 @@ async def test_post_address_unexpected_error(client):
     assert "Unexpected error" in response.json()["detail"]
 
     app.dependency_overrides.clear()  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_post_addresses_batch(client):
+    """
+    Test POST /addresses with a mix of successful and failing lookups.
+
+    Ensures every address gets its own stored record and status code
+    while the batch itself succeeds.
+    """
+    async def fake_wallet_info(address):
+        if address == "TXYZbad":
+            raise ValueError("Invalid Tron address format")
+        if address == "TXYZdown":
+            raise ConnectionError("Network error")
+        return {"wallet_address": address, "balance": 1, "energy": 2, "bandwidth": 3}
+
+    mock_tron = MagicMock(spec=TronClient)
+    mock_tron.get_wallet_info.side_effect = fake_wallet_info
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+
+    payload = {"wallet_addresses": ["TXYZok1", "TXYZbad", "TXYZdown", "TXYZok2"]}
+    response = await client.post("/addresses", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [item["wallet_address"] for item in data] == payload["wallet_addresses"]
+    assert [item["status_code"] for item in data] == [200, 400, 503, 200]
+    assert [item["success"] for item in data] == [True, False, False, True]
+    assert data[0]["balance"] == 1
+    assert "Network error" in data[2]["error_message"]
+    assert all(item["id"] is not None for item in data)
+
+    app.dependency_overrides.clear()  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_post_addresses_empty_batch(client):
+    """
+    Test POST /addresses with an empty list.
+
+    Ensures the batch size validation returns 400.
+    """
+    response = await client.post("/addresses", json={"wallet_addresses": []})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_records_cursor_pagination(client, async_session):
+    """
+    Test GET /records keyset pagination.
+
+    Ensures that following X-Next-Cursor visits the same records, in the
+    same order, as a single offset-based page.
+    """
+    for i in range(5):
+        wallet = WalletOut(wallet_address=f"cursor_{i}", balance=i, energy=0, bandwidth=0)
+        await create_wallet_record(async_session, wallet)
+
+    expected = [r["id"] for r in (await client.get("/records?limit=1000")).json()]
+
+    seen = []
+    response = await client.get("/records?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(r["id"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = await client.get(f"/records?limit=2&cursor={cursor}")
+
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_get_records_invalid_cursor(client):
+    """
+    Test GET /records with a malformed cursor.
+
+    Ensures a 400 response is returned.
+    """
+    response = await client.get("/records?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+async def test_get_records_filters(client, async_session):
+    """
+    Test GET /records with wallet address, success and time range filters.
+
+    Ensures only matching records are returned.
+    """
+    ok = WalletOut(wallet_address="filter_addr", balance=1, energy=0, bandwidth=0)
+    failed = WalletOut(wallet_address="filter_addr", balance=0, energy=0, bandwidth=0)
+    other = WalletOut(wallet_address="filter_other", balance=2, energy=0, bandwidth=0)
+    first = await create_wallet_record(async_session, ok)
+    await create_wallet_record(async_session, failed, success=False, error_message="Network error")
+    await create_wallet_record(async_session, other)
+
+    response = await client.get("/records?limit=100&wallet_address=filter_addr")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert all(r["wallet_address"] == "filter_addr" for r in data)
+
+    response = await client.get("/records?limit=100&wallet_address=filter_addr&success=false")
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["error_message"] == "Network error"
+
+    created = first.created_at.isoformat()
+    response = await client.get(
+        "/records", params={"limit": 100, "wallet_address": "filter_addr", "created_to": created}
+    )
+    assert response.json() == []
+
+    response = await client.get(
+        "/records", params={"limit": 100, "wallet_address": "filter_addr", "created_from": created}
+    )
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_latest_wallet_record(client, async_session):
+    """
+    Test GET /wallets/{address}/latest.
+
+    Ensures the newest successful record is returned, failures are skipped,
+    and unknown wallets give 404.
+    """
+    for balance in (10, 20):
+        wallet = WalletOut(wallet_address="latest_addr", balance=balance, energy=0, bandwidth=0)
+        await create_wallet_record(async_session, wallet)
+    failed = WalletOut(wallet_address="latest_addr", balance=0, energy=0, bandwidth=0)
+    await create_wallet_record(async_session, failed, success=False, error_message="Network error")
+
+    response = await client.get("/wallets/latest_addr/latest")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["balance"] == 20
+    assert data["success"] is True
+
+    response = await client.get("/wallets/unknown_addr/latest")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_export_records_ndjson(client, async_session):
+    """
+    Test GET /records/export in NDJSON format with a wallet filter.
+
+    Ensures one JSON object per matching record is streamed, oldest first.
+    """
+    for balance in (1, 2, 3):
+        wallet = WalletOut(wallet_address="export_addr", balance=balance, energy=0, bandwidth=0)
+        await create_wallet_record(async_session, wallet)
+
+    response = await client.get("/records/export?wallet_address=export_addr")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["balance"] for line in lines] == [1, 2, 3]
+    assert all(line["wallet_address"] == "export_addr" for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_export_records_csv(client, async_session):
+    """
+    Test GET /records/export in CSV format.
+
+    Ensures a header row followed by one row per matching record.
+    """
+    wallet = WalletOut(wallet_address="export_csv", balance=7, energy=8, bandwidth=9)
+    await create_wallet_record(async_session, wallet)
+
+    response = await client.get("/records/export?format=csv&wallet_address=export_csv")
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["wallet_address"] == "export_csv"
+    assert rows[0]["bandwidth"] == "9"
+
+
+@pytest.mark.asyncio
+async def test_get_records_matches_schema(client, async_session):
+    """
+    Test that the column-only /records read path returns exactly what
+    serializing the record through WalletDB would.
+    """
+    wallet = WalletOut(wallet_address="schema_addr", balance=None, energy=1, bandwidth=2)
+    record = await create_wallet_record(async_session, wallet, success=False, error_message="ünïcode")
+    await async_session.refresh(record)
+
+    response = await client.get("/records?limit=1&wallet_address=schema_addr")
+    assert response.status_code == 200
+    assert response.json() == [WalletDB.model_validate(record).model_dump(mode="json")]
@@ -0,0 +1,100 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.blocks import BlockFollower, touched_addresses
+from app.tron import TronClient
+from app.watchlist import Watchlist
+from benchmarks.stub_node import SyntheticChain, create_stub_app
+
+# Addresses of the private keys 0x01.., 0x02.., 0x03..: not used by other tests.
+TREASURY = "TCNkawTmcQgYSU8nP8cHswT1QPjharxJr7"
+COLD = "THHsfg2eNiv6MSXC4y5d4t5wkvRVADRKiF"
+OTHER = "TEdea7WvtoCNceWPwaz7JbkBjbb6omTQcL"
+
+
+@pytest_asyncio.fixture()
+async def watchlist(session_factory):
+    """A watchlist whose entries are removed again after the test."""
+    watchlist = Watchlist(session_factory)
+    yield watchlist
+    async with session_factory() as session:
+        for address in list(watchlist.entries):
+            await watchlist.remove(session, address)
+
+
+@pytest_asyncio.fixture()
+async def stub():
+    """A stub node whose chain only moves when a test mines a block, and a client using it."""
+    chain = SyntheticChain()
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_stub_app(chain=chain)))
+    tron = TronClient(endpoint="http://stub/", http_client=http)
+    yield chain, tron
+    await tron.close()
+
+
+def test_touched_addresses():
+    block = SyntheticChain([TREASURY, COLD], transfers=0).block(1_000_000)
+    assert touched_addresses(block) == set()
+
+    chain = SyntheticChain()
+    number = chain.mine([(TREASURY, OTHER)])
+    assert touched_addresses(chain.block(number)) == {TREASURY, OTHER}
+
+
+@pytest.mark.asyncio
+async def test_follower_invalidates_active_addresses_and_resumes(stub, watchlist, session_factory):
+    """
+    Ensures only watched addresses touched by new blocks lose their prefetched
+    value, inactive ones stay valid, and a new follower resumes at the
+    persisted cursor.
+    """
+    chain, tron = stub
+    async with session_factory() as session:
+        for address in (TREASURY, COLD):
+            await watchlist.add(session, address)
+
+    follower = BlockFollower(session_factory, watchlist, name="test-resume", batch_size=10)
+    assert await follower.poll(tron) == 0
+    assert follower.cursor == chain.head
+
+    assert await watchlist.refresh(tron, [TREASURY, COLD]) == 2
+    chain.mine([(TREASURY, OTHER)])
+    chain.mine([])
+    assert await follower.poll(tron) == 2
+    assert follower.lag == 0
+    assert not watchlist.is_fresh(TREASURY)
+    assert watchlist.is_fresh(COLD)
+    assert watchlist.due() == [TREASURY]
+
+    resumed = BlockFollower(session_factory, watchlist, name="test-resume")
+    chain.mine([(OTHER, COLD)])
+    assert await resumed.poll(tron) == 1
+    assert resumed.cursor == chain.head
+    assert not watchlist.is_fresh(COLD)
+
+
+@pytest.mark.asyncio
+async def test_follower_skips_ahead_when_too_far_behind(stub, watchlist, session_factory):
+    """
+    Ensures a follower beyond max_lag jumps to the head and invalidates every
+    watched address instead of reading all missed blocks.
+    """
+    chain, tron = stub
+    async with session_factory() as session:
+        await watchlist.add(session, COLD)
+    follower = BlockFollower(session_factory, watchlist, name="test-lag", batch_size=2, max_lag=3)
+
+    await follower.poll(tron)
+    await watchlist.refresh(tron, [COLD])
+    for _ in range(2):
+        chain.mine([])
+    assert await follower.poll(tron) == 2
+    assert watchlist.is_fresh(COLD)
+
+    for _ in range(5):
+        chain.mine([])
+    assert await follower.poll(tron) == 0
+    assert follower.skips == 1
+    assert follower.cursor == chain.head
+    assert not watchlist.is_fresh(COLD)
@@ -0,0 +1,217 @@
+import asyncio
+import time
+
+import pytest
+
+from app.cache import CacheBackend, MemoryBackend, RedisBackend, SQLiteBackend, WalletCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_load():
+    """
+    Ensures concurrent misses for one key are coalesced into a single load
+    and later lookups are served from the cache.
+    """
+    cache = WalletCache(maxsize=10, ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"balance": 1}
+
+    results = await asyncio.gather(*(cache.get_or_load("A", loader) for _ in range(5)))
+    assert all(r == {"balance": 1} for r in results)
+
+    await cache.get_or_load("A", loader)
+
+    assert calls == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["coalesced"] == 4
+    assert cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_bypasses_fresh_entry():
+    """
+    Ensures refresh loads upstream despite a fresh entry and later lookups
+    get the refreshed value.
+    """
+    cache = WalletCache(maxsize=10, ttl=60)
+
+    async def value(v):
+        return v
+
+    assert await cache.get_or_load("A", lambda: value(1)) == 1
+    assert await cache.refresh("A", lambda: value(2)) == 2
+    assert await cache.get_or_load("A", lambda: value(3)) == 2
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_failed_loads_not_cached():
+    """
+    Ensures the least recently used entry is evicted at capacity and that
+    a failing loader leaves nothing behind.
+    """
+    cache = WalletCache(maxsize=2, ttl=60)
+
+    async def value(v):
+        return v
+
+    await cache.get_or_load("A", lambda: value(1))
+    await cache.get_or_load("B", lambda: value(2))
+    await cache.get_or_load("A", lambda: value(1))
+    await cache.get_or_load("C", lambda: value(3))
+
+    assert await cache.get_or_load("A", lambda: value(-1)) == 1
+    assert await cache.get_or_load("B", lambda: value(-2)) == -2
+    assert cache.stats["evictions"] >= 1
+
+    async def failing():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        await cache.get_or_load("D", failing)
+    assert await cache.get_or_load("D", lambda: value(4)) == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing():
+    """
+    Ensures an expired entry inside the stale window is returned immediately
+    and replaced by a background refresh.
+    """
+    cache = WalletCache(maxsize=10, ttl=0.01, stale_ttl=60)
+
+    async def value(v):
+        return v
+
+    await cache.get_or_load("A", lambda: value("old"))
+    await asyncio.sleep(0.02)
+
+    assert await cache.get_or_load("A", lambda: value("new")) == "old"
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert await cache.get_or_load("A", lambda: value("newer")) == "new"
+    assert cache.stats["stale"] == 1
+
+
+async def fake_redis_server():
+    """Minimal RESP server supporting GET, SET ... PX, DEL and SCAN, enough for RedisBackend."""
+    store: dict[bytes, tuple[bytes, float]] = {}
+
+    async def read_command(reader):
+        count = int((await reader.readline())[1:])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle(reader, writer):
+        while not reader.at_eof():
+            try:
+                command, *args = await read_command(reader)
+            except (asyncio.IncompleteReadError, ValueError):
+                break
+            command = command.upper()
+            if command == b"GET":
+                value, deadline = store.get(args[0], (None, 0.0))
+                if value is None or time.time() >= deadline:
+                    writer.write(b"$-1\r\n")
+                else:
+                    writer.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"SET":
+                store[args[0]] = (args[1], time.time() + int(args[3]) / 1000)
+                writer.write(b"+OK\r\n")
+            elif command == b"DEL":
+                removed = sum(store.pop(key, None) is not None for key in args)
+                writer.write(b":%d\r\n" % removed)
+            elif command == b"SCAN":
+                prefix = args[2].rstrip(b"*")
+                keys = [key for key in store if key.startswith(prefix)]
+                writer.write(b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys))
+                for key in keys:
+                    writer.write(b"$%d\r\n%s\r\n" % (len(key), key))
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["memory", "sqlite", "redis"])
+async def test_backends_share_ttl_semantics(kind, tmp_path):
+    """
+    Ensures every backend serves fresh entries, serves expired ones only
+    inside the stale window, and that two caches on a shared backend (two
+    workers) see each other's entries.
+    """
+    server = None
+    if kind == "memory":
+        first = second = MemoryBackend()
+    elif kind == "sqlite":
+        first = SQLiteBackend(str(tmp_path / "cache.db"))
+        second = SQLiteBackend(str(tmp_path / "cache.db"))
+    else:
+        server, port = await fake_redis_server()
+        first = RedisBackend(f"redis://127.0.0.1:{port}/0")
+        second = RedisBackend(f"redis://127.0.0.1:{port}/0")
+
+    worker_a = WalletCache(ttl=0.05, stale_ttl=0.1, backend=first)
+    worker_b = WalletCache(ttl=0.05, stale_ttl=0.1, backend=second)
+
+    async def value(v):
+        return v
+
+    assert await worker_a.get_or_load("A", lambda: value({"balance": 1})) == {"balance": 1}
+    assert await worker_b.get_or_load("A", lambda: value({"balance": 2})) == {"balance": 1}
+    assert worker_b.stats["hits"] == 1
+
+    await asyncio.sleep(0.07)
+    assert await worker_b.get_or_load("A", lambda: value({"balance": 3})) == {"balance": 1}
+    assert worker_b.stats["stale"] == 1
+
+    await asyncio.sleep(0.2)
+    await worker_a.clear()
+    assert await worker_b.get_or_load("A", lambda: value({"balance": 4})) == {"balance": 4}
+
+    await worker_a.invalidate("A")
+    assert await worker_b.get_or_load("A", lambda: value({"balance": 5})) == {"balance": 5}
+    assert worker_a.stats["errors"] == worker_b.stats["errors"] == 0
+
+    await worker_a.close()
+    await worker_b.close()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_backend_failure_degrades_to_uncached():
+    """
+    Ensures an unreachable backend does not fail lookups.
+    """
+    cache = WalletCache(ttl=60, backend=RedisBackend("redis://127.0.0.1:1/0", timeout=0.5))
+
+    async def value(v):
+        return v
+
+    assert await cache.get_or_load("A", lambda: value(1)) == 1
+    assert cache.stats["errors"] == 2
+
+
+def test_incomplete_backend_rejected():
+    """
+    Ensures a backend missing any of the storage methods cannot be created.
+    """
+    class GetOnly(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="abstract"):
+        GetOnly()
@@ -1,8 +1,15 @@
 import pytest
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.crud import create_wallet_record
+from app.crud import (
+    create_wallet_record,
+    create_wallet_records,
+    save_wallet_record,
+    save_wallet_records,
+    wallet_record_values,
+)
 from app.schemas import WalletOut
-from app.models import WalletRequest
+from app.models import WalletRequest, WalletSnapshot
 
 
 @pytest.mark.asyncio
@@ -67,3 +74,65 @@ async def test_create_wallet_record_failure(async_session: AsyncSession):
     assert record.success is False
     assert record.error_message == error_message
     assert record.created_at is not None
+
+
+@pytest.mark.asyncio
+async def test_create_wallet_records_bulk(async_session: AsyncSession):
+    """
+    Unit test for bulk wallet record creation.
+
+    Verifies that all records are inserted in input order with ids assigned.
+    """
+    records = [
+        wallet_record_values(WalletOut(wallet_address=f"bulk_{i}", balance=i, energy=0, bandwidth=0))
+        for i in range(3)
+    ]
+    records.append(wallet_record_values(
+        WalletOut(wallet_address="bulk_failed", balance=0, energy=0, bandwidth=0),
+        success=False,
+        error_message="Network error",
+    ))
+
+    created = await create_wallet_records(async_session, records)
+
+    assert [r.wallet_address for r in created] == ["bulk_0", "bulk_1", "bulk_2", "bulk_failed"]
+    assert all(r.id is not None and r.created_at is not None for r in created)
+    assert created[1].balance == 1
+    assert created[3].success is False
+    assert created[3].error_message == "Network error"
+
+
+@pytest.mark.asyncio
+async def test_delta_storage_appends_only_changes(async_session: AsyncSession):
+    """
+    Unit test for change-only snapshot storage.
+
+    Ensures unchanged observations are counted on the current record,
+    changed values append a new record and failures are always stored.
+    """
+    def observation(balance: int, success: bool = True) -> dict:
+        data = WalletOut(wallet_address="delta_addr", balance=balance, energy=1, bandwidth=2)
+        return wallet_record_values(data, success, None if success else "Network error")
+
+    data = WalletOut(wallet_address="delta_addr", balance=10, energy=1, bandwidth=2)
+    first = await save_wallet_record(async_session, data, mode="delta")
+    again = await save_wallet_records(async_session, [observation(10), observation(10)], mode="delta")
+    assert [record.id for record in again] == [first.id, first.id]
+    assert again[0].observations == 3
+    assert again[0].last_seen_at is not None
+
+    changed = await save_wallet_records(
+        async_session, [observation(20), observation(0, success=False), observation(20)], mode="delta"
+    )
+    assert changed[0].id != first.id
+    assert changed[0].id == changed[2].id
+    assert changed[0].observations == 2
+    assert changed[1].success is False
+
+    snapshot = await async_session.get(WalletSnapshot, "delta_addr")
+    assert (snapshot.record_id, snapshot.balance) == (changed[0].id, 20)
+
+    stored = await async_session.scalar(
+        select(func.count()).select_from(WalletRequest).where(WalletRequest.wallet_address == "delta_addr")
+    )
+    assert stored == 3
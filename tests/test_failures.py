@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from unittest.mock import MagicMock
+
+from app.deps import get_failure_tracker, get_tron_client
+from app.failures import FailureTracker
+from app.main import app
+from app.models import WalletFailure, WalletRequest
+from app.tron import TronClient
+
+
+@pytest.mark.asyncio
+async def test_policy_and_flush(session_factory, async_session):
+    """
+    Ensures the "first" policy asks for one row per key and flush interval,
+    and flushed counters land in wallet_failures aggregated per key.
+    """
+    tracker = FailureTracker(session_factory, policy="first", negative_ttl=0)
+
+    writes = [tracker.record("failing_addr", 503, "ConnectionError", f"down {i}") for i in range(5)]
+    assert writes == [True, False, False, False, False]
+    assert tracker.record("failing_addr", 500, "RuntimeError", "boom") is True
+    assert tracker.rows_suppressed == 4
+
+    assert await tracker.flush() == 2
+    assert tracker.pending == 0
+    assert tracker.record("failing_addr", 503, "ConnectionError", "down again") is True
+
+    rows = (await async_session.scalars(
+        select(WalletFailure).where(WalletFailure.wallet_address == "failing_addr")
+    )).all()
+    counts = {(row.status_code, row.error_class): (row.count, row.last_message) for row in rows}
+    assert counts == {(503, "ConnectionError"): (5, "down 4"), (500, "RuntimeError"): (1, "boom")}
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_only_keeps_client_errors(session_factory):
+    """
+    Ensures only 400 answers are cached and entries expire after the TTL.
+    """
+    tracker = FailureTracker(session_factory, policy="none", negative_ttl=0.05)
+
+    tracker.record("bad_addr", 400, "ValueError", "Invalid TRON address")
+    tracker.record("flaky_addr", 503, "ConnectionError", "down")
+
+    assert tracker.check("bad_addr") == (400, "ValueError", "Invalid TRON address")
+    assert tracker.check("flaky_addr") is None
+    assert tracker.negative_hits == 1
+
+    await asyncio.sleep(0.06)
+    assert tracker.check("bad_addr") is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_bad_address_skips_io(client, async_session):
+    """
+    Integration test for POST /address with a repeatedly requested unknown address.
+
+    Ensures repeats are rejected from the negative cache without calling the
+    Tron API or storing records, and are still counted in wallet_failures.
+    """
+    mock_tron = MagicMock(spec=TronClient)
+    mock_tron.get_wallet_info.side_effect = ValueError("Account not found on TRON network")
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+
+    for _ in range(3):
+        response = await client.post("/address", json={"wallet_address": "negative_cache_addr"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Account not found on TRON network"
+
+    assert mock_tron.get_wallet_info.call_count == 1
+    stored = await async_session.scalar(
+        select(func.count()).select_from(WalletRequest).where(WalletRequest.wallet_address == "negative_cache_addr")
+    )
+    assert stored == 1
+
+    tracker = app.dependency_overrides[get_failure_tracker]()
+    assert await tracker.flush() == 1
+    count = await async_session.scalar(
+        select(WalletFailure.count).where(WalletFailure.wallet_address == "negative_cache_addr")
+    )
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_pending_counters_flushed_early(session_factory, async_session):
+    """
+    Ensures reaching max_pending distinct keys flushes without waiting for the interval.
+    """
+    tracker = FailureTracker(session_factory, policy="none", negative_ttl=0, flush_interval=3600, max_pending=3)
+
+    addresses = [f"early_flush_addr_{i}" for i in range(3)]
+    for address in addresses:
+        tracker.record(address, 503, "ConnectionError", "down")
+    assert await tracker._early_flush == 3
+    assert tracker.pending == 0
+
+    rows = (await async_session.scalars(
+        select(WalletFailure.wallet_address).where(WalletFailure.wallet_address.in_(addresses))
+    )).all()
+    assert sorted(rows) == addresses
+
+
+def test_unknown_policy_rejected(session_factory):
+    """
+    Ensures a misspelt row policy is refused when the tracker is created.
+    """
+    with pytest.raises(ValueError, match="policy"):
+        FailureTracker(session_factory, policy="sometimes")
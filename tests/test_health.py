@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+import pytest
+
+import app.logger
+import app.main
+from app import db
+from app.deps import set_ready
+from app.main import app as fastapi_app
+from app.tron import TronClient
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_warm_up(client, monkeypatch, tmp_path):
+    """
+    Integration test for GET /ready across the application lifespan.
+
+    Ensures the probe answers 503 before warm-up and 200 once the lifespan
+    has opened its connections.
+    """
+    monkeypatch.setattr(app.main, "TRON_WARMUP_CONNECTIONS", 0)
+    monkeypatch.setattr(app.logger, "LOG_FILE", str(tmp_path / "app.log"))
+    monkeypatch.setattr(db, "DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path}/ready.db")
+    set_ready(False)
+
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+    async with fastapi_app.router.lifespan_context(fastapi_app):
+        assert db.engine is not None
+        for _ in range(100):
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                break
+            await asyncio.sleep(0.01)
+        assert response.json() == {"status": "ready"}
+
+    assert db.engine is None
+    assert (await client.get("/ready")).status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_connections(tmp_path):
+    """
+    Ensures warm-up leaves the requested number of database and HTTP connections open.
+    """
+    engine = db.create_engine(f"sqlite+aiosqlite:///{tmp_path}/warm.db", 3, 0)
+    assert await db.warm_up_engine(engine, 5) == 3
+    assert engine.pool.checkedin() == 3
+    await engine.dispose()
+
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(404)
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    tron = TronClient(endpoints=["http://a.test/", "http://b.test/"], http_client=http)
+    assert await tron.warm_up(2) == 4
+    assert len(paths) == 4
+    await tron.close()
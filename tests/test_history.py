@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import crud
+from app.crud import (
+    _raw_history_query,
+    _rollup_upsert,
+    create_wallet_records,
+    get_wallet_history,
+    record_wallet_observations,
+    wallet_record_values,
+)
+from app.schemas import WalletOut
+
+# Addresses of the private keys 0x05.., 0x06.., 0x07.., 0x0a..: not used by other tests.
+RAW = "TUzD1rsJtHzx5zQzzLgzmmaKUDzcDAU6KD"
+ROLLED = "TB8JBJdVX7FSU9WsGPyvQ1i6gGWAhut65r"
+DELTA = "TGkWdpawVNfeset3P6uTBbLaPY7nZVZvXY"
+UNCHANGED = "TTc2oLdLMCZjWfk5pTYh7TZmHESoGS119e"
+
+DAY = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _values(address: str, balance: int, energy: int, bandwidth: int, at: datetime, success: bool = True) -> dict:
+    data = WalletOut(wallet_address=address, balance=balance, energy=energy, bandwidth=bandwidth)
+    return {**wallet_record_values(data, success, None if success else "boom"), "created_at": at}
+
+
+def _series(address: str) -> list[dict]:
+    return [
+        _values(address, 100, 10, 1, DAY + timedelta(hours=10, minutes=5)),
+        _values(address, 300, 30, 3, DAY + timedelta(hours=10, minutes=30)),
+        _values(address, 0, 0, 0, DAY + timedelta(hours=10, minutes=40), success=False),
+        _values(address, 200, 20, 2, DAY + timedelta(hours=11, minutes=10)),
+        _values(address, 999, 99, 9, DAY + timedelta(days=2)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_aggregates_per_bucket(async_session):
+    """
+    Ensures raw records are grouped into UTC buckets with min/max/avg/last,
+    failures and records outside the range are ignored.
+    """
+    await create_wallet_records(async_session, _series(RAW))
+
+    rows = await get_wallet_history(async_session, RAW, "hour", DAY, DAY + timedelta(days=1))
+    assert [row["bucket_start"] for row in rows] == [DAY + timedelta(hours=10), DAY + timedelta(hours=11)]
+    first, second = rows
+    assert first["count"] == 2
+    assert (first["balance_min"], first["balance_max"], first["balance_avg"], first["balance_last"]) == (
+        100, 300, 200.0, 300,
+    )
+    assert (first["energy_min"], first["energy_max"], first["bandwidth_last"]) == (10, 30, 3)
+    assert second["count"] == 1 and second["balance_last"] == 200
+
+    rows = await get_wallet_history(async_session, RAW, "day", DAY, DAY + timedelta(days=3))
+    assert [(row["bucket_start"], row["count"]) for row in rows] == [(DAY, 3), (DAY + timedelta(days=2), 1)]
+
+
+@pytest.mark.asyncio
+async def test_rollups_match_raw_aggregation(async_session, monkeypatch):
+    """
+    Ensures rollups maintained across several inserts answer the same as
+    aggregating the raw records.
+    """
+    monkeypatch.setattr(crud, "HISTORY_ROLLUPS", True)
+    monkeypatch.setattr(crud, "HISTORY_ROLLUP_BUCKETS", ["hour", "day"])
+    series = _series(ROLLED)
+    # Out of order and in separate transactions, so rows are merged by the upsert.
+    await create_wallet_records(async_session, series[1:3])
+    await create_wallet_records(async_session, [series[3], series[0]])
+    await create_wallet_records(async_session, series[4:])
+
+    for bucket in ("hour", "day"):
+        rolled = await get_wallet_history(async_session, ROLLED, bucket, DAY, DAY + timedelta(days=3))
+        monkeypatch.setattr(crud, "HISTORY_ROLLUPS", False)
+        raw = await get_wallet_history(async_session, ROLLED, bucket, DAY, DAY + timedelta(days=3))
+        monkeypatch.setattr(crud, "HISTORY_ROLLUPS", True)
+        assert rolled == raw
+
+
+@pytest.mark.asyncio
+async def test_history_weights_delta_observations(async_session, monkeypatch):
+    """
+    Ensures unchanged observations of delta storage count towards the bucket
+    and its average, both raw and in the rollups.
+    """
+    monkeypatch.setattr(crud, "HISTORY_ROLLUPS", True)
+    monkeypatch.setattr(crud, "HISTORY_ROLLUP_BUCKETS", ["day"])
+    now = datetime.now(timezone.utc)
+    await record_wallet_observations(async_session, [
+        _values(DELTA, 100, 0, 0, now),
+        _values(DELTA, 100, 0, 0, now),
+        _values(DELTA, 400, 0, 0, now),
+    ])
+    await record_wallet_observations(async_session, [_values(DELTA, 400, 0, 0, now)])
+
+    start, end = now - timedelta(days=1), now + timedelta(minutes=1)
+    for rollups in (True, False):
+        monkeypatch.setattr(crud, "HISTORY_ROLLUPS", rollups)
+        [row] = await get_wallet_history(async_session, DELTA, "day", start, end)
+        assert row["count"] == 4
+        assert row["balance_avg"] == 250.0
+        assert row["balance_last"] == 400
+
+
+@pytest.mark.asyncio
+async def test_delta_repeats_count_at_change_time(async_session, monkeypatch):
+    """
+    Ensures repeat sightings spread over several days count in the bucket of
+    the change they confirm, identically with and without rollups.
+    """
+    monkeypatch.setattr(crud, "HISTORY_ROLLUPS", True)
+    monkeypatch.setattr(crud, "HISTORY_ROLLUP_BUCKETS", ["day"])
+    now = datetime.now(timezone.utc)
+    changed = now - timedelta(days=5)
+    await record_wallet_observations(async_session, [_values(UNCHANGED, 700, 0, 0, changed)])
+    for age in (3, 1, 0):
+        await record_wallet_observations(async_session, [_values(UNCHANGED, 700, 0, 0, now - timedelta(days=age))])
+
+    start, end = changed - timedelta(days=1), now + timedelta(minutes=1)
+    answers = []
+    for rollups in (True, False):
+        monkeypatch.setattr(crud, "HISTORY_ROLLUPS", rollups)
+        rows = await get_wallet_history(async_session, UNCHANGED, "day", start, end)
+        answers.append(rows)
+        assert [(row["bucket_start"], row["count"]) for row in rows] == [(crud.bucket_start(changed, "day"), 4)]
+        assert rows[0]["balance_avg"] == 700.0
+    assert answers[0] == answers[1]
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint(client, async_session):
+    """
+    Integration test for GET /wallets/{address}/history.
+
+    Ensures buckets are returned as JSON and over-long or empty ranges are rejected.
+    """
+    later = DAY + timedelta(days=10)
+    await create_wallet_records(async_session, [
+        _values(RAW, 100, 10, 1, later + timedelta(minutes=5)),
+        _values(RAW, 300, 30, 3, later + timedelta(minutes=30)),
+        _values(RAW, 200, 20, 2, later + timedelta(hours=1)),
+    ])
+
+    url = f"/wallets/{RAW}/history"
+    response = await client.get(url, params={
+        "bucket": "hour", "created_from": "2026-01-11T00:00:00Z", "created_to": "2026-01-11T02:00:00",
+    })
+    assert response.status_code == 200
+    rows = response.json()
+    assert [row["bucket_start"] for row in rows] == ["2026-01-11T00:00:00Z", "2026-01-11T01:00:00Z"]
+    assert rows[0]["balance_avg"] == 200.0
+
+    response = await client.get(url, params={"bucket": "minute", "created_from": "2025-01-01T00:00:00Z"})
+    assert response.status_code == 400
+
+    response = await client.get(url, params={"created_from": "2026-01-02T00:00:00Z", "created_to": "2026-01-01"})
+    assert response.status_code == 400
+
+    response = await client.get(url, params={"bucket": "week"})
+    assert response.status_code == 400
+
+
+def test_history_statements_compile_for_postgres():
+    dialect = postgresql.dialect()
+    query = str(_raw_history_query("postgresql", RAW, "hour", DAY, DAY).compile(dialect=dialect))
+    assert "date_trunc" in query and "timezone" in query
+    upsert = str(_rollup_upsert("postgresql").compile(dialect=dialect))
+    assert "ON CONFLICT (wallet_address, bucket, bucket_start) DO UPDATE" in upsert
+    assert "least" in upsert and "greatest" in upsert
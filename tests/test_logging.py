@@ -0,0 +1,66 @@
+import json
+
+import httpx
+import pytest
+from loguru import logger
+
+from app.logger import RequestContextMiddleware, SamplingFilter, configure_logging
+from app.metrics import stage
+
+
+@pytest.fixture()
+def json_records():
+    """Routes log output to a list of parsed JSON records for the duration of a test."""
+    lines: list[str] = []
+    configure_logging(level="DEBUG", fmt="json", enqueue=False, sink=lines.append)
+    yield lambda: [json.loads(line) for line in lines]
+    configure_logging()
+
+
+def test_sampling_limits_info_per_call_site():
+    """
+    Ensures INFO records beyond the burst are dropped per call site while
+    warnings always pass.
+    """
+    sampling = SamplingFilter(rate=0.001, burst=3)
+    lines: list[str] = []
+    handler = logger.add(lines.append, filter=sampling, format="{message}")
+    try:
+        for i in range(10):
+            logger.info(f"info {i}")
+            logger.warning(f"warning {i}")
+    finally:
+        logger.remove(handler)
+
+    assert sum(line.startswith("info") for line in lines) == 3
+    assert sum(line.startswith("warning") for line in lines) == 10
+    assert sampling.dropped == 7
+
+
+@pytest.mark.asyncio
+async def test_request_records_carry_id_and_stages(json_records):
+    """
+    Ensures records logged during a request carry its request ID, the ID is
+    echoed in the response and the request record includes stage timings.
+    """
+    async def endpoint(scope, receive, send):
+        with stage("tron_fetch"):
+            logger.info("inside handler")
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    transport = httpx.ASGITransport(app=RequestContextMiddleware(endpoint, log_requests=True))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/ping", headers={"X-Request-ID": "req-42"})
+        generated = await client.get("/ping", headers={"X-Request-ID": "bad id\n"})
+
+    assert response.headers["x-request-id"] == "req-42"
+    assert generated.headers["x-request-id"] not in ("req-42", "bad id\n")
+
+    records = [record for record in json_records() if record["request_id"] == "req-42"]
+    assert [record["message"] for record in records][0] == "inside handler"
+    summary = records[-1]
+    assert summary["status"] == 204
+    assert summary["path"] == "/ping"
+    assert set(summary["stages_ms"]) == {"tron_fetch"}
+    assert "_sampled" not in summary
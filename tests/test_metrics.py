@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.deps import get_tron_client
+from app.main import app
+from app.metrics import Registry
+from app.tron import TronClient
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Unit test for the Prometheus text rendering of counters and histograms.
+    """
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs.")
+    histogram = registry.histogram("job_seconds", "Job latency.", buckets=(0.1, 1.0))
+
+    counter.inc(status="ok")
+    counter.inc(2, status="ok")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{status="ok"} 3' in text
+    assert 'job_seconds_bucket{le="0.1"} 1' in text
+    assert 'job_seconds_bucket{le="1"} 2' in text
+    assert 'job_seconds_bucket{le="+Inf"} 3' in text
+    assert "job_seconds_count 3" in text
+    assert "job_seconds_sum 5.55" in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_stages_and_errors(client):
+    """
+    Integration test for GET /metrics.
+
+    Ensures request counters, stage histograms and error counters are
+    populated by POST /address calls.
+    """
+    mock_tron = MagicMock(spec=TronClient)
+    mock_tron.get_wallet_info.return_value = {
+        "wallet_address": "TXYZmetrics",
+        "balance": 1,
+        "energy": 1,
+        "bandwidth": 1,
+    }
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+    await client.post("/address", json={"wallet_address": "TXYZmetrics"})
+
+    mock_tron.get_wallet_info.side_effect = ConnectionError("Network error")
+    await client.post("/address", json={"wallet_address": "TXYZmetrics"})
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+
+    assert 'http_requests_total{method="POST",route="/address",status="200"}' in text
+    assert 'http_requests_total{method="POST",route="/address",status="503"}' in text
+    for name in ("validation", "tron_fetch", "db_write", "serialization"):
+        assert f'wallet_stage_duration_seconds_count{{stage="{name}"}}' in text
+    assert 'wallet_errors_total{error_class="ConnectionError",status="503"}' in text
+    assert "http_requests_in_flight 1" in text
+
+    app.dependency_overrides.clear()  # type: ignore
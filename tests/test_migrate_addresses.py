@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import migrate_addresses
+from app.models import WalletRequest, WalletSnapshot, encode_address
+from migrate_addresses import migrate
+
+ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+# wallet_requests as created by the original model, plus the delta storage
+# columns added as the README describes.
+BASELINE = [
+    "CREATE TABLE wallet_requests (id INTEGER NOT NULL, wallet_address VARCHAR NOT NULL, "
+    "balance BIGINT, energy BIGINT, bandwidth BIGINT, success BOOLEAN NOT NULL, "
+    "error_message VARCHAR, created_at DATETIME, PRIMARY KEY (id))",
+    "CREATE INDEX ix_wallet_requests_created_at ON wallet_requests (created_at)",
+    "CREATE INDEX ix_wallet_requests_id ON wallet_requests (id)",
+    "CREATE INDEX ix_wallet_requests_wallet_address ON wallet_requests (wallet_address)",
+    "ALTER TABLE wallet_requests ADD COLUMN observations INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE wallet_requests ADD COLUMN last_seen_at TIMESTAMP WITH TIME ZONE",
+]
+
+
+async def _baseline_db(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path}/legacy.db"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        for statement in BASELINE:
+            await conn.execute(text(statement))
+        await conn.execute(text(
+            "INSERT INTO wallet_requests (wallet_address, balance, energy, bandwidth, success) VALUES "
+            f"('{ADDRESS}', 1, 2, 3, 1), ('{ADDRESS}', 5, 2, 3, 1), ('not_base58', 0, 0, 0, 0)"
+        ))
+    return url, engine
+
+
+async def _assert_migrated(engine):
+    async with engine.connect() as conn:
+        raw = (await conn.execute(text("SELECT wallet_address FROM wallet_requests ORDER BY id"))).scalars().all()
+        addresses = (await conn.execute(select(WalletRequest.wallet_address).order_by(WalletRequest.id))).scalars().all()
+        snapshot = (await conn.execute(select(WalletSnapshot))).one()
+        indexes = (await conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'wallet_requests'"
+        ))).scalars().all()
+    await engine.dispose()
+
+    assert [len(value) for value in raw] == [21, 21, 11]
+    assert addresses == [ADDRESS, ADDRESS, "not_base58"]
+    assert (snapshot.wallet_address, snapshot.record_id, snapshot.balance) == (ADDRESS, 2, 5)
+    assert "ix_wallet_requests_wallet_address" not in indexes
+    assert "ix_wallet_requests_address_created_at" in indexes
+
+
+@pytest.mark.asyncio
+async def test_migrate_text_addresses(tmp_path):
+    """
+    Integration test for the address migration against a database with the original schema.
+
+    Ensures addresses are converted in place, read back as the same strings,
+    stored compactly, the old address index is replaced and the snapshot
+    table is rebuilt.
+    """
+    url, engine = await _baseline_db(tmp_path)
+
+    await migrate(url)
+    await migrate(url)
+
+    await _assert_migrated(engine)
+
+
+@pytest.mark.asyncio
+async def test_migrate_resumes_interrupted_run(tmp_path, monkeypatch):
+    """
+    Ensures a run that failed after converting part of the rows can be
+    started again and finishes the conversion.
+    """
+    url, engine = await _baseline_db(tmp_path)
+    monkeypatch.setattr(migrate_addresses, "BATCH_SIZE", 1)
+    calls = 0
+
+    def failing_encode(address):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise RuntimeError("connection lost")
+        return encode_address(address)
+
+    monkeypatch.setattr(migrate_addresses, "encode_address", failing_encode)
+    with pytest.raises(RuntimeError, match="connection lost"):
+        await migrate(url)
+
+    monkeypatch.setattr(migrate_addresses, "encode_address", encode_address)
+    await migrate(url)
+
+    await _assert_migrated(engine)
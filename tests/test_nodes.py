@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.nodes import CLOSED, OPEN, CircuitOpenError, NodePool, TronNode
+from app.tron import TronClient
+
+ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+def node_handler(delay: float = 0.0, fail: bool = False, hits: list | None = None):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if hits is not None:
+            hits.append(request.url.host)
+        if delay:
+            await asyncio.sleep(delay)
+        if fail:
+            return httpx.Response(503)
+        if request.url.path == "/wallet/getaccount":
+            return httpx.Response(200, json={"balance": 1, "node": request.url.host})
+        return httpx.Response(200, json={"EnergyLimit": 2, "free_net_limit": 3})
+    return handler
+
+
+def routed_http(handlers: dict) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return await handlers[request.url.host](request)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def make_pool(http: httpx.AsyncClient, hosts: list[str], failure_threshold: int = 1, **kwargs) -> NodePool:
+    nodes = [
+        TronNode(f"http://{host}/", http, None, timeout=1.0, failure_threshold=failure_threshold, recovery_time=60)
+        for host in hosts
+    ]
+    return NodePool(nodes, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_pool_fails_over_and_opens_circuit():
+    """
+    Ensures a failing node is failed over to the next one and its circuit
+    opens so it is no longer tried.
+    """
+    hits = []
+    http = routed_http({
+        "bad": node_handler(fail=True, hits=hits),
+        "good": node_handler(hits=hits),
+    })
+    pool = make_pool(http, ["bad", "good"])
+
+    result = await pool.call(lambda tron: tron.get_account(ADDRESS))
+    assert result["node"] == "good"
+    assert pool.failovers == 1
+
+    bad = pool.nodes[0]
+    assert bad.state == OPEN
+    assert pool.ranked()[0].endpoint == "http://good/"
+
+    hits.clear()
+    await pool.call(lambda tron: tron.get_account(ADDRESS))
+    assert hits == ["good"]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_blocks_calls_until_one_probe():
+    """
+    Ensures an open single-node pool fails fast without touching the node
+    before recovery_time, and afterwards lets exactly one probe through
+    while concurrent calls keep failing fast.
+    """
+    hits = []
+    healthy = False
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(request.url.host)
+        if not healthy:
+            return httpx.Response(503)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"balance": 1})
+
+    pool = make_pool(httpx.AsyncClient(transport=httpx.MockTransport(handler)), ["only"])
+    node = pool.nodes[0]
+    with pytest.raises(httpx.HTTPStatusError):
+        await pool.call(lambda tron: tron.get_account(ADDRESS))
+    assert node.state == OPEN and hits == ["only"]
+
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            await pool.call(lambda tron: tron.get_account(ADDRESS))
+    assert hits == ["only"]
+
+    healthy = True
+    node.opened_at -= node.recovery_time
+    results = await asyncio.gather(
+        *(pool.call(lambda tron: tron.get_account(ADDRESS)) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert sum(isinstance(result, dict) for result in results) == 1
+    assert sum(isinstance(result, CircuitOpenError) for result in results) == 2
+    assert hits == ["only", "only"]
+    assert node.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_pool_hedges_slow_primary():
+    """
+    Ensures a request still pending after the hedge delay is duplicated to
+    the next node and the faster answer wins.
+    """
+    http = routed_http({
+        "slow": node_handler(delay=0.5),
+        "fast": node_handler(delay=0.0),
+    })
+    pool = make_pool(http, ["slow", "fast"], hedge_percentile=95, hedge_min_delay=0.02)
+
+    started = asyncio.get_running_loop().time()
+    result = await pool.call(lambda tron: tron.get_account(ADDRESS))
+
+    assert result["node"] == "fast"
+    assert asyncio.get_running_loop().time() - started < 0.4
+    assert pool.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_raises_when_all_nodes_fail():
+    """
+    Ensures TronClient reports ConnectionError once every node has failed.
+    """
+    http = routed_http({"a": node_handler(fail=True), "b": node_handler(fail=True)})
+    tron = TronClient(endpoints=["http://a/", "http://b/"], http_client=http)
+
+    with pytest.raises(ConnectionError):
+        await tron.get_wallet_info(ADDRESS)
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.deps import get_profile_store
+from app.main import app
+from app.metrics import stage
+from app.profiling import ProfileStore, ProfilingMiddleware
+from app.routes import admin as admin_routes
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_captured(tmp_path):
+    """
+    Ensures only requests over the threshold are captured, with their stage
+    trace, and old captures are rotated out.
+    """
+    async def endpoint(scope, receive, send):
+        with stage("tron_fetch"):
+            await asyncio.sleep(0.05 if scope["path"] == "/slow" else 0)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    store = ProfileStore(str(tmp_path), keep=2)
+    middleware = ProfilingMiddleware(endpoint, store, slow_threshold=0.04)
+    transport = httpx.ASGITransport(app=middleware)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/fast")
+        assert store.entries() == []
+        for _ in range(3):
+            await client.get("/slow")
+
+    captures = store.entries()
+    assert middleware.captured == 3
+    assert len(captures) == 2
+    trace = json.loads(store.path(captures[0]["name"]).read_text())
+    assert trace["path"] == "/slow"
+    assert trace["reason"] == "slow"
+    assert [span["stage"] for span in trace["stages"]] == ["tron_fetch"]
+    assert trace["stages"][0]["duration_ms"] >= 40
+
+
+@pytest.mark.asyncio
+async def test_admin_profile_endpoints(client, tmp_path, monkeypatch):
+    """
+    Integration test for GET /admin/profiles and GET /admin/profiles/{name}.
+
+    Ensures captures are listed and downloadable, unknown or malformed names
+    give 404, the admin token is enforced and without one the endpoints are closed.
+    """
+    store = ProfileStore(str(tmp_path))
+    store.save("20260101T000000000000-POST-address-120ms-1.json", '{"duration_ms": 120}')
+    app.dependency_overrides[get_profile_store] = lambda: store
+
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "")
+    assert (await client.get("/admin/profiles")).status_code == 404
+
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secret")
+    assert (await client.get("/admin/profiles")).status_code == 401
+    assert (await client.get("/admin/profiles", headers={"Authorization": "Bearer wrong"})).status_code == 401
+
+    headers = {"Authorization": "Bearer secret"}
+    response = await client.get("/admin/profiles", headers=headers)
+    assert response.status_code == 200
+    assert [capture["name"] for capture in response.json()] == ["20260101T000000000000-POST-address-120ms-1.json"]
+
+    response = await client.get("/admin/profiles/20260101T000000000000-POST-address-120ms-1.json", headers=headers)
+    assert response.json() == {"duration_ms": 120}
+    assert (await client.get("/admin/profiles/..%2Fapp.log", headers=headers)).status_code == 404
+    assert (await client.get("/admin/profiles/missing.json", headers=headers)).status_code == 404
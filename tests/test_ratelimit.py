@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.nodes import NodePool, TronNode
+from app.ratelimit import AdaptiveConcurrency, OutboundLimiter, RateLimitExceeded, TokenBucket
+
+ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_and_rejects():
+    """
+    Ensures the bucket admits a burst immediately, paces the rest at the
+    configured rate and rejects callers beyond the wait queue.
+    """
+    bucket = TokenBucket(rate=100, burst=2, max_waiters=2)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert loop.time() - started < 0.005
+
+    waiting = [asyncio.create_task(bucket.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(RateLimitExceeded):
+        await bucket.acquire()
+    await asyncio.gather(*waiting)
+
+    assert loop.time() - started >= 0.015
+    assert bucket.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_aimd():
+    """
+    Ensures the limit grows on fast successes, halves on errors and that
+    callers over the limit wait for a released slot.
+    """
+    limiter = AdaptiveConcurrency(initial=2, min_limit=1, max_limit=10, latency_target=0.5, max_waiters=5)
+
+    await limiter.acquire()
+    await limiter.acquire()
+    third = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not third.done()
+    assert limiter.waiters == 1
+
+    limiter.release(0.01)
+    await third
+    assert limiter.limit == 2.5
+
+    limiter.release(0.01, ok=False)
+    assert limiter.limit == 1.25
+    limiter.release(1.0)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_honours_retry_after():
+    """
+    Ensures a 429 answer pauses outbound calls for Retry-After and the call
+    is retried, without counting against the node's health.
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(asyncio.get_running_loop().time())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json={"balance": 1})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    node = TronNode("http://node/", http, None, timeout=1.0)
+    limiter = OutboundLimiter(None, AdaptiveConcurrency(4, 1, 8, 1.0, 10))
+    pool = NodePool([node], limiter=limiter, rate_limit_retries=1)
+
+    result = await pool.call(lambda tron: tron.get_account(ADDRESS))
+
+    assert result == {"balance": 1}
+    assert calls[1] - calls[0] >= 0.05
+    assert node.consecutive_failures == 0
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_gives_up_after_repeated_429():
+    """
+    Ensures persistent 429 answers surface as RateLimitExceeded, a ConnectionError.
+    """
+    http = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(429, headers={"Retry-After": "0"})
+    ))
+    pool = NodePool([TronNode("http://node/", http, None, timeout=1.0)], rate_limit_retries=1)
+
+    with pytest.raises(ConnectionError, match="rate limit"):
+        await pool.call(lambda tron: tron.get_account(ADDRESS))
@@ -0,0 +1,63 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.db as db
+
+
+async def database_name(session) -> str:
+    return (await session.execute(text("SELECT name FROM marker"))).scalar_one()
+
+
+@pytest_asyncio.fixture()
+async def primary_and_replica(tmp_path, monkeypatch):
+    """Two SQLite files standing in for a primary and its read replica."""
+    engines = []
+    for name in ("primary", "replica"):
+        engine = db.create_engine(f"sqlite+aiosqlite:///{tmp_path}/{name}.db", 2, 0)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE marker (name VARCHAR)"))
+            await conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+        engines.append(engine)
+
+    primary, replica = engines
+    monkeypatch.setattr(db, "async_session", async_sessionmaker(primary, expire_on_commit=False))
+    monkeypatch.setattr(db, "read_session", async_sessionmaker(replica, expire_on_commit=False))
+    monkeypatch.setattr(db, "replica", db.ReplicaState(retry_interval=60))
+    yield primary, replica
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica(primary_and_replica):
+    """
+    Ensures read sessions and factories go to the replica while writes stay on the primary.
+    """
+    async for session in db.get_read_session():
+        assert await database_name(session) == "replica"
+    async with db.get_read_session_factory()() as session:
+        assert await database_name(session) == "replica"
+    async for session in db.get_session():
+        assert await database_name(session) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary(primary_and_replica, tmp_path, monkeypatch):
+    """
+    Ensures an unreachable replica sends reads to the primary and is not
+    retried until the retry interval has passed.
+    """
+    unreachable = db.create_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db", 2, 0)
+    monkeypatch.setattr(db, "read_session", async_sessionmaker(unreachable, expire_on_commit=False))
+
+    async for session in db.get_read_session():
+        assert await database_name(session) == "primary"
+    assert not db.replica.available()
+    assert db.get_read_session_factory() is db.async_session
+
+    async for session in db.get_read_session():
+        assert await database_name(session) == "primary"
+    assert db.replica.fallbacks == 2
+    await unreachable.dispose()
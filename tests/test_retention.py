@@ -0,0 +1,178 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.crud import create_wallet_records, record_wallet_observations, wallet_record_values
+from app.deps import get_archive_store
+from app.main import app as fastapi_app
+from app.models import Base, WalletRequest, WalletSnapshot
+from app.retention import (
+    ArchiveStore,
+    RetentionJob,
+    create_partition_sql,
+    next_period,
+    partition_bounds,
+    period_start,
+)
+from app.schemas import WalletOut
+from partition_wallet_requests import partition
+
+# Addresses of the private keys 0x08.., 0x09..: not used by other tests.
+OLD = "TPzLMtKqkJ5dXJX8DEHYFSmX8QobKF4N77"
+ACTIVE = "TJ52LP9eqskXuZ9Paz8CCoKzTRx3TkpKKn"
+
+NOW = datetime(2026, 3, 15, 12, tzinfo=timezone.utc)
+
+
+def _values(address: str, balance: int, at: datetime, success: bool = True) -> dict:
+    data = WalletOut(wallet_address=address, balance=balance, energy=0, bandwidth=0)
+    return {**wallet_record_values(data, success, None if success else "boom"), "created_at": at}
+
+
+@pytest_asyncio.fixture()
+async def archive_session_factory(tmp_path):
+    """A file database of its own: the retention job deletes whatever is old enough."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/retention.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _count(archive_session_factory) -> int:
+    async with archive_session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(WalletRequest))
+
+
+def test_periods():
+    assert period_start(NOW, "day") == datetime(2026, 3, 15, tzinfo=timezone.utc)
+    assert period_start(NOW, "month") == datetime(2026, 3, 1, tzinfo=timezone.utc)
+    assert next_period(datetime(2026, 1, 1, tzinfo=timezone.utc), "month") == datetime(2026, 2, 1, tzinfo=timezone.utc)
+    assert next_period(datetime(2026, 2, 28, tzinfo=timezone.utc), "day") == datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_partition_statements():
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    assert create_partition_sql(start, next_period(start, "month")) == (
+        "CREATE TABLE IF NOT EXISTS wallet_requests_p20260301 PARTITION OF wallet_requests "
+        "FOR VALUES FROM ('2026-03-01T00:00:00+00:00') TO ('2026-04-01T00:00:00+00:00')"
+    )
+    bound = "FOR VALUES FROM ('2026-03-01 01:00:00+01') TO ('2026-04-01 02:00:00+02')"
+    assert partition_bounds(bound) == (start, next_period(start, "month"))
+    assert partition_bounds("DEFAULT") is None
+    assert partition_bounds("FOR VALUES FROM (MINVALUE) TO ('2026-04-01 00:00:00+00')") is None
+
+
+@pytest.mark.asyncio
+async def test_retention_archives_expired_records(archive_session_factory, tmp_path):
+    """
+    Ensures records older than the retention are moved to per-period gzip
+    archives in batches, newer ones stay, and delta snapshots pointing at
+    archived records are dropped.
+    """
+    days = [NOW - timedelta(days=age) for age in (40, 40, 39, 5)]
+    async with archive_session_factory() as session:
+        await create_wallet_records(session, [
+            _values(OLD, 1, days[0]),
+            _values(OLD, 2, days[1] + timedelta(hours=1)),
+            _values(OLD, 0, days[2], success=False),
+            _values(ACTIVE, 4, days[3]),
+        ])
+        await record_wallet_observations(session, [_values(ACTIVE, 5, NOW - timedelta(days=35))])
+
+    store = ArchiveStore(str(tmp_path / "archive"))
+    job = RetentionJob(archive_session_factory, store, retention_days=30, period="day", batch_size=1)
+    assert await job.run(NOW) == 4
+    assert await job.run(NOW) == 0
+    assert job.rows_archived == 4
+
+    assert await _count(archive_session_factory) == 1
+    async with archive_session_factory() as session:
+        assert (await session.scalars(select(WalletSnapshot.wallet_address))).all() == []
+
+    files = store.files()
+    assert [path.name for path in files] == [
+        "wallet_requests-20260203-20260204.ndjson.gz",
+        "wallet_requests-20260204-20260205.ndjson.gz",
+        "wallet_requests-20260208-20260209.ndjson.gz",
+    ]
+    with gzip.open(files[0], "rt") as file:
+        records = [json.loads(line) for line in file]
+    assert [(record["wallet_address"], record["balance"]) for record in records] == [(OLD, 1), (OLD, 2)]
+    assert records[0]["created_at"] == "2026-02-03T12:00:00+00:00"
+    assert store.files(NOW - timedelta(days=39), NOW) == files[1:]
+    assert store.parts() == []
+
+
+@pytest.mark.asyncio
+async def test_retention_recovers_interrupted_batch(archive_session_factory, tmp_path):
+    """
+    Ensures a part whose rows were deleted is appended to the archive, and a
+    part whose rows are still stored is discarded and archived again.
+    """
+    old = NOW - timedelta(days=60)
+    async with archive_session_factory() as session:
+        _, deleted = await create_wallet_records(session, [_values(OLD, 1, old), _values(OLD, 2, old)])
+        rows = await session.execute(select(*WalletRequest.__table__.columns).order_by(WalletRequest.id))
+        kept_row, deleted_row = rows.mappings().all()
+        await session.delete(deleted)
+        await session.commit()
+
+    store = ArchiveStore(str(tmp_path / "archive"))
+    start, end = period_start(old, "month"), next_period(period_start(old, "month"), "month")
+    store.commit_part(store.write_part(start, end, [deleted_row]))
+    store.path(start, end).unlink()
+    store.write_part(start, end, [deleted_row])
+    # A second, unrelated part as if deletion of its batch never happened.
+    other = store.write_part(start - timedelta(days=31), start, [kept_row])
+
+    job = RetentionJob(archive_session_factory, store, retention_days=30, period="month")
+    assert await job.run(NOW) == 1
+    assert not other.exists()
+    with gzip.open(store.path(start, end), "rt") as file:
+        assert [json.loads(line)["balance"] for line in file] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_archive_endpoint(client, archive_session_factory, tmp_path):
+    """
+    Integration test for GET /records/archive.
+
+    Ensures archived records are served with the /records filters as NDJSON and CSV.
+    """
+    async with archive_session_factory() as session:
+        await create_wallet_records(session, [
+            _values(OLD, 1, NOW - timedelta(days=50)),
+            _values(OLD, 0, NOW - timedelta(days=50), success=False),
+            _values(ACTIVE, 3, NOW - timedelta(days=45)),
+        ])
+    store = ArchiveStore(str(tmp_path / "archive"))
+    await RetentionJob(archive_session_factory, store, retention_days=30).run(NOW)
+    fastapi_app.dependency_overrides[get_archive_store] = lambda: store
+
+    response = await client.get("/records/archive", params={"success": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["wallet_address"] for record in records] == [OLD, ACTIVE]
+
+    response = await client.get("/records/archive", params={
+        "wallet_address": ACTIVE, "created_from": "2026-01-20T00:00:00Z", "format": "csv",
+    })
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,wallet_address,balance")
+    assert len(lines) == 2 and ACTIVE in lines[1]
+
+    response = await client.get("/records/archive", params={"created_to": "2026-01-01T00:00:00Z"})
+    assert response.text == ""
+
+
+@pytest.mark.asyncio
+async def test_partition_script_skips_sqlite(tmp_path, capsys):
+    await partition(f"sqlite+aiosqlite:///{tmp_path}/plain.db")
+    assert "nothing to do" in capsys.readouterr().out
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+import app.serialization as serialization
+
+
+def test_dumps_fallback_matches_orjson(monkeypatch):
+    """
+    Ensures the standard library fallback encodes rows like orjson does,
+    including UTC datetimes as "Z" and non-ASCII text.
+    """
+    rows = [{
+        "id": 1,
+        "wallet_address": "ünïcode",
+        "balance": None,
+        "success": True,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        "last_seen_at": datetime(2024, 1, 2, 3, 4, 5),
+    }]
+    fast = serialization.dumps(rows)
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(rows) == fast
+    assert b'"2024-01-02T03:04:05.678901Z"' in fast
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models import WalletRequest
+from app.subscriptions import SubscriptionHub
+from app.tron import TronClient
+
+ADDRESS = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+# Address of the private key 0x04..: not used by other tests.
+PERSISTED = "TTtSZc4vTkLvd5GPg9Q4kihQUTLfxkbkxk"
+
+
+def fake_tron(balances: list[int]) -> MagicMock:
+    """A Tron client returning the given balances in turn, then the last one forever."""
+    values = iter(balances)
+    last = balances[-1]
+
+    async def get_wallet_info(address):
+        nonlocal last
+        last = next(values, last)
+        return {"wallet_address": address, "balance": last, "energy": 0, "bandwidth": 0}
+
+    tron = MagicMock(spec=TronClient)
+    tron.get_wallet_info = AsyncMock(side_effect=get_wallet_info)
+    return tron
+
+
+async def drain(subscriber, timeout: float = 0.05) -> list:
+    events = []
+    while (event := await subscriber.next(timeout)) is not None:
+        events.append(event)
+        if event[0] == "close":
+            break
+    return events
+
+
+@pytest.mark.asyncio
+async def test_one_poller_fans_out_changes_only():
+    """
+    Ensures subscribers of one address share one poller, only get changed
+    values, late subscribers get the current value and the poller stops with
+    the last subscriber.
+    """
+    hub = SubscriptionHub(session_factory=None, interval=0.01, persist=False)
+    tron = fake_tron([1, 1, 1, 2, 2])
+
+    first, second = hub.subscriber(), hub.subscriber()
+    hub.subscribe(first, ADDRESS, tron)
+    hub.subscribe(second, ADDRESS, tron)
+    assert len(hub.topics) == 1
+
+    await asyncio.sleep(0.1)
+    for subscriber in (first, second):
+        assert [payload["balance"] for _, payload in await drain(subscriber)] == [1, 2]
+    assert hub.polls > 4
+    assert hub.changes == 2
+
+    late = hub.subscriber()
+    hub.subscribe(late, ADDRESS, tron)
+    assert (await late.next(0)) == ("wallet", {"wallet_address": ADDRESS, "balance": 2, "energy": 0, "bandwidth": 0})
+
+    task = hub.topics[ADDRESS].task
+    for subscriber in (first, second, late):
+        hub.unsubscribe(subscriber)
+    await asyncio.sleep(0)
+    assert hub.topics == {}
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    """
+    Ensures a subscriber that stops reading is closed once its queue is full
+    while the others keep receiving events.
+    """
+    hub = SubscriptionHub(session_factory=None, interval=0.01, queue_size=2, persist=False)
+    tron = fake_tron(list(range(20)))
+
+    slow, fast = hub.subscriber(), hub.subscriber()
+    hub.subscribe(slow, ADDRESS, tron)
+    hub.subscribe(fast, ADDRESS, tron)
+
+    received = []
+    while len(received) < 6:
+        event = await fast.next(1)
+        received.append(event[1]["balance"])
+    assert received == list(range(6))
+
+    assert hub.drops == 1
+    assert await drain(slow) == [("close", {"reason": "slow consumer"})]
+    assert slow not in hub.subscribers
+    await hub.close()
+    assert (await drain(fast))[-1] == ("close", {"reason": "shutdown"})
+
+
+@pytest.mark.asyncio
+async def test_unknown_address_ends_subscription():
+    """
+    Ensures an address the network rejects gets an error event and its
+    poller stops, closing subscribers left without addresses.
+    """
+    hub = SubscriptionHub(session_factory=None, interval=0.01, persist=False)
+    tron = MagicMock(spec=TronClient)
+    tron.get_wallet_info = AsyncMock(side_effect=ValueError("Wallet address not found in Tron network"))
+
+    subscriber = hub.subscriber()
+    hub.subscribe(subscriber, ADDRESS, tron)
+    events = await drain(subscriber)
+
+    assert events[0] == ("error", {"wallet_address": ADDRESS, "detail": "Wallet address not found in Tron network"})
+    assert events[-1] == ("close", {"reason": "no addresses left"})
+    assert hub.topics == {}
+
+
+@pytest.mark.asyncio
+async def test_changes_are_persisted(session_factory, async_session):
+    """
+    Ensures only changed values are stored as wallet records.
+    """
+    hub = SubscriptionHub(session_factory, interval=0.01, persist=True)
+
+    subscriber = hub.subscriber()
+    hub.subscribe(subscriber, PERSISTED, fake_tron([5, 5, 6, 6, 6]))
+    await asyncio.sleep(0.1)
+    await hub.close()
+
+    stored = await async_session.scalar(
+        select(func.count()).select_from(WalletRequest).where(WalletRequest.wallet_address == PERSISTED)
+    )
+    assert stored == 2
+
+
+@pytest.mark.asyncio
+async def test_subscribe_rejects_invalid_addresses(client):
+    """
+    Integration test for GET /subscribe: invalid addresses are rejected before streaming.
+    """
+    response = await client.get("/subscribe", params={"address": ["not_an_address"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid Tron address format: not_an_address"
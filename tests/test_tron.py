@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.tron import TronClient
+
+ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+def make_client(handler, timeout: float = 1.0) -> TronClient:
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler), timeout=timeout)
+    return TronClient(endpoint="http://node.test/", timeout=timeout, http_client=http)
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_info_fetches_concurrently():
+    """
+    Unit test for TronClient.get_wallet_info against a mocked node.
+
+    Ensures both node calls are in flight at the same time and the
+    response fields are mapped into the wallet info dict.
+    """
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if request.url.path == "/wallet/getaccount":
+            return httpx.Response(200, json={"address": ADDRESS, "balance": 42})
+        return httpx.Response(200, json={"EnergyLimit": 7, "free_net_limit": 600})
+
+    tron = make_client(handler)
+    info = await tron.get_wallet_info(ADDRESS)
+    await tron.close()
+
+    assert info == {"wallet_address": ADDRESS, "balance": 42, "energy": 7, "bandwidth": 600}
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_info_not_found():
+    """
+    Test that an empty node response is reported as ValueError.
+    """
+    tron = make_client(lambda request: httpx.Response(200, json={}))
+
+    with pytest.raises(ValueError, match="not found"):
+        await tron.get_wallet_info(ADDRESS)
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_info_network_error():
+    """
+    Test that transport and HTTP status failures are reported as ConnectionError.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    tron = make_client(handler)
+    with pytest.raises(ConnectionError, match="Network error"):
+        await tron.get_wallet_info(ADDRESS)
+
+    tron = make_client(lambda request: httpx.Response(502))
+    with pytest.raises(ConnectionError, match="Network error"):
+        await tron.get_wallet_info(ADDRESS)
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_info_timeout():
+    """
+    Test that a call exceeding the per-call timeout is reported as ConnectionError.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"balance": 1})
+
+    tron = make_client(handler, timeout=0.05)
+    with pytest.raises(ConnectionError, match="timed out"):
+        await tron.get_wallet_info(ADDRESS)
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_info_against_stub_node():
+    """
+    Integration test for TronClient against the local stub node used by the benchmarks.
+
+    Ensures the stub speaks the node API the client relies on and injects errors.
+    """
+    from benchmarks.stub_node import create_stub_app
+
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_stub_app()))
+    tron = TronClient(endpoint="http://stub/", http_client=http)
+    info = await tron.get_wallet_info(ADDRESS)
+
+    assert info["wallet_address"] == ADDRESS
+    assert info["bandwidth"] == 600
+    assert info == await TronClient(endpoint="http://stub/", http_client=http).get_wallet_info(ADDRESS)
+
+    failing = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_stub_app(error_rate=1.0)))
+    with pytest.raises(ConnectionError):
+        await TronClient(endpoint="http://stub/", http_client=failing).get_wallet_info(ADDRESS)
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import func, select
+from unittest.mock import AsyncMock, MagicMock
+
+from app.deps import get_tron_client, get_watchlist
+from app.main import app
+from app.models import WalletRequest, WatchedWallet
+from app.tron import TronClient
+
+TREASURY = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+COLD = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+def wallet_info(address: str, balance: int) -> dict:
+    return {"wallet_address": address, "balance": balance, "energy": 10, "bandwidth": 20}
+
+
+@pytest.mark.asyncio
+async def test_watchlist_api(client):
+    """
+    Integration test for POST, GET and DELETE /watchlist.
+
+    Ensures addresses can be watched and relabelled, invalid addresses are
+    rejected and unknown ones give 404 on removal.
+    """
+    response = await client.post("/watchlist", json={"wallet_address": TREASURY, "label": "treasury"})
+    assert response.status_code == 201
+    assert response.json()["label"] == "treasury"
+    assert response.json()["fresh"] is False
+
+    response = await client.post("/watchlist", json={"wallet_address": TREASURY, "label": "hot wallet"})
+    assert response.status_code == 201
+    assert (await client.post("/watchlist", json={"wallet_address": "not_an_address"})).status_code == 400
+
+    listed = (await client.get("/watchlist")).json()
+    assert [(entry["wallet_address"], entry["label"]) for entry in listed] == [(TREASURY, "hot wallet")]
+
+    assert (await client.delete(f"/watchlist/{TREASURY}")).status_code == 204
+    assert (await client.delete(f"/watchlist/{TREASURY}")).status_code == 404
+    assert (await client.get("/watchlist")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_prioritises_hits_and_serves_prefetched(client, async_session):
+    """
+    Ensures the scheduler refreshes the most queried address first, persists
+    the result, and POST /address then answers it without a Tron call.
+    """
+    watchlist = app.dependency_overrides[get_watchlist]()
+    watchlist.batch_size = 1
+    for address in (TREASURY, COLD):
+        await client.post("/watchlist", json={"wallet_address": address})
+    for _ in range(3):
+        assert watchlist.touch(TREASURY) is None
+
+    assert watchlist.due() == [TREASURY]
+    tron = MagicMock(spec=TronClient)
+    tron.refresh_wallet_info = AsyncMock(side_effect=lambda address: wallet_info(address, 500))
+    assert await watchlist.refresh(tron, watchlist.due()) == 1
+    assert watchlist.due() == [COLD]
+
+    stored = await async_session.scalar(
+        select(func.count()).select_from(WalletRequest).where(WalletRequest.wallet_address == TREASURY)
+    )
+    assert stored == 1
+    row = await async_session.get(WatchedWallet, TREASURY, populate_existing=True)
+    assert row.last_refreshed_at is not None
+    assert row.hits == 3
+
+    mock_tron = MagicMock(spec=TronClient)
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+    response = await client.post("/address", json={"wallet_address": TREASURY})
+    assert response.status_code == 200
+    assert response.json()["balance"] == 500
+    mock_tron.get_wallet_info.assert_not_called()
+    assert watchlist.served == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_recorded(client, async_session):
+    """
+    Ensures a failed refresh stores its error, serves nothing and backs off
+    until the next refresh is due.
+    """
+    watchlist = app.dependency_overrides[get_watchlist]()
+    await client.post("/watchlist", json={"wallet_address": COLD})
+
+    tron = MagicMock(spec=TronClient)
+    tron.refresh_wallet_info = AsyncMock(side_effect=ConnectionError("node down"))
+    assert await watchlist.refresh(tron, [COLD]) == 0
+
+    row = await async_session.get(WatchedWallet, COLD, populate_existing=True)
+    assert row.last_error == "node down"
+    assert watchlist.refresh_errors == 1
+    assert watchlist.touch(COLD) is None
+    assert watchlist.due() == []
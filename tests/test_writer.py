@@ -0,0 +1,182 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import func, select
+
+from app.deps import get_record_writer, get_tron_client
+from app.main import app
+from app.models import WalletRequest
+from app.schemas import WalletOut
+from app.tron import TronClient
+from app.writer import RecordWriter, WriteBufferFull, WriterStopped
+from unittest.mock import MagicMock
+
+
+def wallet(address: str) -> WalletOut:
+    return WalletOut(wallet_address=address, balance=1, energy=2, bandwidth=3)
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_concurrent_writes(session_factory):
+    """
+    Ensures concurrent writes are committed together and each caller gets
+    its own stored record back.
+    """
+    flushes = 0
+
+    @asynccontextmanager
+    async def counting_factory():
+        nonlocal flushes
+        flushes += 1
+        async with session_factory() as session:
+            yield session
+
+    writer = RecordWriter(counting_factory, batch_size=50, flush_interval=0.05)
+    await writer.start()
+
+    records = await asyncio.gather(*(writer.write(wallet(f"wb_{i}")) for i in range(20)))
+    await writer.stop()
+
+    assert [r.wallet_address for r in records] == [f"wb_{i}" for i in range(20)]
+    assert len({r.id for r in records}) == 20
+    assert flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_on_stop(session_factory):
+    """
+    Ensures records still queued when the writer stops are persisted.
+    """
+    writer = RecordWriter(session_factory, batch_size=1000, flush_interval=10)
+    await writer.start()
+
+    pending = [asyncio.create_task(writer.write(wallet("wb_shutdown"))) for _ in range(3)]
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    records = await asyncio.wait_for(asyncio.gather(*pending), 1)
+    assert all(r.id is not None for r in records)
+    async with session_factory() as session:
+        count = await session.scalar(
+            select(func.count()).where(WalletRequest.wallet_address == "wb_shutdown")
+        )
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_writer_stop_waits_for_blocked_writers(session_factory):
+    """
+    Ensures writers blocked on a full queue when the writer stops still get
+    their records stored instead of waiting forever.
+    """
+    writer = RecordWriter(session_factory, batch_size=2, flush_interval=0, max_queue=1, put_timeout=5)
+    await writer.start()
+
+    pending = [asyncio.create_task(writer.write(wallet("wb_blocked"))) for _ in range(6)]
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    records = await asyncio.wait_for(asyncio.gather(*pending), 1)
+    assert len({r.id for r in records}) == 6
+
+
+@pytest.mark.asyncio
+async def test_writer_detects_dead_task(session_factory):
+    """
+    Ensures writes are refused once the flush task has died, e.g. by cancellation.
+    """
+    writer = RecordWriter(session_factory)
+    await writer.start()
+    writer._task.cancel()
+    await asyncio.sleep(0)
+
+    with pytest.raises(WriterStopped):
+        await writer.write(wallet("wb_dead"))
+
+
+@pytest.mark.asyncio
+async def test_writer_backpressure(session_factory):
+    """
+    Ensures writers are rejected with WriteBufferFull once the queue
+    stays full past the put timeout.
+    """
+    release = asyncio.Event()
+
+    @asynccontextmanager
+    async def blocked_factory():
+        await release.wait()
+        async with session_factory() as session:
+            yield session
+
+    writer = RecordWriter(blocked_factory, batch_size=1, flush_interval=0, max_queue=1, put_timeout=0.01)
+    await writer.start()
+
+    first = asyncio.create_task(writer.write(wallet("wb_a")))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(writer.write(wallet("wb_b")))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(WriteBufferFull):
+        await writer.write(wallet("wb_c"))
+
+    release.set()
+    await asyncio.gather(first, second)
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_post_address_write_behind(client, session_factory):
+    """
+    Test POST /address with write-behind enabled.
+
+    Ensures the response carries the id and timestamp from the batch insert.
+    """
+    writer = RecordWriter(session_factory, flush_interval=0.01)
+    await writer.start()
+
+    mock_tron = MagicMock(spec=TronClient)
+    mock_tron.get_wallet_info.return_value = {
+        "wallet_address": "TXYZwritebehind",
+        "balance": 5,
+        "energy": 6,
+        "bandwidth": 7,
+    }
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+    app.dependency_overrides[get_record_writer] = lambda: writer  # type: ignore
+
+    response = await client.post("/address", json={"wallet_address": "TXYZwritebehind"})
+    await writer.stop()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] is not None
+    assert data["balance"] == 5
+    assert data["created_at"] is not None
+
+    app.dependency_overrides.clear()  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_post_address_error_with_stopped_writer(client, session_factory):
+    """
+    Test POST /address failing while the writer is stopped (shutdown or crash).
+
+    Ensures the original Tron error is returned instead of a 500 from the
+    failure record that could not be queued.
+    """
+    writer = RecordWriter(session_factory)
+    await writer.start()
+    await writer.stop()
+
+    mock_tron = MagicMock(spec=TronClient)
+    mock_tron.get_wallet_info.side_effect = ConnectionError("Tron API down")
+    app.dependency_overrides[get_tron_client] = lambda: mock_tron  # type: ignore
+    app.dependency_overrides[get_record_writer] = lambda: writer  # type: ignore
+
+    response = await client.post("/address", json={"wallet_address": "TXYZstoppedwriter"})
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Tron API down"
+
+    app.dependency_overrides.clear()  # type: ignore